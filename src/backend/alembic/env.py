@@ -15,8 +15,10 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from dotenv import load_dotenv
 load_dotenv()
 
-# Import our database Base and DATABASE_URL
-from database import Base, DATABASE_URL
+# Import our database Base and DATABASE_URL; importing models registers
+# the tables on Base.metadata (database.py no longer imports them)
+from database import Base, DATABASE_URL, ensure_database_directory
+import models  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -37,6 +39,18 @@ if config.config_file_name is not None:
 # from models import Base
 target_metadata = Base.metadata
 
+# Tables managed by raw SQL in migrations (FTS5 virtual table and its
+# shadow tables) are not part of the ORM metadata; keep autogenerate
+# from proposing to drop them.
+EXCLUDED_TABLE_PREFIXES = ("terms_fts",)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip objects that are maintained outside the ORM models."""
+    if type_ == "table" and name.startswith(EXCLUDED_TABLE_PREFIXES):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -61,6 +75,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -74,6 +89,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    ensure_database_directory()
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -82,7 +98,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
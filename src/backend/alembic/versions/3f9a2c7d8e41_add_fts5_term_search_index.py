@@ -0,0 +1,74 @@
+"""Add FTS5 full-text search index over terms
+
+Revision ID: 3f9a2c7d8e41
+Revises: 6b66d218ecce
+Create Date: 2025-11-08 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c7d8e41'
+down_revision: Union[str, None] = '6b66d218ecce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # External-content FTS5 table: stores only the index, reads column
+    # values from `terms`. remove_diacritics folds umlauts for matching,
+    # prefix='2 3' keeps short prefix queries (Dr*, Dru*) index-only.
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE terms_fts USING fts5(
+            term,
+            definition,
+            context,
+            content='terms',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER terms_fts_after_insert AFTER INSERT ON terms BEGIN
+            INSERT INTO terms_fts(rowid, term, definition, context)
+            VALUES (new.id, new.term, new.definition, new.context);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER terms_fts_after_delete AFTER DELETE ON terms BEGIN
+            INSERT INTO terms_fts(terms_fts, rowid, term, definition, context)
+            VALUES ('delete', old.id, old.term, old.definition, old.context);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER terms_fts_after_update
+        AFTER UPDATE OF term, definition, context ON terms BEGIN
+            INSERT INTO terms_fts(terms_fts, rowid, term, definition, context)
+            VALUES ('delete', old.id, old.term, old.definition, old.context);
+            INSERT INTO terms_fts(rowid, term, definition, context)
+            VALUES (new.id, new.term, new.definition, new.context);
+        END
+        """
+    )
+
+    # Index any terms that already exist
+    op.execute("INSERT INTO terms_fts(terms_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS terms_fts_after_update")
+    op.execute("DROP TRIGGER IF EXISTS terms_fts_after_delete")
+    op.execute("DROP TRIGGER IF EXISTS terms_fts_after_insert")
+    op.execute("DROP TABLE IF EXISTS terms_fts")
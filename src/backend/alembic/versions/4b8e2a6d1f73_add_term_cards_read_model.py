@@ -0,0 +1,33 @@
+"""Add term_cards denormalized read model
+
+Revision ID: 4b8e2a6d1f73
+Revises: 7c3d5f1e9a26
+Create Date: 2025-11-20 14:08:52.114907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2a6d1f73'
+down_revision: Union[str, None] = '7c3d5f1e9a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('term_cards',
+    sa.Column('term_id', sa.Integer(), nullable=False),
+    sa.Column('card', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['term_id'], ['terms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('term_id')
+    )
+    # Existing terms: run `python -m services.term_cards rebuild`
+
+
+def downgrade() -> None:
+    op.drop_table('term_cards')
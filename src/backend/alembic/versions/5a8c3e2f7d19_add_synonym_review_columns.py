@@ -0,0 +1,35 @@
+"""Add review columns to term_synonyms
+
+Revision ID: 5a8c3e2f7d19
+Revises: c27e9f04b6a3
+Create Date: 2025-11-14 11:46:20.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8c3e2f7d19'
+down_revision: Union[str, None] = 'c27e9f04b6a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing links were all created manually and count as approved
+    with op.batch_alter_table('term_synonyms') as batch_op:
+        batch_op.add_column(sa.Column('is_approved', sa.Boolean(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('detection_method', sa.String(length=50), server_default='manual', nullable=False))
+        batch_op.add_column(sa.Column('approved_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('idx_synonym_approved', ['is_approved'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('term_synonyms') as batch_op:
+        batch_op.drop_index('idx_synonym_approved')
+        batch_op.drop_column('approved_at')
+        batch_op.drop_column('detection_method')
+        batch_op.drop_column('is_approved')
@@ -0,0 +1,40 @@
+"""Add term_compound_parts decompounding index
+
+Revision ID: 8d4e6b1a2c57
+Revises: 3f9a2c7d8e41
+Create Date: 2025-11-10 14:03:52.671209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e6b1a2c57'
+down_revision: Union[str, None] = '3f9a2c7d8e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('term_compound_parts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('term_id', sa.Integer(), nullable=False),
+    sa.Column('part', sa.String(length=200), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=10), nullable=False),
+    sa.CheckConstraint("role IN ('head', 'modifier')", name='ck_compound_role'),
+    sa.ForeignKeyConstraint(['term_id'], ['terms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_compound_part_role', 'term_compound_parts', ['part', 'role'], unique=False)
+    op.create_index('idx_compound_term', 'term_compound_parts', ['term_id'], unique=False)
+    # Existing terms: run `python -m services.decompounding rebuild`
+
+
+def downgrade() -> None:
+    op.drop_index('idx_compound_term', table_name='term_compound_parts')
+    op.drop_index('idx_compound_part_role', table_name='term_compound_parts')
+    op.drop_table('term_compound_parts')
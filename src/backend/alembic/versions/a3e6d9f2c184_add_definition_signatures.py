@@ -0,0 +1,37 @@
+"""Add definition_signatures for MinHash synonym candidates
+
+Revision ID: a3e6d9f2c184
+Revises: d5a17c3e8b42
+Create Date: 2025-11-24 10:37:18.552301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e6d9f2c184'
+down_revision: Union[str, None] = 'd5a17c3e8b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('definition_signatures',
+    sa.Column('term_id', sa.Integer(), nullable=False),
+    sa.Column('definition_hash', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('compared_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['term_id'], ['terms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('term_id')
+    )
+    op.create_index('idx_definition_signature_pending', 'definition_signatures', ['compared_at'], unique=False)
+    # Signatures are computed by `python -m services.synonym_candidates run`
+
+
+def downgrade() -> None:
+    op.drop_index('idx_definition_signature_pending', table_name='definition_signatures')
+    op.drop_table('definition_signatures')
@@ -0,0 +1,31 @@
+"""Add glossary_generation counter
+
+Revision ID: b7d2e5a9c1f4
+Revises: f4c2b7e9d016
+Create Date: 2026-10-18 09:12:37.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e5a9c1f4'
+down_revision: Union[str, None] = 'f4c2b7e9d016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table('glossary_generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(table, [{'id': 1, 'generation': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('glossary_generation')
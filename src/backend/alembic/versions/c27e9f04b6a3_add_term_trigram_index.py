@@ -0,0 +1,36 @@
+"""Add term_trigrams fuzzy search index
+
+Revision ID: c27e9f04b6a3
+Revises: 8d4e6b1a2c57
+Create Date: 2025-11-12 16:27:09.118374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27e9f04b6a3'
+down_revision: Union[str, None] = '8d4e6b1a2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('term_trigrams',
+    sa.Column('trigram', sa.String(length=3), nullable=False),
+    sa.Column('term_length', sa.Integer(), nullable=False),
+    sa.Column('term_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['term_id'], ['terms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('trigram', 'term_length', 'term_id'),
+    sqlite_with_rowid=False
+    )
+    op.create_index('idx_trigram_term', 'term_trigrams', ['term_id'], unique=False)
+    # Existing terms: run `python -m services.fuzzy rebuild`
+
+
+def downgrade() -> None:
+    op.drop_index('idx_trigram_term', table_name='term_trigrams')
+    op.drop_table('term_trigrams')
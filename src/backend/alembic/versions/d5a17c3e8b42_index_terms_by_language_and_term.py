@@ -0,0 +1,30 @@
+"""Index terms by (language_code, term) for keyset browsing
+
+Revision ID: d5a17c3e8b42
+Revises: 4b8e2a6d1f73
+Create Date: 2025-11-21 11:36:05.742183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a17c3e8b42'
+down_revision: Union[str, None] = '4b8e2a6d1f73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Supersedes idx_term_language_code (same leading column), and serves
+    # ORDER BY language_code, term, id without a sort
+    op.create_index('idx_term_language_term', 'terms', ['language_code', 'term'], unique=False)
+    op.drop_index('idx_term_language_code', table_name='terms')
+
+
+def downgrade() -> None:
+    op.create_index('idx_term_language_code', 'terms', ['language_code'], unique=False)
+    op.drop_index('idx_term_language_term', table_name='terms')
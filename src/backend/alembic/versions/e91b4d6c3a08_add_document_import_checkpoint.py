@@ -0,0 +1,28 @@
+"""Add import_checkpoint to uploaded_documents
+
+Revision ID: e91b4d6c3a08
+Revises: 5a8c3e2f7d19
+Create Date: 2025-11-17 09:21:44.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b4d6c3a08'
+down_revision: Union[str, None] = '5a8c3e2f7d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('uploaded_documents') as batch_op:
+        batch_op.add_column(sa.Column('import_checkpoint', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('uploaded_documents') as batch_op:
+        batch_op.drop_column('import_checkpoint')
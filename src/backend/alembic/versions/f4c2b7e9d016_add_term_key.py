@@ -0,0 +1,67 @@
+"""Add normalized terms.term_key with (term_key, language_code) index
+
+Revision ID: f4c2b7e9d016
+Revises: a3e6d9f2c184
+Create Date: 2025-11-25 09:12:40.318254
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c2b7e9d016'
+down_revision: Union[str, None] = 'a3e6d9f2c184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Folding rules of services/term_key.py as of this revision, frozen here so
+# the backfill does not change when the live rules do (a rule change needs
+# its own migration to re-key existing rows)
+_WHITESPACE_RE = re.compile(r"\s+")
+_DASHES = "-\u2010\u2011\u2012\u2013\u2014\u2212"
+_DASH_RE = re.compile(f"[{_DASHES}]")
+_JOINING_DASH_RE = re.compile(f"(?<=[^\\W\\d_]) ?[{_DASHES}] ?(?=[^\\W\\d_])")
+_ARTICLES = {
+    "en": {"the", "a", "an"},
+    "de": {"der", "die", "das", "den", "dem", "des",
+           "ein", "eine", "einer", "eines", "einem", "einen"},
+}
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+
+
+def _term_key(term: str, language: str) -> str:
+    text = _WHITESPACE_RE.sub(" ", term).strip()
+    text = _JOINING_DASH_RE.sub("", text)
+    text = _DASH_RE.sub("-", text)
+    articles = _ARTICLES.get(language.lower(), set())
+    words = text.split(" ")
+    while len(words) > 1 and words[0].lower() in articles:
+        words = words[1:]
+    folded = unicodedata.normalize("NFC", " ".join(words)).casefold().translate(_UMLAUTS)
+    if folded.isascii():
+        return folded
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def upgrade() -> None:
+    op.add_column('terms', sa.Column('term_key', sa.String(length=1000), nullable=True))
+    # Backfill in one UPDATE: the folding rules are Python, registered as a
+    # SQL function on this connection. The FTS triggers only watch term,
+    # definition and context. The index is built after the backfill.
+    op.get_bind().connection.driver_connection.create_function(
+        'etex_term_key', 2, _term_key, deterministic=True
+    )
+    op.execute("UPDATE terms SET term_key = etex_term_key(term, language_code)")
+    op.create_index('idx_term_key_language', 'terms', ['term_key', 'language_code'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_term_key_language', table_name='terms')
+    op.drop_column('terms', 'term_key')
@@ -0,0 +1,52 @@
+"""
+ETEx - Benchmarks
+
+Reproducible performance measurements on synthetic data:
+
+- ``benchmarks.generate``: seeded multilingual terminology (German
+  compounds, synonym clusters, translations, source tiers) written into a
+  separate benchmark database, plus a TBX file for the import scenario
+- ``benchmarks.run``: timed scenarios (search, thesaurus, import, export,
+  API round-trips) with JSON results and comparison against a baseline
+
+Usage (from src/backend):
+    python -m benchmarks.generate --terms 100000
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --baseline before.json   # exit 1 on regression
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BENCHMARK_DIR = BACKEND_DIR.parents[1] / "data" / "benchmarks"
+DEFAULT_DATABASE = BENCHMARK_DIR / "bench.db"
+
+
+def use_database(path: Path) -> str:
+    """
+    Point the application at a benchmark database. ``database`` reads
+    ``DATABASE_URL`` when it is first imported, so this must run before any
+    import of the application modules.
+
+    Returns:
+        str: SQLAlchemy URL of the database
+    """
+    url = f"sqlite:///{Path(path).resolve()}"
+    if "database" in sys.modules and sys.modules["database"].DATABASE_URL != url:
+        raise RuntimeError("database.py was imported before the benchmark database was selected")
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def migrate(path: Path) -> None:
+    """Create or upgrade the schema of a database file (``alembic upgrade head``)."""
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{Path(path).resolve()}"},
+        check=True,
+        capture_output=True,
+    )
@@ -0,0 +1,474 @@
+"""
+ETEx - Synthetic Terminology Generator
+
+Seeded, reproducible terminology for benchmarks. The same seed and scale
+always produce the same rows in the same order.
+
+Concepts are engineering compounds built from a small lexicon of
+constituents with German, English and French forms:
+
+- German: closed compounds ("Druckmessumformer", "Sicherheitsventil")
+  with grammatical gender from the head
+- English / French: open forms ("pressure measuring transmitter",
+  "transmetteur de pression de mesure")
+
+Per concept (written through services/bulk.py, so the side indexes are
+built as in production):
+- a German and an English term, a French term for 40 % of concepts, each
+  with a templated definition
+- Translation de -> en (and de -> fr), validated for tier 1 sources
+- for 35 %: a synonym cluster of spelling variants ("Druck-Messumformer",
+  old-spelling "Durchfluß...", initialisms) linked to the German term with
+  TermSynonym and preferred_term_id; 10 % of the clusters are unapproved
+  auto-detected suggestions
+- for 15 %: the German term again from a second source
+- 'broader' links from a compound to its shorter parent
+  ("Druckmessumformer" -> "Messumformer") when the parent exists
+
+Concepts are spread over four AuthoritativeSources across tiers 1-3.
+A manifest (``<database>.json``) records seed and row counts.
+
+Usage (from src/backend):
+    python -m benchmarks.generate --terms 100000 [--database PATH] [--seed 7]
+    python -m benchmarks.generate --terms 1000000 --force
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.sax.saxutils import escape
+
+from benchmarks import DEFAULT_DATABASE, migrate, use_database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 7
+DEFAULT_TERMS = 100_000
+DEFAULT_TBX_ENTRIES = 5000
+BATCH_CONCEPTS = 2000
+
+# (German combining form, English, French)
+MODIFIERS = [
+    ("Druck", "pressure", "pression"),
+    ("Temperatur", "temperature", "température"),
+    ("Durchfluss", "flow", "débit"),
+    ("Füllstand", "level", "niveau"),
+    ("Mess", "measuring", "mesure"),
+    ("Regel", "control", "régulation"),
+    ("Steuer", "command", "commande"),
+    ("Sicherheits", "safety", "sécurité"),
+    ("Strom", "current", "courant"),
+    ("Spannungs", "voltage", "tension"),
+    ("Leistungs", "power", "puissance"),
+    ("Frequenz", "frequency", "fréquence"),
+    ("Signal", "signal", "signal"),
+    ("Feld", "field", "terrain"),
+    ("Prozess", "process", "processus"),
+    ("Hilfs", "auxiliary", "auxiliaire"),
+    ("Not", "emergency", "urgence"),
+    ("Absperr", "shut-off", "arrêt"),
+    ("Kugel", "ball", "boisseau"),
+    ("Membran", "diaphragm", "membrane"),
+    ("Kreisel", "centrifugal", "centrifuge"),
+    ("Kolben", "piston", "piston"),
+    ("Hoch", "high", "haute"),
+    ("Nieder", "low", "basse"),
+    ("Differenz", "differential", "différentiel"),
+    ("Kalibrier", "calibration", "étalonnage"),
+    ("Schutz", "protection", "protection"),
+    ("Erdungs", "earthing", "mise à la terre"),
+    ("Kabel", "cable", "câble"),
+    ("Schalt", "switching", "commutation"),
+    ("Wasser", "water", "eau"),
+    ("Dampf", "steam", "vapeur"),
+    ("Gas", "gas", "gaz"),
+    ("Öl", "oil", "huile"),
+    ("Luft", "air", "air"),
+    ("Kühl", "cooling", "refroidissement"),
+    ("Heiz", "heating", "chauffage"),
+    ("Antriebs", "drive", "entraînement"),
+    ("Motor", "motor", "moteur"),
+    ("Netz", "mains", "réseau"),
+]
+
+# (German, English, French, German gender)
+HEADS = [
+    ("Umformer", "transmitter", "transmetteur", "m"),
+    ("Sensor", "sensor", "capteur", "m"),
+    ("Fühler", "probe", "sonde", "m"),
+    ("Ventil", "valve", "vanne", "n"),
+    ("Pumpe", "pump", "pompe", "f"),
+    ("Leitung", "line", "conduite", "f"),
+    ("Schalter", "switch", "interrupteur", "m"),
+    ("Regler", "controller", "régulateur", "m"),
+    ("Anzeige", "indicator", "indicateur", "f"),
+    ("Wandler", "converter", "convertisseur", "m"),
+    ("Klappe", "damper", "clapet", "f"),
+    ("Antrieb", "actuator", "actionneur", "m"),
+    ("Kreis", "circuit", "circuit", "m"),
+    ("Anlage", "plant", "installation", "f"),
+    ("Gerät", "device", "appareil", "n"),
+    ("Einheit", "unit", "unité", "f"),
+    ("Relais", "relay", "relais", "n"),
+    ("Schrank", "cabinet", "armoire", "m"),
+    ("Verstärker", "amplifier", "amplificateur", "m"),
+    ("Zähler", "meter", "compteur", "m"),
+    ("Filter", "filter", "filtre", "m"),
+    ("Behälter", "vessel", "réservoir", "m"),
+    ("Kupplung", "coupling", "accouplement", "f"),
+    ("Lager", "bearing", "palier", "n"),
+    ("Dichtung", "seal", "joint", "f"),
+    ("Kontakt", "contact", "contact", "m"),
+    ("Wert", "value", "valeur", "m"),
+    ("Grenze", "limit", "limite", "f"),
+    ("Prüfung", "test", "essai", "f"),
+    ("Störung", "fault", "défaut", "f"),
+]
+
+DOMAINS = [
+    ("Prozessautomatisierung", "process automation", "l'automatisation des processus"),
+    ("Energieverteilung", "power distribution", "la distribution d'énergie"),
+    ("Wasseraufbereitung", "water treatment", "le traitement de l'eau"),
+    ("Chemieanlagen", "chemical plants", "les usines chimiques"),
+    ("Gebäudetechnik", "building services", "le génie climatique"),
+]
+
+# (name, display name, source type, tier, share of concepts)
+SOURCES = [
+    ("BENCH-IEC", "IEC 60050 (synthetic)", "database", 1, 0.35),
+    ("BENCH-DIN", "DIN standards (synthetic)", "pdf", 1, 0.25),
+    ("BENCH-MT", "Machine translation (synthetic)", "api", 2, 0.15),
+    ("BENCH-INTERNAL", "Internal glossary (synthetic)", "manual", 3, 0.25),
+]
+TIER_CONFIDENCE = {1: 1.0, 2: 0.8, 3: 0.6}
+
+# Constituents per concept: 1 modifier (2-part compound) .. 3 modifiers
+MODIFIER_COUNT_WEIGHTS = (0.45, 0.4, 0.15)
+FRENCH_SHARE = 0.4
+SYNONYM_SHARE = 0.35
+UNAPPROVED_SHARE = 0.1
+DUPLICATE_SHARE = 0.15
+
+
+@dataclass(frozen=True)
+class Concept:
+    modifiers: tuple[int, ...]
+    head: int
+    domain: int
+    source: int
+    french: bool
+    variants: tuple[str, ...]
+    approved: bool
+    duplicate_source: Optional[int]
+
+    @property
+    def key(self) -> tuple:
+        return (self.modifiers, self.head)
+
+
+def german(modifiers: tuple[int, ...], head: int) -> str:
+    """Closed compound: (Druck, Mess) + Umformer -> 'Druckmessumformer'."""
+    parts = [MODIFIERS[index][0] for index in modifiers] + [HEADS[head][0]]
+    return parts[0] + "".join(part.lower() for part in parts[1:])
+
+
+def english(modifiers: tuple[int, ...], head: int) -> str:
+    return " ".join([MODIFIERS[index][1] for index in modifiers] + [HEADS[head][1]])
+
+
+def french(modifiers: tuple[int, ...], head: int) -> str:
+    return HEADS[head][2] + "".join(f" de {MODIFIERS[index][2]}" for index in modifiers)
+
+
+def spelling_variants(modifiers: tuple[int, ...], head: int, count: int) -> tuple[str, ...]:
+    """Up to ``count`` variant spellings of the German compound."""
+    parts = [MODIFIERS[index][0] for index in modifiers] + [HEADS[head][0]]
+    term = german(modifiers, head)
+    candidates = [parts[0] + "-" + parts[1] + "".join(part.lower() for part in parts[2:])]
+    if "ss" in term:
+        candidates.append(term.replace("ss", "ß"))
+    if len(parts) >= 3:
+        candidates.append("".join(part[0] for part in parts).upper())
+    return tuple(candidates[:count])
+
+
+def definitions(concept: Concept) -> dict[str, str]:
+    modifiers, head = concept.modifiers, HEADS[concept.head]
+    domain = DOMAINS[concept.domain]
+    return {
+        "de": f"{head[0]} für {', '.join(MODIFIERS[i][0] for i in modifiers)} in der {domain[0]}.",
+        "en": f"{head[1].capitalize()} for {' and '.join(MODIFIERS[i][1] for i in modifiers)} "
+              f"applications in {domain[1]}.",
+        "fr": f"{head[2].capitalize()} pour {', '.join(MODIFIERS[i][2] for i in modifiers)} "
+              f"dans {domain[2]}.",
+    }
+
+
+def generate_concepts(rng: random.Random) -> Iterator[Concept]:
+    """Endless stream of distinct concepts (until the lexicon is exhausted)."""
+    seen: set[tuple] = set()
+    source_weights = [share for *_, share in SOURCES]
+    while True:
+        size = rng.choices((1, 2, 3), MODIFIER_COUNT_WEIGHTS)[0]
+        for _ in range(8):
+            key = (tuple(rng.sample(range(len(MODIFIERS)), size)), rng.randrange(len(HEADS)))
+            if key not in seen:
+                break
+            # Short compounds run out first: retry longer ones
+            size = min(size + 1, 3)
+        else:
+            if len(seen) >= len(HEADS) * len(MODIFIERS) ** 3 // 2:
+                return
+            continue
+        seen.add(key)
+        source = rng.choices(range(len(SOURCES)), source_weights)[0]
+        variants: tuple[str, ...] = ()
+        if rng.random() < SYNONYM_SHARE:
+            variants = spelling_variants(*key, count=rng.choice((1, 2)))
+        duplicate_source = None
+        if rng.random() < DUPLICATE_SHARE:
+            duplicate_source = rng.choice([index for index in range(len(SOURCES)) if index != source])
+        yield Concept(
+            modifiers=key[0],
+            head=key[1],
+            domain=rng.randrange(len(DOMAINS)),
+            source=source,
+            french=rng.random() < FRENCH_SHARE,
+            variants=variants,
+            approved=rng.random() >= UNAPPROVED_SHARE,
+            duplicate_source=duplicate_source,
+        )
+
+
+def _term_row(term: str, language: str, definition: str, source_id: int, tier: int, gender=None) -> dict:
+    return {
+        "term": term,
+        "language_code": language,
+        "definition": definition,
+        "source_id": source_id,
+        "confidence": TIER_CONFIDENCE[tier],
+        "part_of_speech": "noun",
+        "gender": gender,
+    }
+
+
+def _write_batch(connection, concepts: list[Concept], source_ids: list[int], german_ids: dict, counts: dict) -> None:
+    from services import bulk
+
+    rows: list[dict] = []
+    # Per concept: (index of German row, English row, French row or None, variant rows)
+    layout = []
+    for concept in concepts:
+        tier = SOURCES[concept.source][3]
+        source_id = source_ids[concept.source]
+        texts = definitions(concept)
+        gender = HEADS[concept.head][3]
+        de = len(rows)
+        rows.append(_term_row(german(*concept.key), "de", texts["de"], source_id, tier, gender))
+        rows.append(_term_row(english(*concept.key), "en", texts["en"], source_id, tier))
+        fr = None
+        if concept.french:
+            fr = len(rows)
+            rows.append(_term_row(french(*concept.key), "fr", texts["fr"], source_id, tier, "m"))
+        variants = []
+        for variant in concept.variants:
+            variants.append(len(rows))
+            rows.append(_term_row(variant, "de", texts["de"], source_id, tier, gender))
+        if concept.duplicate_source is not None:
+            other = concept.duplicate_source
+            rows.append(_term_row(
+                german(*concept.key), "de", texts["de"], source_ids[other], SOURCES[other][3], gender
+            ))
+        layout.append((de, fr, variants))
+
+    ids = bulk.insert_terms(connection, rows)
+    synonyms, preferred, translations = [], [], []
+    for concept, (de, fr, variants) in zip(concepts, layout):
+        german_ids[concept.key] = ids[de]
+        validated = SOURCES[concept.source][3] == 1
+        confidence = TIER_CONFIDENCE[SOURCES[concept.source][3]]
+        for target, language in ((de + 1, "en"), (fr, "fr")):
+            if target is not None:
+                translations.append({
+                    "source_term_id": ids[de],
+                    "target_term_id": ids[target],
+                    "source_language": "de",
+                    "target_language": language,
+                    "confidence": confidence,
+                    "validated_by_human": validated,
+                })
+        for variant in variants:
+            synonyms.append({
+                "term_id_1": ids[de],
+                "term_id_2": ids[variant],
+                "relationship_type": "synonym",
+                "confidence": 1.0 if concept.approved else 0.7,
+                "is_approved": concept.approved,
+                "detection_method": "manual" if concept.approved else "auto",
+            })
+            if concept.approved:
+                preferred.append((ids[variant], ids[de]))
+    bulk.insert_synonyms(connection, synonyms)
+    bulk.set_preferred_terms(connection, preferred)
+    bulk.insert_translations(connection, translations)
+    counts["terms"] += len(rows)
+    counts["concepts"] += len(concepts)
+    counts["synonyms"] += len(synonyms)
+    counts["translations"] += len(translations)
+
+
+def _write_hierarchy(connection, concepts_by_key: dict, counts: dict) -> None:
+    """'broader' edges from every compound to its shorter parent, if generated."""
+    from services import bulk
+
+    edges = []
+    for (modifiers, head), term_id in concepts_by_key.items():
+        parent = concepts_by_key.get((modifiers[1:], head))
+        if len(modifiers) > 1 and parent is not None:
+            edges.append({
+                "term_id_1": term_id,
+                "term_id_2": parent,
+                "relationship_type": "broader",
+                "confidence": 1.0,
+                "is_approved": True,
+                "detection_method": "manual",
+            })
+    for start in range(0, len(edges), 5000):
+        bulk.insert_synonyms(connection, edges[start:start + 5000])
+    counts["synonyms"] += len(edges)
+    counts["broader"] = len(edges)
+
+
+def generate(database: Path, terms: int, seed: int = DEFAULT_SEED) -> dict:
+    """
+    Create a migrated benchmark database with about ``terms`` Term rows.
+
+    Args:
+        database: SQLite file to create (must not exist)
+        terms: Target Term row count (exceeded by at most one concept)
+        seed: Random seed
+
+    Returns:
+        dict: Manifest (seed, row counts, elapsed seconds)
+    """
+    started = time.perf_counter()
+    use_database(database)
+    migrate(database)
+
+    from database import engine
+    from services import bulk
+
+    rng = random.Random(seed)
+    counts = {"terms": 0, "concepts": 0, "synonyms": 0, "translations": 0}
+    german_ids: dict[tuple, int] = {}
+    with engine.begin() as connection:
+        source_ids = [
+            bulk.get_or_create_source(connection, name, display_name, source_type, tier)
+            for name, display_name, source_type, tier, _ in SOURCES
+        ]
+
+    concepts = generate_concepts(rng)
+    while counts["terms"] < terms:
+        batch = []
+        # ~3 rows per concept; the last batch is sized to land on the target
+        wanted = min(BATCH_CONCEPTS, max(1, (terms - counts["terms"]) // 3))
+        for concept in concepts:
+            batch.append(concept)
+            if len(batch) >= wanted:
+                break
+        if not batch:
+            logger.warning(f"Lexicon exhausted after {counts['concepts']} concepts")
+            break
+        with engine.begin() as connection:
+            _write_batch(connection, batch, source_ids, german_ids, counts)
+        if counts["concepts"] % (BATCH_CONCEPTS * 10) < len(batch):
+            logger.info(f"{counts['terms']} terms, {counts['concepts']} concepts")
+
+    with engine.begin() as connection:
+        _write_hierarchy(connection, german_ids, counts)
+    engine.dispose()
+
+    manifest = {
+        "seed": seed,
+        "requested_terms": terms,
+        **counts,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    manifest_path(database).write_text(json.dumps(manifest, indent=2))
+    logger.info(
+        f"Generated {counts['terms']} terms, {counts['synonyms']} synonym links and "
+        f"{counts['translations']} translations in {manifest['seconds']}s: {database}"
+    )
+    return manifest
+
+
+def manifest_path(database: Path) -> Path:
+    return Path(f"{database}.json")
+
+
+def write_tbx(path: Path, entries: int, seed: int = DEFAULT_SEED) -> int:
+    """
+    Write a TBX-Basic file of ``entries`` generated concepts (one langSet
+    per language, German variants as admitted terms) for the import
+    benchmark.
+
+    Returns:
+        int: Number of terms in the file
+    """
+    rng = random.Random(seed)
+    term_count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n<martif type="TBX-Basic" xml:lang="de">\n<text><body>\n')
+        for number, concept in zip(range(entries), generate_concepts(rng)):
+            texts = definitions(concept)
+            languages = [
+                ("de", [german(*concept.key), *concept.variants]),
+                ("en", [english(*concept.key)]),
+            ]
+            if concept.french:
+                languages.append(("fr", [french(*concept.key)]))
+            out.write(f'<termEntry id="c{number}">')
+            for language, terms in languages:
+                out.write(f'<langSet xml:lang="{language}">')
+                out.write(f'<descrip type="definition">{escape(texts[language])}</descrip>')
+                for position, term in enumerate(terms):
+                    status = "preferredTerm-admn-sts" if position == 0 else "admittedTerm-admn-sts"
+                    out.write(
+                        f'<tig><term>{escape(term)}</term>'
+                        f'<termNote type="partOfSpeech">noun</termNote>'
+                        f'<termNote type="administrativeStatus">{status}</termNote></tig>'
+                    )
+                    term_count += 1
+                out.write("</langSet>")
+            out.write("</termEntry>\n")
+        out.write("</body></text>\n</martif>\n")
+    return term_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark terminology database")
+    parser.add_argument("--terms", type=int, default=DEFAULT_TERMS, help="Term rows (10k - 1M)")
+    parser.add_argument("--database", type=Path, default=DEFAULT_DATABASE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--force", action="store_true", help="Replace an existing database")
+    parser.add_argument("--tbx", type=Path, help="Write a TBX file instead of a database")
+    parser.add_argument("--entries", type=int, default=DEFAULT_TBX_ENTRIES, help="TBX concept entries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.tbx:
+        written = write_tbx(args.tbx, args.entries, args.seed)
+        logger.info(f"Wrote {args.entries} entries ({written} terms) to {args.tbx}")
+    else:
+        if args.database.exists():
+            if not args.force:
+                parser.error(f"{args.database} exists (use --force to replace it)")
+            for suffix in ("", "-wal", "-shm", ".json"):
+                Path(f"{args.database}{suffix}").unlink(missing_ok=True)
+        args.database.parent.mkdir(parents=True, exist_ok=True)
+        generate(args.database, args.terms, args.seed)
@@ -0,0 +1,624 @@
+"""
+ETEx - Benchmark Runner
+
+Timed scenarios against a generated benchmark database
+(``python -m benchmarks.generate``). One operation per sampled term; query
+samples are drawn with the run's seed, so two runs on the same database
+issue the same queries.
+
+Scenarios:
+- search.exact / search.simple / search.wildcard / search.head /
+  search.fuzzy: ``search_terms`` and ``fuzzy_search`` on a read session
+- thesaurus.build: loading the whole graph; thesaurus.expand: one
+  ``expand()`` per term
+- import.tbx: ``import_tbx`` of a generated TBX file into an empty
+  database (one operation = one file)
+- export.csv / export.tbx: one full stream of the tier-2 source
+- api.*: round-trips through the FastAPI test client, including routing,
+  validation, serialization and response compression (the test client
+  sends ``Accept-Encoding``; ``mean_wire_bytes`` is the encoded size,
+  ``mean_bytes`` the decoded one). The search result cache is disabled
+  unless SEARCH_CACHE_MAX_ENTRIES is set
+- api.search_concurrent: the api.search requests at concurrency 1 and
+  API_CONCURRENCY against the app's event loop; reports the throughput of
+  both runs (``rps_sequential``, ``rps_concurrent``) and their ``speedup``
+
+Results are written as JSON: environment, dataset manifest and per
+scenario ops, mean/p50/p95/max latency in ms and totals. With
+``--baseline``, every scenario whose p50 is slower than the baseline's by
+more than ``--tolerance`` (and ``--min-delta-ms``) is reported as a
+REGRESSION and the exit status is 1; a baseline from a different dataset
+exits with status 2.
+
+Usage (from src/backend):
+    python -m benchmarks.run [--database PATH] [--only 'search.*'] [--output FILE]
+    python -m benchmarks.run --baseline before.json --tolerance 0.2
+"""
+
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from benchmarks import BACKEND_DIR, BENCHMARK_DIR, DEFAULT_DATABASE, migrate, use_database
+from benchmarks.generate import DEFAULT_SEED, DEFAULT_TBX_ENTRIES, manifest_path, write_tbx
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+DEFAULT_SAMPLES = 200
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 0.5
+WARMUP_OPS = 5
+# One-shot scenarios (whole graph, whole file, whole export)
+DEFAULT_REPEATS = 3
+# In-flight requests of the api.*_concurrent scenarios
+API_CONCURRENCY = 16
+
+EXPORT_TIER = 2
+
+
+@dataclass
+class BenchContext:
+    database: Path
+    workdir: Path
+    seed: int
+    samples: int
+    repeats: int
+    tbx_entries: int
+    # Sampled (id, term, language_code), same for every scenario
+    terms: list[tuple[int, str, str]]
+
+    def rng(self, name: str) -> random.Random:
+        """Per-scenario generator, independent of which scenarios run."""
+        return random.Random(f"{self.seed}:{name}")
+
+
+SCENARIOS: dict[str, Callable[[BenchContext], dict]] = {}
+
+
+def scenario(name: str):
+    def register(function: Callable[[BenchContext], dict]):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+def summarize(timings: list[float], **extra) -> dict:
+    """Latency summary in milliseconds."""
+    ordered = sorted(timings)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {
+        "ops": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "total_s": round(sum(ordered), 3),
+        **extra,
+    }
+
+
+def measure(items: list, call: Callable, warmup: int = WARMUP_OPS) -> list[float]:
+    """Wall time of ``call(item)`` per item, after a few untimed calls."""
+    for item in items[:warmup]:
+        call(item)
+    timings = []
+    for item in items:
+        started = time.perf_counter()
+        call(item)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def typo(term: str, rng: random.Random) -> str:
+    """One deletion, transposition or substitution inside the term."""
+    if len(term) < 5:
+        return term
+    position = rng.randrange(1, len(term) - 2)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return term[:position] + term[position + 1:]
+    if kind == 1:
+        return term[:position] + term[position + 1] + term[position] + term[position + 2:]
+    return term[:position] + rng.choice("aeinrst") + term[position + 1:]
+
+
+def _words(ctx: BenchContext) -> list[tuple[str, str]]:
+    """(longest word of the term, language) per sample."""
+    return [(max(term.split(), key=len), language) for _, term, language in ctx.terms]
+
+
+# Search
+
+
+def _search(call: Callable, items: list) -> list[float]:
+    from database import ReadSessionLocal
+
+    with ReadSessionLocal() as db:
+        return measure(items, lambda item: call(db, item))
+
+
+@scenario("search.exact")
+def bench_exact(ctx: BenchContext) -> dict:
+    from services.search import search_terms
+
+    # Key lookups: case and hyphenation must not matter
+    items = [(term.upper() if index % 2 else term, language)
+             for index, (_, term, language) in enumerate(ctx.terms)]
+    return summarize(_search(
+        lambda db, item: search_terms(db, item[0], mode="exact", language_code=item[1]), items
+    ))
+
+
+@scenario("search.simple")
+def bench_simple(ctx: BenchContext) -> dict:
+    from services.search import search_terms
+
+    return summarize(_search(
+        lambda db, item: search_terms(db, item[0], mode="simple", language_code=item[1]), _words(ctx)
+    ))
+
+
+@scenario("search.wildcard")
+def bench_wildcard(ctx: BenchContext) -> dict:
+    from services.search import search_terms
+
+    items = [(word[:max(3, len(word) // 2)] + "*", language) for word, language in _words(ctx)]
+    return summarize(_search(
+        lambda db, item: search_terms(db, item[0], mode="wildcard", language_code=item[1]), items
+    ))
+
+
+@scenario("search.head")
+def bench_head(ctx: BenchContext) -> dict:
+    from benchmarks.generate import HEADS
+    from services.search import search_terms
+
+    rng = ctx.rng("search.head")
+    items = ["*" + rng.choice(HEADS)[0].lower() for _ in range(ctx.samples)]
+    return summarize(_search(
+        lambda db, query: search_terms(db, query, mode="wildcard", language_code="de"), items
+    ))
+
+
+@scenario("search.fuzzy")
+def bench_fuzzy(ctx: BenchContext) -> dict:
+    from services.fuzzy import fuzzy_search
+
+    rng = ctx.rng("search.fuzzy")
+    items = [(typo(term, rng), language) for _, term, language in ctx.terms]
+    return summarize(_search(
+        lambda db, item: fuzzy_search(db, item[0], language_code=item[1]), items
+    ))
+
+
+# Thesaurus
+
+
+@scenario("thesaurus.build")
+def bench_thesaurus_build(ctx: BenchContext) -> dict:
+    from database import read_engine
+    from services.thesaurus import ThesaurusGraph
+
+    graphs = []
+
+    def build(_):
+        with read_engine.connect() as connection:
+            graphs.append(ThesaurusGraph.build(connection))
+
+    timings = measure(list(range(ctx.repeats)), build, warmup=0)
+    return summarize(timings, edges=graphs[-1].edge_count)
+
+
+@scenario("thesaurus.expand")
+def bench_thesaurus_expand(ctx: BenchContext) -> dict:
+    from services.thesaurus import get_thesaurus
+
+    graph = get_thesaurus()
+    expanded = []
+    timings = measure(
+        [term_id for term_id, _, _ in ctx.terms],
+        lambda term_id: expanded.append(graph.expand(term_id)),
+    )
+    linked = sum(1 for result in expanded[-len(ctx.terms):] if result["synonyms"] or result["broader"])
+    return summarize(timings, linked_terms=linked)
+
+
+# Import / export
+
+
+@scenario("import.tbx")
+def bench_import(ctx: BenchContext) -> dict:
+    from sqlalchemy import create_engine, event
+
+    from database import SQLITE_PRAGMAS
+    from services.tbx_import import import_tbx
+
+    tbx = ctx.workdir / "import.tbx"
+    if not tbx.exists():
+        write_tbx(tbx, ctx.tbx_entries, ctx.seed + 1)
+    template = ctx.workdir / "empty.db"
+    if not template.exists():
+        migrate(template)
+
+    stats = []
+
+    def run_import(number: int) -> None:
+        target = ctx.workdir / f"import-{number}.db"
+        shutil.copyfile(template, target)
+        bind = create_engine(f"sqlite:///{target}", connect_args={"check_same_thread": False})
+
+        @event.listens_for(bind, "connect")
+        def _pragmas(dbapi_connection, connection_record):
+            for name, value in SQLITE_PRAGMAS.items():
+                dbapi_connection.execute(f"PRAGMA {name}={value}")
+
+        try:
+            stats.append(import_tbx(tbx, "BENCH-IMPORT", bind=bind))
+        finally:
+            bind.dispose()
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{target}{suffix}").unlink(missing_ok=True)
+
+    timings = measure(list(range(ctx.repeats)), run_import, warmup=0)
+    return summarize(
+        timings,
+        terms=stats[-1].terms,
+        terms_per_second=round(statistics.median(stat.terms_per_second for stat in stats)),
+    )
+
+
+def _export(ctx: BenchContext, export_format: str, **filters) -> dict:
+    from services.export import ExportFilters, ExportStats, export_chunks
+
+    results = []
+
+    def run_export(_):
+        stats = ExportStats()
+        for _chunk in export_chunks(export_format, ExportFilters(tier=EXPORT_TIER, **filters), stats=stats):
+            pass
+        results.append(stats)
+
+    timings = measure(list(range(ctx.repeats)), run_export, warmup=0)
+    return summarize(timings, rows=results[-1].rows, bytes=results[-1].bytes)
+
+
+@scenario("export.csv")
+def bench_export_csv(ctx: BenchContext) -> dict:
+    return _export(ctx, "csv")
+
+
+@scenario("export.tbx")
+def bench_export_tbx(ctx: BenchContext) -> dict:
+    return _export(ctx, "tbx", source_language="de", target_language="en")
+
+
+# API round-trips
+
+
+def _api(ctx: BenchContext, request: Callable, items: list) -> dict:
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    statuses: dict[int, int] = {}
+    sizes = []
+    wire_sizes = []
+
+    with TestClient(app) as client:
+        def call(item):
+            response = request(client, item)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            sizes.append(len(response.content))
+            wire_sizes.append(response.num_bytes_downloaded)
+
+        for item in items[:WARMUP_OPS]:
+            request(client, item)
+        timings = measure(items, call, warmup=0)
+    return summarize(
+        timings,
+        statuses={str(status): count for status, count in sorted(statuses.items())},
+        mean_bytes=round(statistics.fmean(sizes)),
+        mean_wire_bytes=round(statistics.fmean(wire_sizes)),
+    )
+
+
+@scenario("api.search")
+def bench_api_search(ctx: BenchContext) -> dict:
+    return _api(ctx, lambda client, item: client.get(
+        "/search", params={"q": item[0], "language": item[1]}
+    ), _words(ctx))
+
+
+@scenario("api.search_exact_cards")
+def bench_api_search_cards(ctx: BenchContext) -> dict:
+    return _api(ctx, lambda client, item: client.get(
+        "/search", params={"q": item[1], "mode": "exact", "language": item[2], "cards": "true"}
+    ), ctx.terms)
+
+
+@scenario("api.search_fuzzy")
+def bench_api_fuzzy(ctx: BenchContext) -> dict:
+    rng = ctx.rng("api.search_fuzzy")
+    items = [(typo(term, rng), language) for _, term, language in ctx.terms]
+    return _api(ctx, lambda client, item: client.get(
+        "/search", params={"q": item[0], "fuzzy": "true", "language": item[1]}
+    ), items)
+
+
+def _api_concurrent(ctx: BenchContext, path: str, params: list[dict], concurrency: int) -> dict:
+    """
+    The same requests at concurrency 1 and ``concurrency`` through the ASGI
+    app in one event loop (httpx ``ASGITransport``, lifespan included).
+    Latencies are those of the concurrent run; ``rps_*`` are requests per
+    second of each run, ``speedup`` their ratio.
+    """
+    import asyncio
+
+    import httpx
+
+    from main import app
+
+    async def run_all() -> tuple[dict[int, float], list[float]]:
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for item in params[:WARMUP_OPS]:
+                await client.get(path, params=item)
+            throughput: dict[int, float] = {}
+            timings: list[float] = []
+            for level in (1, concurrency):
+                gate = asyncio.Semaphore(level)
+                timings = []
+
+                async def call(item: dict) -> None:
+                    async with gate:
+                        started = time.perf_counter()
+                        response = await client.get(path, params=item)
+                        timings.append(time.perf_counter() - started)
+                        response.raise_for_status()
+
+                started = time.perf_counter()
+                await asyncio.gather(*(call(item) for item in params))
+                throughput[level] = len(params) / (time.perf_counter() - started)
+            return throughput, timings
+
+    throughput, timings = asyncio.run(run_all())
+    return summarize(
+        timings,
+        concurrency=concurrency,
+        rps_sequential=round(throughput[1], 1),
+        rps_concurrent=round(throughput[concurrency], 1),
+        speedup=round(throughput[concurrency] / throughput[1], 2),
+    )
+
+
+@scenario("api.search_concurrent")
+def bench_api_search_concurrent(ctx: BenchContext) -> dict:
+    params = [{"q": word, "language": language} for word, language in _words(ctx)]
+    return _api_concurrent(ctx, "/search", params, API_CONCURRENCY)
+
+
+@scenario("api.synonyms")
+def bench_api_synonyms(ctx: BenchContext) -> dict:
+    return _api(ctx, lambda client, item: client.get(f"/terms/{item[0]}/synonyms"), ctx.terms)
+
+
+@scenario("api.lookup")
+def bench_api_lookup(ctx: BenchContext) -> dict:
+    # Batches of 20 pairs per request
+    batches = [ctx.terms[start:start + 20] for start in range(0, len(ctx.terms), 20)]
+    return _api(ctx, lambda client, batch: client.post("/terms/lookup", json={
+        "items": [{"term": term, "language": language} for _, term, language in batch],
+    }), batches)
+
+
+@scenario("api.export")
+def bench_api_export(ctx: BenchContext) -> dict:
+    return _api(ctx, lambda client, _: client.get(
+        "/export/csv", params={"tier": EXPORT_TIER}
+    ), list(range(ctx.repeats)))
+
+
+# Running and comparing
+
+
+def sample_terms(database: Path, samples: int, seed: int) -> list[tuple[int, str, str]]:
+    """Deterministic sample of terms (by id) from the benchmark database."""
+    with sqlite3.connect(database) as connection:
+        max_id = connection.execute("SELECT MAX(id) FROM terms").fetchone()[0] or 0
+        rng = random.Random(seed)
+        ids = rng.sample(range(1, max_id + 1), min(samples, max_id))
+        rows = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            rows.update(
+                (row[0], row)
+                for row in connection.execute(
+                    f"SELECT id, term, language_code FROM terms WHERE id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+            )
+    return [rows[term_id] for term_id in ids if term_id in rows]
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _dataset(database: Path) -> dict:
+    path = manifest_path(database)
+    manifest = json.loads(path.read_text()) if path.exists() else {}
+    with sqlite3.connect(database) as connection:
+        for table in ("terms", "term_synonyms", "translations", "authoritative_sources"):
+            manifest[f"{table}_rows"] = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return manifest
+
+
+def run(
+    database: Path,
+    patterns: Optional[Iterable[str]] = None,
+    seed: int = DEFAULT_SEED,
+    samples: int = DEFAULT_SAMPLES,
+    repeats: int = DEFAULT_REPEATS,
+    tbx_entries: int = DEFAULT_TBX_ENTRIES,
+) -> dict:
+    """
+    Run the selected scenarios (all by default) and collect results.
+
+    Args:
+        database: Generated benchmark database
+        patterns: Scenario name globs, e.g. ['search.*', 'api.lookup']
+        seed: Sampling seed
+        samples: Operations per per-term scenario
+        repeats: Operations per one-shot scenario
+        tbx_entries: Concept entries in the import file
+
+    Returns:
+        dict: Results document (see module docstring)
+    """
+    use_database(database)
+    os.environ.setdefault("SEARCH_CACHE_MAX_ENTRIES", "0")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    os.environ.setdefault("SPACY_PRELOAD", "")
+
+    names = [
+        name for name in SCENARIOS
+        if not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+    ]
+    results = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "dataset": _dataset(database),
+        "settings": {"seed": seed, "samples": samples, "repeats": repeats, "tbx_entries": tbx_entries},
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="etex-bench-") as workdir:
+        ctx = BenchContext(
+            database=database,
+            workdir=Path(workdir),
+            seed=seed,
+            samples=samples,
+            repeats=repeats,
+            tbx_entries=tbx_entries,
+            terms=sample_terms(database, samples, seed),
+        )
+        for name in names:
+            logger.info(f"Running {name}")
+            result = SCENARIOS[name](ctx)
+            results["scenarios"][name] = result
+            logger.info(f"{name}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms ({result['ops']} ops)")
+    return results
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[dict]:
+    """
+    p50 of every scenario present in both runs, with a status of 'ok',
+    'faster' or 'REGRESSION' (slower by more than ``tolerance`` and
+    ``min_delta_ms``).
+    """
+    rows = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        before, after = previous["p50_ms"], current["p50_ms"]
+        ratio = after / before if before else float("inf")
+        status = "ok"
+        if after - before > min_delta_ms and ratio > 1 + tolerance:
+            status = "REGRESSION"
+        elif before - after > min_delta_ms and ratio < 1 / (1 + tolerance):
+            status = "faster"
+        rows.append({"scenario": name, "baseline_ms": before, "current_ms": after,
+                     "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def same_dataset(results: dict, baseline: dict) -> bool:
+    keys = ("seed", "terms", "terms_rows", "term_synonyms_rows", "translations_rows")
+    return all(results["dataset"].get(key) == baseline["dataset"].get(key) for key in keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ETEx benchmark scenarios")
+    parser.add_argument("--database", type=Path, default=DEFAULT_DATABASE)
+    parser.add_argument("--only", action="append", metavar="GLOB", help="Scenario name glob (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--tbx-entries", type=int, default=DEFAULT_TBX_ENTRIES)
+    parser.add_argument("--output", type=Path, help="Results file (default: data/benchmarks/run-<time>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed p50 slowdown as a fraction (0.25 = 25 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Ignore p50 differences below this many ms")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(SCENARIOS))
+        sys.exit(0)
+    if not args.database.exists():
+        parser.error(f"{args.database} not found (create it with: python -m benchmarks.generate)")
+
+    logging.basicConfig(level=logging.INFO)
+    results = run(args.database, args.only, args.seed, args.samples, args.repeats, args.tbx_entries)
+
+    output = args.output or BENCHMARK_DIR / f"run-{datetime.now():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if not same_dataset(results, baseline):
+            print(f"Baseline {args.baseline} was measured on a different dataset; not comparable")
+            sys.exit(2)
+        rows = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        print(f"{'scenario':28} {'baseline p50':>13} {'current p50':>13} {'ratio':>7}  status")
+        for row in rows:
+            print(f"{row['scenario']:28} {row['baseline_ms']:>10.3f} ms {row['current_ms']:>10.3f} ms "
+                  f"{row['ratio']:>7.2f}  {row['status']}")
+        regressions = [row["scenario"] for row in rows if row["status"] == "REGRESSION"]
+        if regressions:
+            print(f"\nREGRESSION in {len(regressions)} scenario(s): {', '.join(regressions)}")
+            sys.exit(1)
@@ -2,13 +2,46 @@
 ETEx - Database Configuration
 
 SQLAlchemy database configuration and session management.
+
+Engines (for SQLite file databases):
+- ``engine`` / ``SessionLocal``: sync writer with one pooled connection,
+  so the writers of this engine queue in the pool; Alembic, CLI tools,
+  importers, job workers
+- ``read_engine`` / ``ReadSessionLocal``: read-only (``mode=ro``) pool
+- ``async_engine`` / ``AsyncSessionLocal`` and ``async_read_engine`` /
+  ``AsyncReadSessionLocal``: the same split on aiosqlite for the FastAPI
+  request path. The query services stay synchronous and run through
+  ``run_sync`` on aiosqlite's worker threads, so this does not raise
+  request throughput: the work is CPU-bound Python under the GIL
+  (``api.search_concurrent`` in benchmarks/run.py: ~0.93x at 16 in
+  flight vs. one at a time). More throughput needs more processes
+  (uvicorn ``--workers``) reading the WAL database in parallel
+
+That is one writer connection per engine and process, not one overall:
+the sync and async writers of the API process, job worker processes and
+CLI tools still contend for the SQLite write lock. Between them, the
+busy timeout (SQLITE_BUSY_TIMEOUT) makes a writer wait for the lock
+instead of failing at once.
+
+Every SQLite connection gets the pragmas of the SQLITE_PROFILE
+('performance' by default: WAL, synchronous=NORMAL, mmap, a 64 MB page
+cache, in-memory temp tables, busy timeout). In WAL mode readers never
+wait for the writer, so a long import does not stall searches.
+
+Engines and session factories are created on first access, not at import:
+importing this module connects to nothing and creates no directories, and
+CLI tools never build the async engines they do not use.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from pathlib import Path
 import os
+import threading
 
 # Get project root directory (two levels up from this file)
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -19,33 +52,202 @@ DATABASE_URL = os.getenv(
     f"sqlite:///{PROJECT_ROOT}/data/database/etex.db"
 )
 
-# Ensure database directory exists
-db_path = PROJECT_ROOT / "data" / "database"
-db_path.mkdir(parents=True, exist_ok=True)
+# SQLite pragma profiles, applied to every new connection
+SQLITE_PROFILES = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,   # 256 MB
+        "cache_size": -65536,     # negative = KiB, i.e. 64 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,     # ms
+    },
+}
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False  # Set to True to log SQL queries
-)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+SQLITE_PRAGMAS = dict(SQLITE_PROFILES[SQLITE_PROFILE])
+for _name in ("mmap_size", "cache_size", "busy_timeout"):
+    if os.getenv(f"SQLITE_{_name.upper()}"):
+        SQLITE_PRAGMAS[_name] = int(os.environ[f"SQLITE_{_name.upper()}"])
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _is_sqlite_file(url: str) -> bool:
+    database = make_url(url).database
+    return IS_SQLITE and database not in (None, "", ":memory:") and not database.startswith("file:")
+
+
+def _read_only_url(url: str) -> str:
+    """Read-only URI variant of a SQLite file URL ('file:...?mode=ro&uri=true')."""
+    parsed = make_url(url)
+    database = os.path.abspath(parsed.database)
+    return parsed.set(
+        database=f"file:{database}",
+        query={**parsed.query, "mode": "ro", "uri": "true"},
+    ).render_as_string(hide_password=False)
+
+
+def _async_url(url: str) -> str:
+    """Async driver URL for the configured database ('sqlite:' -> 'sqlite+aiosqlite:')."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+def _apply_pragmas(read_only: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            # The journal mode is stored in the database file; only the
+            # writer may change it
+            if read_only and name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+
+def _configure(target: Engine, read_only: bool = False) -> None:
+    if IS_SQLITE and SQLITE_PRAGMAS or read_only:
+        event.listen(target, "connect", _apply_pragmas(read_only))
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create Base class for models
-Base = declarative_base()
+SQLITE_FILE = _is_sqlite_file(DATABASE_URL)
+READ_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+READ_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "16"))
+WRITER_POOL_TIMEOUT = float(os.getenv("DB_WRITER_TIMEOUT", "30"))
 
-# Import models for Alembic migrations
-# This ensures Alembic can detect model changes
-from models import (  # noqa: F401, E402
-    AuthoritativeSource,
-    Term,
-    TermSynonym,
-    Translation,
-    UploadedDocument,
+# Writer pool: a single connection per engine for SQLite files (writers of
+# other engines and processes wait on busy_timeout). Other databases keep
+# the default pool.
+_writer_pool = (
+    {"pool_size": 1, "max_overflow": 0, "pool_timeout": WRITER_POOL_TIMEOUT}
+    if SQLITE_FILE else {}
 )
 
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+
+def ensure_database_directory() -> None:
+    """Create the directory of a SQLite database file (on first engine use)."""
+    if SQLITE_FILE:
+        Path(make_url(DATABASE_URL).database).resolve().parent.mkdir(parents=True, exist_ok=True)
+
+
+def _create_writer_engine() -> Engine:
+    ensure_database_directory()
+    writer = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False} if IS_SQLITE else {},
+        echo=False,  # Set to True to log SQL queries
+        **_writer_pool
+    )
+    _configure(writer)
+    return writer
+
+
+def _create_read_engine() -> Engine:
+    if not SQLITE_FILE:
+        return _get("engine")
+    ensure_database_directory()
+    reader = create_engine(
+        _read_only_url(DATABASE_URL),
+        connect_args={"check_same_thread": False},
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_MAX_OVERFLOW,
+        echo=False
+    )
+    _configure(reader, read_only=True)
+    return reader
+
+
+# Async engines for the request path. aiosqlite defaults to NullPool for
+# file databases, which opens a connection (and its worker thread) per
+# request; queue pools keep warm connections instead.
+def _create_async_writer_engine() -> AsyncEngine:
+    ensure_database_directory()
+    writer = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=AsyncAdaptedQueuePool,
+        echo=False,
+        **(_writer_pool or {"pool_size": READ_POOL_SIZE, "max_overflow": READ_MAX_OVERFLOW})
+    )
+    _configure(writer.sync_engine)
+    return writer
+
+
+def _create_async_read_engine() -> AsyncEngine:
+    if not (SQLITE_FILE and ASYNC_DATABASE_URL == _async_url(DATABASE_URL)):
+        return _get("async_engine")
+    ensure_database_directory()
+    reader = create_async_engine(
+        _async_url(_read_only_url(DATABASE_URL)),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_MAX_OVERFLOW,
+        echo=False
+    )
+    _configure(reader.sync_engine, read_only=True)
+    return reader
+
+
+# Created by the module __getattr__ on first access (``database.engine``).
+# expire_on_commit=False for async sessions: attributes stay readable after
+# commit without an implicit (and under asyncio, illegal) lazy refresh.
+_FACTORIES = {
+    "engine": _create_writer_engine,
+    "read_engine": _create_read_engine,
+    "async_engine": _create_async_writer_engine,
+    "async_read_engine": _create_async_read_engine,
+    "SessionLocal": lambda: sessionmaker(autocommit=False, autoflush=False, bind=_get("engine")),
+    "ReadSessionLocal": lambda: sessionmaker(autocommit=False, autoflush=False, bind=_get("read_engine")),
+    "AsyncSessionLocal": lambda: async_sessionmaker(
+        _get("async_engine"), autoflush=False, expire_on_commit=False
+    ),
+    "AsyncReadSessionLocal": lambda: async_sessionmaker(
+        _get("async_read_engine"), autoflush=False, expire_on_commit=False
+    ),
+}
+_lazy_lock = threading.RLock()
+
+
+def _get(name: str):
+    value = globals().get(name)
+    if value is None:
+        with _lazy_lock:
+            value = globals().get(name)
+            if value is None:
+                value = globals()[name] = _FACTORIES[name]()
+    return value
+
+
+def __getattr__(name: str):
+    if name in _FACTORIES:
+        return _get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def dispose_engines() -> None:
+    """Close the pools of all engines created so far (API shutdown)."""
+    for name in ("async_engine", "async_read_engine"):
+        if name in globals():
+            await globals()[name].dispose()
+    for name in ("engine", "read_engine"):
+        if name in globals():
+            globals()[name].dispose()
+
+
+# Create Base class for models. AsyncAttrs adds ``awaitable_attrs`` for
+# loading relationships that were not eager-loaded (selectinload/joinedload).
+# Models live in models.py, which imports Base from here (and not the other
+# way round); Alembic's env.py imports them for autogenerate.
+Base = declarative_base(cls=AsyncAttrs)
+
+
 # Dependency for FastAPI routes
 def get_db():
     """
@@ -54,8 +256,44 @@ def get_db():
     Yields:
         Session: SQLAlchemy database session
     """
-    db = SessionLocal()
+    db = _get("SessionLocal")()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Read-only database dependency for FastAPI routes.
+
+    Yields:
+        Session: SQLAlchemy session on the read-only pool
+    """
+    db = _get("ReadSessionLocal")()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async database dependency for FastAPI routes that write.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session (writer)
+    """
+    async with _get("AsyncSessionLocal")() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """
+    Async database dependency for read-only FastAPI routes.
+
+    Yields:
+        AsyncSession: SQLAlchemy async session on the read-only pool
+    """
+    async with _get("AsyncReadSessionLocal")() as db:
+        yield db
@@ -4,11 +4,50 @@ ETEx - FastAPI Application Entry Point
 This is the main FastAPI application file for the ETEx backend.
 """
 
-from fastapi import FastAPI
+import time
+
+# Process CPU time before this module's imports, so that what the launcher
+# (uvicorn, a test runner, the benchmark runner) spent before importing the
+# app is not counted as boot CPU
+_IMPORT_CPU_STARTED = time.process_time()
+
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import logging
+import sys
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+import database
+from database import get_async_db, get_async_read_db
+from models import AuthoritativeSource, ProcessingJob, Term, TermSynonym, UploadedDocument
+from schemas import DeviationCheckRequest, TermLookupRequest
+from services.browse import InvalidCursor, browse_terms, list_languages, list_sources
+from services.cache import search_cache
+from services.decompounding import find_terms_by_part
+from services.deviation import check_document, check_texts, get_deviation_checker
+from services.export import FORMATS as EXPORT_FORMATS, ExportFilters, export_chunks, export_filename
+from services.fuzzy import MAX_EDIT_DISTANCE, fuzzy_search
+from services.iate import iate_client
+from services.jobs import job_pool, job_type_for, queue_stats, submit_document
+from services.lookup import lookup_terms
+from services.metrics import MetricsMiddleware, metrics, slow_queries
+from services.responses import CompressionMiddleware, FastJSONResponse
+from services.search import SEARCH_MODES, SearchQueryError, search_terms
+from services.term_cards import get_cards
+from services.term_extractor import PRELOAD_LANGUAGES, preload_models
+from services.thesaurus import get_thesaurus
+from services.uploads import ALLOWED_FILE_TYPES, UploadTooLarge, store_upload
+
+# CPU time of this module's imports (the application and its libraries)
+_IMPORT_CPU_MS = round((time.process_time() - _IMPORT_CPU_STARTED) * 1000, 1)
 
 # Configure logging
 logging.basicConfig(
@@ -18,13 +57,93 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Libraries that should only be loaded by the work that needs them
+HEAVY_MODULES = ("spacy", "pdfplumber", "pandas", "openpyxl", "numpy", "scipy")
+
+
+@contextmanager
+def _timed(steps: dict, name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown.
+
+    Engines are created here, not when modules are imported; the IATE
+    client opens its connection pool on its first request. Startup step
+    durations are logged and served on GET /health/startup.
+    """
+    logger.info("Starting ETEx API...")
+    startup_cpu_started = time.process_time()
+    steps: dict[str, float] = {}
+
+    # Database is available via dependency injection (get_async_db,
+    # get_async_read_db). No need to create tables here - use Alembic
+    # migrations instead. The writer's first connection switches the
+    # database to WAL before any reader opens it.
+    with _timed(steps, "database_ms"):
+        async with database.async_engine.connect():
+            pass
+    logger.info("Database connection configured")
+
+    # TODO: Load configuration from environment
+
+    # spaCy models for PDF term extraction, loaded once instead of on the
+    # first document (SPACY_PRELOAD)
+    if PRELOAD_LANGUAGES:
+        with _timed(steps, "spacy_preload_ms"):
+            await run_in_threadpool(preload_models, PRELOAD_LANGUAGES)
+
+    # Background document processing (JOB_WORKERS=0: run
+    # `python -m services.jobs worker` separately instead)
+    with _timed(steps, "job_pool_ms"):
+        job_pool.start()
+
+    # Boot CPU: this module's imports (once per process) plus this
+    # startup; work done between the two (another app start in the same
+    # process, a test suite) is not counted
+    startup_cpu_ms = round((time.process_time() - startup_cpu_started) * 1000, 1)
+    app.state.startup = {
+        "boot_cpu_ms": round(_IMPORT_CPU_MS + startup_cpu_ms, 1),
+        "import_cpu_ms": _IMPORT_CPU_MS,
+        "startup_cpu_ms": startup_cpu_ms,
+        "steps": steps,
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+    logger.info(
+        f"ETEx API ready: boot CPU {app.state.startup['boot_cpu_ms']:.0f} ms, "
+        + ", ".join(f"{name} {ms:.0f}" for name, ms in steps.items())
+        + f"; heavy modules: {', '.join(app.state.startup['heavy_modules_loaded']) or 'none'}"
+    )
+
+    yield
+
+    logger.info("Shutting down ETEx API...")
+
+    # Running jobs finish their current transaction; unfinished ones are
+    # picked up again after their lease expires
+    await run_in_threadpool(job_pool.stop, 10)
+    await iate_client.close()
+    await database.dispose_engines()
+    # TODO: Cleanup resources
+
 # Create FastAPI app
 app = FastAPI(
     title="ETEx API",
     description="Engineering Terminology Explorer - Multi-language terminology search and translation system",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    # orjson rendering for every endpoint; large result payloads return
+    # FastJSONResponse directly to also skip the jsonable_encoder pass
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -42,6 +161,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip by Accept-Encoding for text and JSON bodies over
+# COMPRESSION_MIN_SIZE, streamed exports included
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency and SQL query counts for GET /metrics (outermost, so
+# the timing covers the other middleware too)
+app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -73,32 +200,554 @@ async def root():
         "version": "0.1.0"
     }
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
+# Search endpoint
+@app.get("/search", tags=["Search"])
+async def search(
+    q: str = Query(..., min_length=1, max_length=500, description="Search query"),
+    mode: str = Query("simple", description=f"Search mode: {', '.join(SEARCH_MODES)}"),
+    language: Optional[str] = Query(None, max_length=10, description="ISO 639-1 language filter"),
+    source_id: Optional[int] = Query(None, description="Authoritative source filter"),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching on the term text (ignores mode)"),
+    max_distance: Optional[int] = Query(None, ge=0, le=MAX_EDIT_DISTANCE, description="Edit budget for fuzzy search"),
+    cards: bool = Query(False, description="Attach each hit's term card (source, translations, synonyms)"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
     """
-    Application startup tasks.
+    Full-text search over term, definition and context (FTS5).
+
+    With fuzzy=true, the term text is matched within a bounded edit
+    distance instead (trigram index). Results are cached (services/cache.py);
+    cards=true adds the precomputed term cards (services/term_cards.py).
+
+    Returns:
+        dict: Query echo and ranked results
     """
-    logger.info("Starting ETEx API...")
-    logger.info("FastAPI application initialized")
+    key = search_cache.key(
+        q,
+        "fuzzy" if fuzzy else mode,
+        language_code=language,
+        source_id=source_id,
+        max_distance=max_distance,
+        limit=limit,
+        offset=offset,
+    )
+    if search_cache.needs_sync():
+        # Reads the glossary generation: not on the event loop
+        await run_in_threadpool(search_cache.sync_generation)
+    results = search_cache.get(key)
+    if results is None:
+        generation = search_cache.generation
+        if fuzzy:
+            results = await db.run_sync(
+                fuzzy_search,
+                q,
+                max_distance=max_distance,
+                language_code=language,
+                source_id=source_id,
+                limit=limit,
+                offset=offset,
+            )
+        else:
+            try:
+                results = await db.run_sync(
+                    search_terms,
+                    q,
+                    mode=mode,
+                    language_code=language,
+                    source_id=source_id,
+                    limit=limit,
+                    offset=offset,
+                )
+            except SearchQueryError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+        search_cache.put(key, results, generation)
 
-    # Database is available via dependency injection (get_db)
-    # No need to create tables here - use Alembic migrations instead
-    logger.info("Database connection configured")
+    if cards:
+        # Precomputed cards: one primary-key read for the whole page
+        term_cards = await db.run_sync(get_cards, [hit["id"] for hit in results])
+        results = [dict(hit, card=term_cards.get(hit["id"])) for hit in results]
 
-    # TODO: Load configuration from environment
-    # TODO: Initialize external API clients
+    return FastJSONResponse({
+        "query": q,
+        "mode": key.mode,
+        "count": len(results),
+        "results": results,
+    })
 
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
+@app.get("/search/cache/stats", tags=["Search"])
+def search_cache_stats():
     """
-    Application shutdown tasks.
+    Search result cache size and hit/miss/eviction counters.
+
+    Returns:
+        dict: Cache statistics
     """
-    logger.info("Shutting down ETEx API...")
+    return search_cache.stats()
 
-    # TODO: Close database connections
-    # TODO: Cleanup resources
+# Compound constituent lookup
+@app.get("/search/compounds", tags=["Search"])
+async def search_compounds(
+    part: str = Query(..., min_length=2, max_length=200, description="Constituent, e.g. 'sensor' or 'Druck'"),
+    role: Optional[str] = Query(None, pattern="^(head|modifier)$", description="'head' (…sensor) or 'modifier' (Druck…)"),
+    language: Optional[str] = Query(None, max_length=10, description="ISO 639-1 language filter"),
+    source_id: Optional[int] = Query(None, description="Authoritative source filter"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Find compound terms by constituent (decompounding index).
+
+    Returns:
+        dict: Constituent echo and matching terms
+    """
+    results = await db.run_sync(
+        find_terms_by_part,
+        part,
+        role=role,
+        language_code=language,
+        source_id=source_id,
+        limit=limit,
+        offset=offset,
+    )
+    return FastJSONResponse({
+        "part": part,
+        "role": role,
+        "count": len(results),
+        "results": results,
+    })
+
+# Browse endpoints (keyset pagination)
+async def _browse(db: AsyncSession, kind: str, value, cursor: Optional[str], limit: int) -> FastJSONResponse:
+    try:
+        page = await db.run_sync(browse_terms, kind, value, cursor=cursor, limit=limit)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse({"count": len(page["items"]), **page})
+
+
+@app.get("/browse/sources", tags=["Browse"])
+async def browse_sources(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Authoritative sources with term counts.
+
+    Returns:
+        dict: Sources ordered by tier and name
+    """
+    return {"sources": await db.run_sync(list_sources)}
+
+
+@app.get("/browse/sources/{source_id}/terms", tags=["Browse"])
+async def browse_source_terms(
+    source_id: int,
+    cursor: Optional[str] = Query(None, max_length=1000, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Terms of a source in id order, one keyset page at a time.
+
+    Returns:
+        dict: Page of list-view rows and the cursor of the next page
+    """
+    if await db.get(AuthoritativeSource, source_id) is None:
+        raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
+    return await _browse(db, "source", source_id, cursor, limit)
+
+
+@app.get("/browse/languages", tags=["Browse"])
+async def browse_languages(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Languages with term counts.
+
+    Returns:
+        dict: Languages ordered by code
+    """
+    return {"languages": await db.run_sync(list_languages)}
+
+
+@app.get("/browse/languages/{language_code}/terms", tags=["Browse"])
+async def browse_language_terms(
+    language_code: str,
+    cursor: Optional[str] = Query(None, max_length=1000, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Terms of a language in alphabetical order, one keyset page at a time.
+
+    Returns:
+        dict: Page of list-view rows and the cursor of the next page
+    """
+    return await _browse(db, "language", language_code.lower(), cursor, limit)
+
+
+@app.get("/browse/documents/{document_id}/terms", tags=["Browse"])
+async def browse_document_terms(
+    document_id: int,
+    cursor: Optional[str] = Query(None, max_length=1000, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Terms extracted from an uploaded document in id order, one keyset page at a time.
+
+    Returns:
+        dict: Page of list-view rows and the cursor of the next page
+    """
+    if await db.get(UploadedDocument, document_id) is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    return await _browse(db, "document", document_id, cursor, limit)
+
+
+# Terminology export
+@app.get("/export/{export_format}", tags=["Export"])
+async def export_terminology(
+    export_format: str,
+    source_id: Optional[int] = Query(None, description="Authoritative source filter"),
+    tier: Optional[int] = Query(None, ge=1, le=3, description="Source tier filter"),
+    source_language: Optional[str] = Query(None, max_length=10, description="Language of the exported entries"),
+    target_language: Optional[str] = Query(None, max_length=10, description="Translation language (requires source_language)"),
+    validated_by_human: Optional[bool] = Query(None, description="Only translations with this validation state"),
+    gzip: bool = Query(False, description="Compress the download (.gz)"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Stream the terminology base as TBX, CSV or JSONL (services/export.py).
+
+    Rows are read through a server-side cursor and serialized chunk by
+    chunk, so memory use does not depend on the size of the export.
+
+    Returns:
+        StreamingResponse: File download
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown export format: {export_format}")
+    if source_id is not None and await db.get(AuthoritativeSource, source_id) is None:
+        raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
+
+    filters = ExportFilters(
+        source_id=source_id,
+        tier=tier,
+        source_language=source_language.lower() if source_language else None,
+        target_language=target_language.lower() if target_language else None,
+        validated_by_human=validated_by_human,
+    )
+    try:
+        chunks = export_chunks(export_format, filters, gzip=gzip)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    filename = export_filename(export_format, filters, gzip)
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[export_format][0],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# Batch term lookup (term cards)
+@app.post("/terms/lookup", tags=["Terms"])
+async def lookup_term_cards(request: TermLookupRequest, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Resolve many (term, language) pairs to term cards at once.
+
+    Terms match on their normalized key: case, ß/umlaut spelling, hyphens
+    and leading articles do not matter. Source, translations and synonyms of all matches are loaded with a
+    fixed number of batched queries, however many pairs are requested.
+
+    Returns:
+        dict: One result per requested pair, in request order
+    """
+    results = await db.run_sync(
+        lookup_terms,
+        [(item.term, item.language) for item in request.items],
+        target_languages=request.target_languages,
+    )
+    return FastJSONResponse({
+        "count": len(results),
+        "found": sum(1 for result in results if result["found"]),
+        "results": results,
+    })
+
+# Thesaurus endpoints
+@app.get("/terms/{term_id}/synonyms", tags=["Thesaurus"])
+async def get_term_synonyms(term_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Synonym cluster, preferred term and broader/narrower/related terms.
+
+    Resolved from the in-memory thesaurus graph; term details for all
+    returned ids are loaded with a single query.
+
+    Returns:
+        dict: Thesaurus expansion with term details
+    """
+    if await db.get(Term, term_id) is None:
+        raise HTTPException(status_code=404, detail=f"Term {term_id} not found")
+
+    # A cold or stale graph is rebuilt synchronously; keep that off the event loop
+    thesaurus = await run_in_threadpool(get_thesaurus)
+    expansion = thesaurus.expand(term_id)
+    related_ids = set(expansion["synonyms"] + expansion["broader"]
+                      + expansion["narrower"] + expansion["related"])
+    if expansion["preferred_term_id"] is not None:
+        related_ids.add(expansion["preferred_term_id"])
+
+    rows = (await db.execute(
+        select(Term.id, Term.term, Term.language_code, Term.source_id)
+        .where(Term.id.in_(related_ids))
+    )).mappings()
+    expansion["terms"] = {row["id"]: dict(row) for row in rows}
+    return FastJSONResponse(expansion)
+
+
+@app.put("/synonyms/{synonym_id}/approve", tags=["Thesaurus"])
+async def approve_synonym(synonym_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Approve an auto-detected synonym link.
+
+    The thesaurus graph picks the link up incrementally on commit.
+
+    Returns:
+        dict: Approved link
+    """
+    synonym = await db.get(TermSynonym, synonym_id)
+    if synonym is None:
+        raise HTTPException(status_code=404, detail=f"Synonym link {synonym_id} not found")
+
+    if not synonym.is_approved:
+        synonym.is_approved = True
+        synonym.approved_at = func.now()
+        await db.commit()
+        await db.refresh(synonym)
+
+    return {
+        "id": synonym.id,
+        "term_id_1": synonym.term_id_1,
+        "term_id_2": synonym.term_id_2,
+        "relationship_type": synonym.relationship_type,
+        "is_approved": synonym.is_approved,
+        "approved_at": synonym.approved_at,
+    }
+
+
+@app.get("/thesaurus/stats", tags=["Thesaurus"])
+def thesaurus_stats():
+    """
+    Size and cold build time of the in-memory thesaurus graph.
+
+    Returns:
+        dict: Graph statistics
+    """
+    return get_thesaurus().stats()
+
+# Document upload and background processing
+def _job_dict(job: ProcessingJob) -> dict:
+    return {
+        "id": job.id,
+        "document_id": job.document_id,
+        "job_type": job.job_type,
+        "priority": job.priority,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@app.post("/documents/upload", status_code=202, tags=["Documents"])
+async def upload_document(
+    file: UploadFile = File(..., description="PDF, CSV/XLSX glossary or TBX export"),
+    source: Optional[str] = Form(None, max_length=100, description="Authoritative source name, e.g. NAMUR"),
+    priority: int = Form(0, ge=-100, le=100, description="Higher is processed first"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Store an uploaded document and queue it for background processing.
+
+    Returns as soon as the file is on disk and the job is queued; poll
+    ``GET /documents/{id}`` or ``GET /jobs/{id}`` for progress.
+
+    Returns:
+        dict: Document and job ids
+    """
+    original_filename = Path(file.filename or "").name
+    suffix = Path(original_filename).suffix.lower()
+    if suffix not in ALLOWED_FILE_TYPES or job_type_for(original_filename) is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type: '{suffix}'")
+
+    try:
+        filename, size = await run_in_threadpool(store_upload, file.file, original_filename)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
+    document, job = await db.run_sync(
+        submit_document,
+        filename,
+        original_filename,
+        size,
+        mime_type=file.content_type,
+        source_name=source,
+        priority=priority,
+    )
+    await db.commit()
+    job_pool.notify()
+
+    return {
+        "document_id": document.id,
+        "job_id": job.id,
+        "filename": original_filename,
+        "file_size": size,
+        "job_type": job.job_type,
+        "status": "queued",
+    }
+
+
+@app.get("/documents/{document_id}", tags=["Documents"])
+async def get_document(document_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Processing status of an uploaded document and its jobs.
+
+    Returns:
+        dict: Document metadata, status and jobs (newest first)
+    """
+    document = await db.get(UploadedDocument, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    jobs = (await db.scalars(
+        select(ProcessingJob)
+        .where(ProcessingJob.document_id == document_id)
+        .order_by(ProcessingJob.id.desc())
+    )).all()
+    return {
+        "id": document.id,
+        "original_filename": document.original_filename,
+        "file_size": document.file_size,
+        "mime_type": document.mime_type,
+        "source_id": document.source_id,
+        "processing_status": document.processing_status,
+        "error_message": document.error_message,
+        "created_at": document.created_at,
+        "processed_at": document.processed_at,
+        "jobs": [_job_dict(job) for job in jobs],
+    }
+
+
+@app.get("/documents/{document_id}/deviations", tags=["Deviations"])
+async def document_deviations(
+    document_id: int,
+    language: Optional[str] = Query(None, max_length=10, description="Only report variants of this language"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Non-preferred term variants in an uploaded PDF, with their replacements.
+
+    The PDF is re-extracted and every page is scanned in one pass against
+    the glossary automaton (services/deviation.py).
+
+    Returns:
+        dict: Hits with page, offset, matched text and preferred term
+    """
+    document = await db.get(UploadedDocument, document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    if job_type_for(document.filename) != "pdf":
+        raise HTTPException(status_code=400, detail="Deviation checking needs a PDF document")
+    hits = await run_in_threadpool(check_document, document_id, language.lower() if language else None)
+    return {"document_id": document_id, "count": len(hits), "deviations": [asdict(hit) for hit in hits]}
+
+
+@app.post("/deviations/check", tags=["Deviations"])
+async def check_deviations(request: DeviationCheckRequest):
+    """
+    Non-preferred term variants in the given page texts.
+
+    Returns:
+        dict: Hits with page (1-based), offset, matched text and preferred term
+    """
+    language = request.language.lower() if request.language else None
+    hits = await run_in_threadpool(check_texts, request.pages, language)
+    return {"count": len(hits), "deviations": [asdict(hit) for hit in hits]}
+
+
+@app.get("/deviations/stats", tags=["Deviations"])
+async def deviation_stats():
+    """
+    Size and build time of the glossary automaton (built on first use).
+
+    Returns:
+        dict: Patterns, variants, states, build_ms, stale
+    """
+    return (await run_in_threadpool(get_deviation_checker)).stats()
+
+
+@app.get("/jobs/stats", tags=["Documents"])
+async def job_stats(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Queue depth by status and in-process worker pool counters.
+
+    Returns:
+        dict: Queue and pool statistics
+    """
+    return {
+        "queue": await db.run_sync(queue_stats),
+        "pool": job_pool.stats(),
+    }
+
+
+@app.get("/jobs/{job_id}", tags=["Documents"])
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    State of a background processing job.
+
+    Returns:
+        dict: Job state
+    """
+    job = await db.get(ProcessingJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_dict(job)
+
+@app.get("/health/startup", tags=["Health"])
+def startup_report():
+    """
+    Boot CPU time (application imports plus lifespan startup), durations of
+    the startup steps and which heavy optional libraries (spaCy,
+    pdfplumber, pandas, ...) are loaded.
+
+    Returns:
+        dict: Startup report
+    """
+    return getattr(app.state, "startup", {})
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+def prometheus_metrics():
+    """
+    Request latency, status and per-request SQL query histograms by route,
+    in the Prometheus text format.
+
+    Returns:
+        str: Prometheus exposition text
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/slow-queries", tags=["Health"])
+def recent_slow_queries():
+    """
+    Most recent statements over SLOW_QUERY_MS, with route, parameters and
+    EXPLAIN QUERY PLAN.
+
+    Returns:
+        dict: Slow queries, newest first
+    """
+    entries = slow_queries()
+    return {"count": len(entries), "slow_queries": entries}
 
 if __name__ == "__main__":
     import uvicorn
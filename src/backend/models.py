@@ -25,6 +25,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -153,6 +154,12 @@ class Term(Base):
         nullable=False,
         doc="ISO 639-1 language code: 'en', 'de', 'es', etc."
     )
+    term_key: Mapped[Optional[str]] = mapped_column(
+        String(1000),
+        nullable=True,
+        doc="Normalized lookup key (case, ß/umlauts, hyphens, leading articles folded); "
+            "set on write by services/term_key.py"
+    )
     definition: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True,
@@ -280,7 +287,8 @@ class Term(Base):
         ),
         Index("idx_term_language", "term", "language_code"),
         Index("idx_term_source", "source_id"),
-        Index("idx_term_language_code", "language_code"),
+        Index("idx_term_language_term", "language_code", "term"),
+        Index("idx_term_key_language", "term_key", "language_code"),
         Index("idx_term_document", "document_id"),
     )
 
@@ -328,6 +336,27 @@ class TermSynonym(Base):
         doc="Confidence score for auto-detected synonyms (0.0-1.0)"
     )
 
+    # Review Status
+    is_approved: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=True,
+        server_default="1",
+        doc="Whether the link is approved (manual links are; auto-detected ones need review)"
+    )
+    detection_method: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        default="manual",
+        server_default="manual",
+        doc="How the link was found: 'manual', 'auto', 'co-occurrence', ..."
+    )
+    approved_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+        doc="When the link was approved"
+    )
+
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
@@ -364,6 +393,7 @@ class TermSynonym(Base):
         ),
         Index("idx_synonym_term1", "term_id_1"),
         Index("idx_synonym_term2", "term_id_2"),
+        Index("idx_synonym_approved", "is_approved"),
     )
 
     def __repr__(self) -> str:
@@ -515,6 +545,13 @@ class UploadedDocument(Base):
         nullable=True,
         doc="Error message if processing failed"
     )
+    import_checkpoint: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Data rows already imported (committed); bulk imports resume after this row"
+    )
 
     # User Information
     uploaded_by: Mapped[Optional[str]] = mapped_column(
@@ -546,6 +583,11 @@ class UploadedDocument(Base):
         back_populates="document",
         cascade="all, delete-orphan"
     )
+    jobs: Mapped[list["ProcessingJob"]] = relationship(
+        "ProcessingJob",
+        back_populates="document",
+        cascade="all, delete-orphan"
+    )
 
     # Constraints
     __table_args__ = (
@@ -560,3 +602,334 @@ class UploadedDocument(Base):
 
     def __repr__(self) -> str:
         return f"<UploadedDocument(id={self.id}, filename='{self.original_filename}', status='{self.processing_status}')>"
+
+
+class ProcessingJob(Base):
+    """
+    Persistent background job queue (document processing).
+
+    Workers claim the highest-priority runnable job atomically with
+    UPDATE ... RETURNING and hold it under a lease that they renew while
+    working; a job whose lease expires (crashed worker) becomes claimable
+    again until max_attempts is reached.
+    Maintained by services/jobs.py.
+    """
+    __tablename__ = "processing_jobs"
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # Job Definition
+    document_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("uploaded_documents.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Document to process"
+    )
+    job_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        doc="Handler: 'spreadsheet', 'tbx', 'pdf'"
+    )
+    priority: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Higher runs first; FIFO within a priority"
+    )
+
+    # Execution State
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="queued",
+        server_default="queued",
+        doc="Status: 'queued', 'running', 'completed', 'failed'"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Number of times the job was claimed"
+    )
+    max_attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=3,
+        server_default="3",
+        doc="Claims allowed before the job fails for good"
+    )
+    lease_owner: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+        doc="Worker holding the job: 'host:pid:thread'"
+    )
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+        doc="UTC time after which a running job is considered abandoned"
+    )
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        doc="UTC time before which the job is not claimed (retry backoff)"
+    )
+    error_message: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        doc="Error of the last failed attempt"
+    )
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        doc="Enqueue timestamp"
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+        doc="When the last attempt was claimed"
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+        doc="When the job completed or failed for good"
+    )
+
+    # Relationships
+    document: Mapped["UploadedDocument"] = relationship(
+        "UploadedDocument",
+        back_populates="jobs"
+    )
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'completed', 'failed')",
+            name="ck_job_status"
+        ),
+        Index("idx_job_claim", "status", "priority", "id"),
+        Index("idx_job_document", "document_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ProcessingJob(id={self.id}, type='{self.job_type}', status='{self.status}')>"
+
+
+class TermCompoundPart(Base):
+    """
+    Constituents of German compound terms (decompounding index).
+
+    One row per constituent of a decomposed term, e.g. "Drucksensor" yields
+    ('druck', modifier) and ('sensor', head). Lets head/modifier lookups run
+    as index seeks instead of leading-wildcard scans over terms.
+    Maintained by services/decompounding.py.
+    """
+    __tablename__ = "term_compound_parts"
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Term Reference
+    term_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("terms.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="Decomposed term"
+    )
+
+    # Constituent
+    part: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        doc="Lowercased constituent without linking element: 'druck', 'sensor'"
+    )
+    position: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        doc="0-based position of the constituent within the term"
+    )
+    role: Mapped[str] = mapped_column(
+        String(10),
+        nullable=False,
+        doc="Role: 'head' (last constituent) or 'modifier'"
+    )
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint(
+            "role IN ('head', 'modifier')",
+            name="ck_compound_role"
+        ),
+        Index("idx_compound_part_role", "part", "role"),
+        Index("idx_compound_term", "term_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TermCompoundPart(term_id={self.term_id}, part='{self.part}', role='{self.role}')>"
+
+
+class TermTrigram(Base):
+    """
+    Character-trigram inverted index over Term.term (fuzzy search).
+
+    One row per distinct padded trigram of the normalized term text.
+    Postings are clustered by (trigram, term_length) so that candidates for
+    a misspelled query are found by trigram overlap within the admissible
+    length window before edit distance is verified.
+    Maintained by services/fuzzy.py.
+    """
+    __tablename__ = "term_trigrams"
+
+    # Composite Primary Key (clustered: trigram postings are contiguous)
+    trigram: Mapped[str] = mapped_column(
+        String(3),
+        primary_key=True,
+        doc="Padded, casefolded character trigram: '  d', ' dr', 'dru'"
+    )
+    term_length: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        doc="Length of the normalized term (length filter inside the posting list)"
+    )
+    term_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("terms.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Term containing the trigram"
+    )
+
+    # Constraints
+    __table_args__ = (
+        Index("idx_trigram_term", "term_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self) -> str:
+        return f"<TermTrigram(trigram='{self.trigram}', term_id={self.term_id})>"
+
+
+class TermCard(Base):
+    """
+    Denormalized read model: one JSON card per term.
+
+    The card holds the term with its source badge, translations and direct
+    synonym links (the payload of services/lookup.py ``term_card``), so a
+    result page is read with one primary-key lookup per hit instead of
+    five joined tables.
+    Maintained by services/term_cards.py.
+    """
+    __tablename__ = "term_cards"
+
+    # Primary Key
+    term_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("terms.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Term the card describes"
+    )
+
+    # Card
+    card: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        doc="JSON card: term fields, source, translations, synonyms"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        doc="When the card was last rebuilt"
+    )
+
+    def __repr__(self) -> str:
+        return f"<TermCard(term_id={self.term_id})>"
+
+
+class DefinitionSignature(Base):
+    """
+    MinHash signature of a term's definition, for cross-source synonym
+    candidate discovery (services/synonym_candidates.py).
+
+    Stored so that a discovery run only has to shingle and hash the
+    definitions that are new or changed since the previous run.
+    """
+    __tablename__ = "definition_signatures"
+
+    # Primary Key
+    term_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("terms.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="Term whose definition was signed"
+    )
+
+    # Signature
+    definition_hash: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        doc="CRC32 of the signed definition text (detects edits)"
+    )
+    signature: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        doc="MinHash values, little-endian uint32 per permutation"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=func.now(),
+        server_default=func.now(),
+        doc="When the signature was computed"
+    )
+    compared_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+        doc="When the term was compared with all other signatures (NULL: pending)"
+    )
+
+    __table_args__ = (
+        Index("idx_definition_signature_pending", "compared_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<DefinitionSignature(term_id={self.term_id})>"
+
+
+class GlossaryGeneration(Base):
+    """
+    Single-row counter bumped by every transaction that changes terms,
+    synonyms, translations or sources (services/generation.py).
+
+    In-memory structures derived from the glossary (thesaurus graph,
+    deviation automaton, search cache) record the generation they were
+    built from and compare it before reuse, so writes from other processes
+    (job workers, CLI importers, suggestion runs) reach the API process.
+    """
+    __tablename__ = "glossary_generation"
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        doc="Always 1"
+    )
+
+    generation: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Number of committed glossary-changing transactions"
+    )
+
+    def __repr__(self) -> str:
+        return f"<GlossaryGeneration(generation={self.generation})>"
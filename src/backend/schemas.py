@@ -0,0 +1,35 @@
+"""
+ETEx - API Request Schemas
+
+Pydantic models for JSON request bodies. Responses are plain dicts built
+by the services and rendered with orjson (services/responses.py), without
+response models.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+MAX_LOOKUP_ITEMS = 500
+MAX_DEVIATION_PAGES = 2000
+
+
+class TermLookupItem(BaseModel):
+    term: str = Field(..., min_length=1, max_length=500, description="Term text, matched on its normalized key")
+    language: str = Field(..., min_length=2, max_length=10, description="ISO 639-1 language code")
+
+
+class TermLookupRequest(BaseModel):
+    items: list[TermLookupItem] = Field(..., min_length=1, max_length=MAX_LOOKUP_ITEMS)
+    target_languages: Optional[list[str]] = Field(
+        None, max_length=50, description="Only return translations into these languages"
+    )
+
+
+class DeviationCheckRequest(BaseModel):
+    pages: list[str] = Field(
+        ..., min_length=1, max_length=MAX_DEVIATION_PAGES, description="Page texts, page 1 first"
+    )
+    language: Optional[str] = Field(
+        None, min_length=2, max_length=10, description="Only report variants of this language"
+    )
@@ -0,0 +1 @@
+# ETEx Backend Services
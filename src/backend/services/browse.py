@@ -0,0 +1,153 @@
+"""
+ETEx - Keyset-Paginated Browsing
+
+List views over terms by source, language or document (REQUIREMENTS
+Section 9, "Browse by source").
+
+Pages are addressed by an opaque cursor holding the sort key of the last
+row, not by OFFSET, so every page is a single index seek:
+
+    by source    (source_id, id)              idx_term_source
+    by language  (language_code, term, id)    idx_term_language_term
+    by document  (document_id, id)            idx_term_document
+
+(The secondary indexes carry the rowid, which is Term.id.) Only the
+columns of the list view are selected; no ORM objects are built.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from models import AuthoritativeSource, Term
+
+LIST_COLUMNS = (
+    Term.id,
+    Term.term,
+    Term.language_code,
+    Term.source_id,
+    Term.document_id,
+    Term.part_of_speech,
+    Term.page_reference,
+    Term.confidence,
+)
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not issued for this listing."""
+
+
+def encode_cursor(kind: str, value: Any, key: list) -> str:
+    payload = json.dumps([kind, value, key], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(kind: str, value: Any, cursor: str) -> list:
+    """
+    Sort key stored in a cursor.
+
+    Raises:
+        InvalidCursor: Malformed, or issued for another listing
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_kind, cursor_value, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_kind != kind or cursor_value != value or not isinstance(key, list):
+        raise InvalidCursor("Cursor belongs to a different listing")
+    return key
+
+
+def browse_terms(
+    db: Session,
+    kind: str,
+    value: Any,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    """
+    One page of terms of a source, language or document.
+
+    Args:
+        db: Database session
+        kind: 'source', 'language' or 'document'
+        value: Source id, language code or document id
+        cursor: ``next_cursor`` of the previous page, None for the first
+        limit: Page size
+
+    Returns:
+        dict: ``items`` (list-view columns) and ``next_cursor`` (None on
+        the last page)
+
+    Raises:
+        InvalidCursor: Cursor not issued for this listing
+    """
+    key = decode_cursor(kind, value, cursor) if cursor else None
+    stmt = select(*LIST_COLUMNS).limit(limit + 1)
+
+    if kind == "source":
+        stmt = stmt.where(Term.source_id == value).order_by(Term.id)
+    elif kind == "document":
+        stmt = stmt.where(Term.document_id == value).order_by(Term.id)
+    elif kind == "language":
+        stmt = stmt.where(Term.language_code == value).order_by(Term.term, Term.id)
+    else:
+        raise ValueError(f"Unknown browse kind: {kind}")
+
+    if key is not None:
+        try:
+            if kind == "language":
+                term, last_id = key
+                stmt = stmt.where(tuple_(Term.term, Term.id) > tuple_(str(term), int(last_id)))
+            else:
+                (last_id,) = key
+                stmt = stmt.where(Term.id > int(last_id))
+        except (TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
+
+    rows = [dict(row) for row in db.execute(stmt).mappings()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_key = [last["term"], last["id"]] if kind == "language" else [last["id"]]
+        next_cursor = encode_cursor(kind, value, next_key)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def list_sources(db: Session) -> list[dict]:
+    """Authoritative sources with their term counts (browse entry points)."""
+    counts = (
+        select(Term.source_id, func.count().label("term_count"))
+        .where(Term.source_id.is_not(None))
+        .group_by(Term.source_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            AuthoritativeSource.id,
+            AuthoritativeSource.name,
+            AuthoritativeSource.display_name,
+            AuthoritativeSource.tier,
+            func.coalesce(counts.c.term_count, 0).label("term_count"),
+        )
+        .outerjoin(counts, counts.c.source_id == AuthoritativeSource.id)
+        .order_by(AuthoritativeSource.tier, AuthoritativeSource.name)
+    )
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def list_languages(db: Session) -> list[dict]:
+    """Languages with their term counts."""
+    stmt = (
+        select(Term.language_code, func.count().label("term_count"))
+        .group_by(Term.language_code)
+        .order_by(Term.language_code)
+    )
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
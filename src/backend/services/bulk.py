@@ -0,0 +1,180 @@
+"""
+ETEx - Bulk Write Helpers
+
+SQLAlchemy Core batch inserts for importers.
+
+Core ``executemany`` inserts are an order of magnitude faster than adding
+ORM objects one by one, but they bypass the mapper events that keep the
+side indexes current (term keys, compound parts, trigrams, term cards,
+glossary generation, thesaurus, deviation automaton, search cache). The helpers here are the
+Core-path equivalent of those events: every importer writes through them
+so both paths leave the database in the same state.
+"""
+
+from typing import Optional
+
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+
+from models import AuthoritativeSource, Term, TermSynonym, Translation
+from services import decompounding, fuzzy, generation, term_cards
+from services.cache import search_cache
+from services.deviation import invalidate_deviation_checker
+from services.term_key import term_key
+from services.thesaurus import invalidate_thesaurus
+
+
+def get_or_create_source(
+    connection: Connection,
+    name: str,
+    display_name: Optional[str] = None,
+    source_type: str = "database",
+    tier: int = 1,
+) -> int:
+    """
+    Look up an authoritative source by name, creating it if missing.
+
+    Returns:
+        int: AuthoritativeSource id
+    """
+    source_id = connection.execute(
+        select(AuthoritativeSource.id).where(AuthoritativeSource.name == name)
+    ).scalar_one_or_none()
+    if source_id is not None:
+        return source_id
+    return connection.execute(
+        insert(AuthoritativeSource)
+        .values(
+            name=name,
+            display_name=display_name or name,
+            source_type=source_type,
+            tier=tier,
+        )
+        .returning(AuthoritativeSource.id)
+    ).scalar_one()
+
+
+def insert_terms(connection: Connection, rows: list[dict]) -> list[int]:
+    """
+    Insert terms in one executemany batch and index them.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        rows: Term column dicts (all with the same keys)
+
+    Returns:
+        list[int]: New term ids, in the order of rows
+    """
+    if not rows:
+        return []
+
+    # SQLite cannot return executemany ids in parameter order without a
+    # row-at-a-time fallback. Insert the first row alone instead: it takes
+    # the write lock and gets id MAX(id) + 1, so the rest of the batch can
+    # use the following ids explicitly in one true executemany.
+    keys = [term_key(row["term"], row["language_code"]) for row in rows]
+    first_id = connection.execute(
+        insert(Term).returning(Term.id), dict(rows[0], term_key=keys[0])
+    ).scalar_one()
+    ids = list(range(first_id, first_id + len(rows)))
+    if len(rows) > 1:
+        connection.execute(
+            insert(Term),
+            [
+                dict(row, id=term_id, term_key=key)
+                for term_id, row, key in zip(ids[1:], rows[1:], keys[1:])
+            ],
+        )
+
+    decompounding.index_terms(
+        connection,
+        ((term_id, row["term"], row["language_code"]) for term_id, row in zip(ids, rows)),
+        replace=False,
+    )
+    fuzzy.index_terms(
+        connection,
+        ((term_id, row["term"]) for term_id, row in zip(ids, rows)),
+        replace=False,
+    )
+    term_cards.mark_terms(connection, ids)
+    generation.mark_changed(connection)
+    return ids
+
+
+def set_preferred_terms(connection: Connection, pairs: list[tuple[int, int]]) -> None:
+    """Batch-update Term.preferred_term_id from (term_id, preferred_term_id) pairs."""
+    if not pairs:
+        return
+    connection.execute(
+        update(Term)
+        .where(Term.id == bindparam("term_id"))
+        .values(preferred_term_id=bindparam("preferred_id")),
+        [{"term_id": term_id, "preferred_id": preferred_id} for term_id, preferred_id in pairs],
+    )
+    term_cards.mark_terms(connection, (term_id for term_id, _ in pairs))
+    generation.mark_changed(connection)
+
+
+def insert_synonyms(connection: Connection, rows: list[dict]) -> None:
+    """Insert TermSynonym rows, skipping pairs that already exist."""
+    if rows:
+        connection.execute(sqlite_insert(TermSynonym).on_conflict_do_nothing(), rows)
+        term_cards.mark_terms(connection, (row[key] for row in rows for key in ("term_id_1", "term_id_2")))
+        generation.mark_changed(connection)
+
+
+def refine_related(connection: Connection, rows: list[dict]) -> None:
+    """
+    Set relationship_type on existing 'related' links, e.g. to 'broader'
+    once a hierarchical reference for the pair is seen. Rows give
+    term_id_1, term_id_2 and relationship_type; other relationships are
+    left alone.
+    """
+    if not rows:
+        return
+    connection.execute(
+        update(TermSynonym)
+        .where(
+            TermSynonym.term_id_1 == bindparam("id_1"),
+            TermSynonym.term_id_2 == bindparam("id_2"),
+            TermSynonym.relationship_type == "related",
+        )
+        .values(relationship_type=bindparam("relation")),
+        [
+            {"id_1": row["term_id_1"], "id_2": row["term_id_2"], "relation": row["relationship_type"]}
+            for row in rows
+        ],
+    )
+    term_cards.mark_terms(connection, (row[key] for row in rows for key in ("term_id_1", "term_id_2")))
+    generation.mark_changed(connection)
+
+
+def linked_pairs(connection: Connection, term_ids: set[int]) -> set[tuple[int, int]]:
+    """(smaller id, larger id) pairs among the given terms already in term_synonyms, any relationship."""
+    linked: set[tuple[int, int]] = set()
+    ids = sorted(term_ids)
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        for term_id_1, term_id_2 in connection.execute(
+            select(TermSynonym.term_id_1, TermSynonym.term_id_2).where(
+                or_(TermSynonym.term_id_1.in_(batch), TermSynonym.term_id_2.in_(batch))
+            )
+        ):
+            linked.add((min(term_id_1, term_id_2), max(term_id_1, term_id_2)))
+    return linked
+
+
+def insert_translations(connection: Connection, rows: list[dict]) -> None:
+    """Insert Translation rows, skipping pairs that already exist."""
+    if rows:
+        connection.execute(sqlite_insert(Translation).on_conflict_do_nothing(), rows)
+        term_cards.mark_terms(connection, (row["source_term_id"] for row in rows))
+        generation.mark_changed(connection)
+
+
+def finish_bulk_write() -> None:
+    """Refresh in-memory state after a bulk write has committed."""
+    invalidate_thesaurus()
+    invalidate_deviation_checker()
+    search_cache.clear()
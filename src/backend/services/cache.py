@@ -0,0 +1,396 @@
+"""
+ETEx - Search Result Cache
+
+In-process LRU cache for ``GET /search`` results with a TTL, bounded by
+entry count and by (estimated) memory.
+
+Keys are the normalized query (casefolded, whitespace collapsed) plus mode,
+language, source, edit budget and paging. Cached entries are invalidated
+precisely when the transaction that changes their data commits:
+
+- Term updated/deleted, or a TermSynonym / Translation touching a term:
+  entries whose results contain that term
+- Term inserted (or its text, language or source changed): entries whose
+  filters admit the term and whose query words occur in its text (fuzzy
+  entries: whose query is within the edit budget of the term; exact
+  entries: whose query keys include the term's key)
+- AuthoritativeSource updated/deleted: entries filtered on or returning
+  that source
+- Core bulk writes: services/bulk.py clears the whole cache
+- Writes committed by other processes (job workers, CLI importers): the
+  whole cache is cleared once the glossary generation
+  (services/generation.py) has moved past the entries' generation. The
+  check may read the database, so callers on the event loop run
+  ``sync_generation()`` in the threadpool when ``needs_sync()`` says so
+
+Writes that change what a later page (offset > 0) contains are matched
+against the old term text as well, since they shift page boundaries.
+
+Configuration (environment): SEARCH_CACHE_MAX_ENTRIES (0 disables),
+SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_TTL (seconds).
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import AuthoritativeSource, Term, TermSynonym, Translation
+from services.fuzzy import MAX_EDIT_DISTANCE, bounded_distance, default_max_distance, normalize
+from services.generation import committed_generation, current_generation, generation_due
+from services.term_key import query_keys, term_key
+
+_SESSION_KEY = "search_cache_changes"
+
+# More changed terms than this in one commit: clear instead of matching
+_MAX_SCOPED_TERMS = 256
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_TEXT_COLUMNS = ("term", "definition", "context")
+_FILTER_COLUMNS = ("language_code", "source_id")
+
+# Column values of a deleted term that was not loaded: matches everything
+_UNKNOWN: dict = {}
+
+
+class CacheKey(NamedTuple):
+    query: str
+    mode: str
+    language_code: Optional[str]
+    source_id: Optional[int]
+    max_distance: Optional[int]
+    limit: int
+    offset: int
+
+
+def fold(value: str) -> str:
+    """Casefold and strip diacritics, like the FTS5 unicode61 tokenizer."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _estimate_size(results: list[dict]) -> int:
+    size = sys.getsizeof(results)
+    for hit in results:
+        size += sys.getsizeof(hit) + sum(sys.getsizeof(value) for value in hit.values())
+    return size
+
+
+class _Entry:
+    __slots__ = ("results", "expires", "size", "term_ids", "source_ids", "words")
+
+    def __init__(self, results: list[dict], expires: float, words: frozenset):
+        self.results = results
+        self.expires = expires
+        self.size = _estimate_size(results)
+        self.term_ids = frozenset(hit["id"] for hit in results)
+        self.source_ids = frozenset(hit.get("source_id") for hit in results)
+        self.words = words
+
+
+class SearchCache:
+    """Thread-safe LRU + TTL cache of search result lists."""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; results computed under an older
+        # generation may predate the write and are not stored
+        self.generation = 0
+        # Glossary generation the entries were computed under
+        self.glossary_generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(
+        query: str,
+        mode: str,
+        language_code: Optional[str] = None,
+        source_id: Optional[int] = None,
+        max_distance: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> CacheKey:
+        """Build a cache key; ``mode`` is 'fuzzy' for fuzzy searches."""
+        needle = normalize(query)
+        if mode == "fuzzy":
+            if max_distance is None:
+                max_distance = default_max_distance(needle)
+            max_distance = max(0, min(max_distance, MAX_EDIT_DISTANCE))
+        else:
+            max_distance = None
+        return CacheKey(needle, mode, language_code, source_id, max_distance, limit, offset)
+
+    # Lookup and storage
+
+    def get(self, key: CacheKey) -> Optional[list[dict]]:
+        """Cached results for key, or None (counts a hit or a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.results
+
+    def put(self, key: CacheKey, results: list[dict], generation: int) -> None:
+        """
+        Store results computed while ``self.generation`` was ``generation``.
+
+        Skipped if an invalidation happened in between, or if the entry
+        alone exceeds the memory bound.
+        """
+        if not self.enabled:
+            return
+        if key.mode == "exact":
+            words = frozenset(query_keys(key.query, key.language_code))
+        else:
+            words = frozenset(_WORD_RE.findall(fold(key.query)))
+        entry = _Entry(results, time.monotonic() + self.ttl, words)
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def needs_sync(self) -> bool:
+        """Is a ``sync_generation()`` due? Never touches the database."""
+        return self.enabled and (self.glossary_generation is None or generation_due())
+
+    def sync_generation(self) -> None:
+        """
+        Clear the cache if another process changed the glossary. Reads the
+        generation row at most once per GLOSSARY_GENERATION_CHECK, but that
+        read blocks: call it off the event loop.
+        """
+        current = current_generation()
+        if current != self.glossary_generation:
+            if self.glossary_generation is not None:
+                self.clear()
+            self.glossary_generation = current
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "glossary_generation": self.glossary_generation,
+        }
+
+    # Invalidation
+
+    def invalidate(self, changes: Iterable[tuple]) -> int:
+        """
+        Drop the entries affected by committed changes.
+
+        Args:
+            changes: Tuples queued by the mapper events below
+
+        Returns:
+            int: Number of entries removed
+        """
+        changes = list(changes)
+        if sum(1 for change in changes if change[0] == "term") > _MAX_SCOPED_TERMS:
+            removed = len(self._entries)
+            self.clear()
+            return removed
+
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key, entry in self._entries.items()
+                if any(_affects(key, entry, change) for change in changes)
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+
+def _matches_text(key: CacheKey, entry: _Entry, values: Optional[dict]) -> bool:
+    """Could a term with these column values appear in the entry's results?"""
+    if values is None:
+        return False
+    if values is _UNKNOWN:
+        return True
+    if key.language_code is not None and values["language_code"] != key.language_code:
+        return False
+    if key.source_id is not None and values["source_id"] != key.source_id:
+        return False
+    if key.mode == "fuzzy":
+        return bounded_distance(key.query, normalize(values["term"] or ""), key.max_distance) is not None
+    if key.mode == "exact":
+        # Exact entries hold the query's term keys: "Zaehlwerkgeraet" must
+        # be invalidated by a new "Zählwerkgerät"
+        return term_key(values["term"] or "", values["language_code"] or "") in entry.words
+    if not entry.words:
+        return True
+    # Substring, not word equality: covers prefix (wildcard) and compound
+    # head queries; extra invalidations are harmless, missed ones are not
+    text = fold(" ".join(values[name] or "" for name in _TEXT_COLUMNS))
+    return any(word in text for word in entry.words)
+
+
+def _affects(key: CacheKey, entry: _Entry, change: tuple) -> bool:
+    kind = change[0]
+    if kind == "term":
+        _, term_id, old, new = change
+        if term_id in entry.term_ids or _matches_text(key, entry, new):
+            return True
+        return key.offset > 0 and _matches_text(key, entry, old)
+    if kind == "terms":
+        return not entry.term_ids.isdisjoint(change[1])
+    if kind == "source":
+        return key.source_id == change[1] or change[1] in entry.source_ids
+    return True
+
+
+def _cache_size(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+search_cache = SearchCache(
+    max_entries=_cache_size("SEARCH_CACHE_MAX_ENTRIES", 10000),
+    max_bytes=_cache_size("SEARCH_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "300")),
+)
+
+
+# Collect changes during flush, apply them once the transaction commits
+
+def _queue(session: Session, change: tuple) -> None:
+    if search_cache.enabled:
+        session.info.setdefault(_SESSION_KEY, []).append(change)
+
+
+def _term_values(target: Term, old: bool = False, inserted: bool = False) -> dict:
+    # Read loaded state only: a flush must not trigger attribute loads.
+    # Columns never set on a new term are NULL; on existing terms they are
+    # merely not loaded.
+    state = inspect(target)
+    values = {}
+    for name in _TEXT_COLUMNS + _FILTER_COLUMNS:
+        history = state.attrs[name].history
+        if old and history.deleted:
+            values[name] = history.deleted[0]
+        elif name in state.dict:
+            values[name] = state.dict[name]
+        elif inserted:
+            values[name] = None
+        else:
+            return _UNKNOWN
+    return values
+
+
+@event.listens_for(Term, "after_insert")
+def _term_inserted(mapper, connection, target):
+    _queue(inspect(target).session, ("term", target.id, None, _term_values(target, inserted=True)))
+
+
+@event.listens_for(Term, "after_update")
+def _term_updated(mapper, connection, target):
+    state = inspect(target)
+    searchable = any(
+        state.attrs[name].history.has_changes() for name in _TEXT_COLUMNS + _FILTER_COLUMNS
+    )
+    if searchable:
+        change = ("term", target.id, _term_values(target, old=True), _term_values(target))
+    else:
+        change = ("terms", (target.id,))
+    _queue(state.session, change)
+
+
+@event.listens_for(Term, "after_delete")
+def _term_deleted(mapper, connection, target):
+    _queue(inspect(target).session, ("term", target.id, _term_values(target, old=True), None))
+
+
+@event.listens_for(TermSynonym, "after_insert")
+@event.listens_for(TermSynonym, "after_update")
+@event.listens_for(TermSynonym, "after_delete")
+def _synonym_written(mapper, connection, target):
+    _queue(inspect(target).session, ("terms", (target.term_id_1, target.term_id_2)))
+
+
+@event.listens_for(Translation, "after_insert")
+@event.listens_for(Translation, "after_update")
+@event.listens_for(Translation, "after_delete")
+def _translation_written(mapper, connection, target):
+    _queue(inspect(target).session, ("terms", (target.source_term_id, target.target_term_id)))
+
+
+@event.listens_for(AuthoritativeSource, "after_update")
+@event.listens_for(AuthoritativeSource, "after_delete")
+def _source_written(mapper, connection, target):
+    _queue(inspect(target).session, ("source", target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session):
+    changes = session.info.pop(_SESSION_KEY, None)
+    generation = committed_generation()
+    if generation is not None and search_cache.glossary_generation != generation - 1:
+        # Another process committed in between: its changes are unknown
+        search_cache.clear()
+    elif changes:
+        search_cache.invalidate(changes)
+    if generation is not None:
+        search_cache.glossary_generation = generation
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _session_rolled_back(session, previous_transaction):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,335 @@
+"""
+ETEx - German Compound Decomposition
+
+Dictionary-driven splitting of German compound terms into their
+constituents, e.g. "Drucksensor" -> druck + sensor,
+"Sicherheitsventil" -> sicherheit (+s) + ventil.
+
+The constituents are stored in ``term_compound_parts`` so that
+"every term ending in -sensor" (head lookup) or "every term starting with
+Druck-" (modifier lookup) is an index seek on ``idx_compound_part_role``
+instead of a leading-wildcard scan over ``terms``.
+
+The index is maintained automatically:
+- ORM writes: mapper events on Term (registered when this module is imported)
+- Existing rows: ``python -m services.decompounding rebuild``
+"""
+
+import argparse
+import logging
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+import database
+from models import Term, TermCompoundPart
+
+logger = logging.getLogger(__name__)
+
+# Only German terms are decomposed
+COMPOUND_LANGUAGES = ("de",)
+
+# Linking elements (Fugenelemente) allowed between two constituents.
+# Longer elements first so "es" is tried before "s".
+LINKING_ELEMENTS = ("es", "s")
+
+# Constituents shorter than this are never split off
+MIN_PART_LENGTH = 3
+
+# Built-in lexicon of German measurement/automation/electrical morphemes.
+# Extend it with a word-per-line file via ETEX_DECOMPOUND_LEXICON.
+BASE_LEXICON = frozenset({
+    # Measurement & instrumentation
+    "druck", "sensor", "mess", "messung", "umformer", "aufnehmer", "geber",
+    "fühler", "wandler", "temperatur", "durchfluss", "füll", "stand", "niveau",
+    "grenz", "wert", "bereich", "kalibrierung", "genauigkeit", "auflösung",
+    "empfindlichkeit", "drift", "null", "spanne", "kennlinie", "anzeige",
+    "zähler", "prüf", "prüfung", "differenz", "absolut", "relativ",
+    "schwingung", "vibration", "schall", "dichte", "feuchte", "leitfähigkeit",
+    # Process & control
+    "ventil", "stell", "stellung", "antrieb", "regel", "regler", "regelung", "steuer",
+    "steuerung", "signal", "prozess", "anlage", "automatisierung", "leit",
+    "technik", "betrieb", "modus", "zustand", "meldung", "alarm", "fehler",
+    "diagnose", "überwachung", "sicherheit", "schutz", "abschaltung",
+    "soll", "ist", "abweichung", "führung", "größe", "zeit", "verzögerung",
+    "hand", "auto", "hilf", "energie", "pumpe", "motor", "verdichter",
+    "gebläse", "klappe", "schieber", "hahn", "armatur", "position", "weg",
+    "winkel", "lage", "dreh", "zahl", "moment", "kraft", "last", "gewicht",
+    # Media & mechanics
+    "luft", "gas", "wasser", "dampf", "flüssigkeit", "medium", "rohr",
+    "leitung", "behälter", "tank", "kessel", "wärme", "kälte", "tauscher",
+    "übertrager", "strömung", "geschwindigkeit", "membran", "dichtung",
+    "flansch", "anschluss", "gewinde", "werkstoff", "material", "gehäuse",
+    "kammer", "kolben", "feder", "lager", "welle", "getriebe",
+    # Electrical
+    "spannung", "strom", "versorgung", "kreis", "netz", "frequenz",
+    "umrichter", "leistung", "verlust", "widerstand", "kondensator", "spule",
+    "transformator", "isolation", "erdung", "kurzschluss", "relais",
+    "schütz", "sicherung", "schalter", "kabel", "klemme", "stecker",
+    "schnittstelle", "bus", "feld", "gerät", "einheit", "system", "modul",
+    "baugruppe", "ausgang", "eingang", "analog", "digital", "impuls",
+    "magnet", "induktiv", "kapazitiv", "licht", "optik", "strahl",
+    # General
+    "daten", "blatt", "typ", "schild", "nenn", "mittel", "höchst", "mindest",
+    "arbeit", "punkt", "norm", "land", "tag", "art", "teil", "stück",
+    "richtung", "ordnung", "lauf",
+})
+
+_TOKEN_SPLIT_RE = re.compile(r"[\s\-/]+")
+
+
+def _load_lexicon() -> frozenset:
+    """Base lexicon plus optional extension file from the environment."""
+    extra_path = os.getenv("ETEX_DECOMPOUND_LEXICON")
+    if not extra_path:
+        return BASE_LEXICON
+    path = Path(extra_path)
+    if not path.is_file():
+        logger.warning(f"Decompounding lexicon not found: {path}")
+        return BASE_LEXICON
+    words = {
+        line.strip().lower()
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.startswith("#")
+    }
+    return BASE_LEXICON | frozenset(words)
+
+
+LEXICON = _load_lexicon()
+_MAX_PART_LENGTH = max(map(len, LEXICON))
+
+
+@lru_cache(maxsize=65536)
+def split_word(word: str) -> tuple[str, ...]:
+    """
+    Split a single German word into lexicon constituents.
+
+    Picks the segmentation with the fewest constituents, then the fewest
+    linking elements. Linking elements (-s, -es) are dropped from the
+    returned constituents.
+
+    Args:
+        word: A single word (no whitespace or hyphens)
+
+    Returns:
+        tuple[str, ...]: Lowercased constituents; a single element if the
+        word is not a recognised compound
+    """
+    word = word.lower()
+    n = len(word)
+    lexicon = LEXICON
+
+    # best[i] = (parts, links, constituents) for the suffix word[i:]
+    best: list[Optional[tuple[int, int, tuple[str, ...]]]] = [None] * (n + 1)
+    best[n] = (0, 0, ())
+
+    for i in range(n - 1, -1, -1):
+        candidates = []
+        for j in range(i + MIN_PART_LENGTH, min(n, i + _MAX_PART_LENGTH) + 1):
+            part = word[i:j]
+            if part not in lexicon:
+                continue
+            # Constituent directly followed by the rest
+            rest = best[j]
+            if rest is not None:
+                candidates.append((rest[0] + 1, rest[1], (part,) + rest[2]))
+            # Constituent followed by a linking element, then the rest
+            if j == n:
+                continue
+            for link in LINKING_ELEMENTS:
+                k = j + len(link)
+                if k < n and word.startswith(link, j) and best[k] is not None:
+                    rest = best[k]
+                    candidates.append((rest[0] + 1, rest[1] + 1, (part,) + rest[2]))
+        if candidates:
+            best[i] = min(candidates, key=lambda c: (c[0], c[1]))
+
+    result = best[0]
+    if result is None or result[0] < 2:
+        return (word,)
+    return result[2]
+
+
+def decompose(term: str, language_code: str) -> list[tuple[str, str]]:
+    """
+    Decompose a term into (part, role) pairs.
+
+    Multi-word and hyphenated terms are split into words first; every word
+    is then decomposed. The last constituent of the last word is the head,
+    all others are modifiers.
+
+    Args:
+        term: Term text
+        language_code: ISO 639-1 code of the term
+
+    Returns:
+        list[tuple[str, str]]: Constituents in order; empty if the term is
+        not a compound (a single constituent carries no extra information)
+    """
+    if language_code not in COMPOUND_LANGUAGES:
+        return []
+
+    parts: list[str] = []
+    for token in _TOKEN_SPLIT_RE.split(term.strip()):
+        if token:
+            parts.extend(split_word(token))
+
+    if len(parts) < 2:
+        return []
+    return [(part, "modifier") for part in parts[:-1]] + [(parts[-1], "head")]
+
+
+def _part_rows(term_id: int, term: str, language_code: str) -> list[dict]:
+    return [
+        {"term_id": term_id, "part": part, "position": position, "role": role}
+        for position, (part, role) in enumerate(decompose(term, language_code))
+    ]
+
+
+def index_terms(
+    connection: Connection,
+    rows: Iterable[tuple[int, str, str]],
+    replace: bool = True,
+) -> int:
+    """
+    (Re)index compound parts for the given terms.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        rows: (term_id, term, language_code) tuples
+        replace: Remove existing parts first (False for brand-new terms)
+
+    Returns:
+        int: Number of part rows written
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    if replace:
+        term_ids = [row[0] for row in rows]
+        connection.execute(
+            delete(TermCompoundPart).where(TermCompoundPart.term_id.in_(term_ids))
+        )
+
+    part_rows = [part for row in rows for part in _part_rows(*row)]
+    if part_rows:
+        connection.execute(insert(TermCompoundPart), part_rows)
+    return len(part_rows)
+
+
+def find_terms_by_part(
+    db: Session,
+    part: str,
+    role: Optional[str] = None,
+    language_code: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """
+    Find terms that contain a constituent, optionally in a given role.
+
+    Args:
+        db: Database session
+        part: Constituent to look up, e.g. 'sensor' or 'Druck'
+        role: 'head', 'modifier' or None for either
+        language_code: Optional language filter
+        source_id: Optional authoritative source filter
+        limit: Maximum number of hits
+        offset: Number of hits to skip
+
+    Returns:
+        list[dict]: Matching terms ordered by term text
+    """
+    stmt = (
+        select(
+            Term.id,
+            Term.term,
+            Term.language_code,
+            Term.definition,
+            Term.context,
+            Term.source_id,
+            Term.preferred_term_id,
+            Term.confidence,
+        )
+        .join(TermCompoundPart, TermCompoundPart.term_id == Term.id)
+        .where(TermCompoundPart.part == part.lower())
+        .distinct()
+        .order_by(Term.term, Term.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    if role is not None:
+        stmt = stmt.where(TermCompoundPart.role == role)
+    if language_code is not None:
+        stmt = stmt.where(Term.language_code == language_code)
+    if source_id is not None:
+        stmt = stmt.where(Term.source_id == source_id)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def rebuild_compound_index(connection: Connection, batch_size: int = 5000) -> int:
+    """
+    Rebuild the compound index for every term in a compound language.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        batch_size: Terms read per batch
+
+    Returns:
+        int: Number of part rows written
+    """
+    connection.execute(delete(TermCompoundPart))
+    result = connection.execution_options(yield_per=batch_size).execute(
+        select(Term.id, Term.term, Term.language_code)
+        .where(Term.language_code.in_(COMPOUND_LANGUAGES))
+    )
+    written = 0
+    for batch in result.partitions():
+        part_rows = [part for row in batch for part in _part_rows(*row)]
+        if part_rows:
+            connection.execute(insert(TermCompoundPart), part_rows)
+            written += len(part_rows)
+    return written
+
+
+# Keep the index in sync with ORM writes to Term
+
+@event.listens_for(Term, "after_insert")
+def _index_inserted_term(mapper, connection, target):
+    index_terms(connection, [(target.id, target.term, target.language_code)])
+
+
+@event.listens_for(Term, "after_update")
+def _index_updated_term(mapper, connection, target):
+    state = inspect(target)
+    if (
+        state.attrs.term.history.has_changes()
+        or state.attrs.language_code.history.has_changes()
+    ):
+        index_terms(connection, [(target.id, target.term, target.language_code)])
+
+
+@event.listens_for(Term, "after_delete")
+def _unindex_deleted_term(mapper, connection, target):
+    connection.execute(
+        delete(TermCompoundPart).where(TermCompoundPart.term_id == target.id)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETEx compound index maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.engine.begin() as conn:
+        count = rebuild_compound_index(conn)
+    logger.info(f"Compound index rebuilt: {count} parts")
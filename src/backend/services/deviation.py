@@ -0,0 +1,420 @@
+"""
+ETEx - Glossary Deviation Checking
+
+Finds non-preferred term variants in document text and names the
+preferred replacement (REQUIREMENTS "deviation checking": compare
+document terms against the approved glossary).
+
+- Every Term with a ``preferred_term_id`` is a pattern; the preferred
+  term is its replacement.
+- Patterns and text are compared as normalized word tokens: casefolded,
+  umlauts transliterated (``ä`` -> ``ae``, ``ß`` -> ``ss``) and other
+  diacritics dropped, so "Durchflußmesser", "DURCHFLUSSMESSER" and
+  "Durchflussmesser" are the same pattern.
+- All patterns are compiled into one Aho-Corasick automaton whose alphabet
+  is the token vocabulary. A page is scanned in one pass over its tokens,
+  whatever the number of patterns, and matches always sit on word
+  boundaries ("Sensor" is not reported inside "Drucksensor").
+- Overlapping matches are resolved leftmost-longest.
+
+The automaton is built once and shared. Glossary changes (committed ORM
+writes to terms, bulk imports via ``bulk.finish_bulk_write()``) mark it
+stale; it is rebuilt on next use. Writes committed by other processes are
+noticed through the glossary generation (services/generation.py).
+
+Usage:
+    python -m services.deviation check data/uploads/ne107.pdf --language de
+    python -m services.deviation stats
+"""
+
+import argparse
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased
+
+import database
+from models import Term
+from services.generation import committed_generation, current_generation, read_generation
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "deviation_glossary_changed"
+
+_TOKEN_RE = re.compile(r"\w+")
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+
+# Term columns that change patterns or replacements
+_GLOSSARY_COLUMNS = ("term", "language_code", "preferred_term_id")
+
+
+def fold_text(text: str) -> str:
+    """'Größe' -> 'groesse': casefold, transliterate umlauts, drop other diacritics."""
+    folded = unicodedata.normalize("NFC", text).casefold().translate(_UMLAUTS)
+    if folded.isascii():
+        return folded
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+@lru_cache(maxsize=100_000)
+def normalize_token(token: str) -> str:
+    """``fold_text`` of one word token, cached (the vocabulary is small)."""
+    return fold_text(token)
+
+
+def tokenize(text: str) -> Iterator[tuple[str, int, int]]:
+    """Normalized word tokens with their (start, end) offsets in ``text``."""
+    for match in _TOKEN_RE.finditer(text):
+        yield normalize_token(match.group()), match.start(), match.end()
+
+
+def pattern_key(term: str) -> tuple[str, ...]:
+    return tuple(token for token, _, _ in tokenize(term))
+
+
+class Variant(NamedTuple):
+    term_id: int
+    term: str
+    language_code: str
+    preferred_term_id: int
+    preferred_term: str
+
+
+@dataclass
+class DeviationHit:
+    page_number: int
+    offset: int  # character offset in the page text
+    length: int
+    text: str  # as written in the document
+    term_id: int
+    term: str
+    language_code: str
+    preferred_term_id: int
+    replacement: str
+
+
+class DeviationChecker:
+    """Aho-Corasick automaton over the normalized tokens of all non-preferred terms."""
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = array("l", [0])
+        # Pattern spelled by each state (-1: none)
+        self._own = array("l", [-1])
+        # Pattern indexes ending in each state, including those reached
+        # through failure links
+        self._outputs: list[tuple[int, ...]] = [()]
+        self._lengths = array("l")  # tokens per pattern
+        self._variants: list[tuple[Variant, ...]] = []
+        self.stale = False
+        # Glossary generation the automaton reflects (services/generation.py)
+        self.generation = 0
+        self.build_seconds = 0.0
+
+    # Construction
+
+    @classmethod
+    def build(cls, connection: Connection) -> "DeviationChecker":
+        """
+        Compile all terms that have a preferred term.
+
+        Args:
+            connection: Database connection
+
+        Returns:
+            DeviationChecker: Ready automaton with build_seconds set
+        """
+        started = time.perf_counter()
+        generation = read_generation(connection)
+        preferred = aliased(Term)
+        rows = connection.execute(
+            select(Term.id, Term.term, Term.language_code, preferred.id, preferred.term)
+            .join(preferred, preferred.id == Term.preferred_term_id)
+            .where(Term.id != Term.preferred_term_id)
+            .order_by(Term.id)
+        )
+        checker = cls()
+        checker.add_variants(Variant(*row) for row in rows)
+        checker.generation = generation
+        checker.build_seconds = time.perf_counter() - started
+        logger.info(
+            f"Deviation automaton built: {len(checker._variants)} patterns, "
+            f"{len(checker._goto)} states in {checker.build_seconds * 1000:.1f} ms"
+        )
+        return checker
+
+    def add_variants(self, variants: Iterable[Variant]) -> None:
+        """Insert variants and (re)compute the failure links."""
+        grouped: list[list[Variant]] = [list(group) for group in self._variants]
+        replacements = {
+            (pattern, variant.preferred_term) for pattern, group in enumerate(grouped) for variant in group
+        }
+        for variant in variants:
+            key = pattern_key(variant.term)
+            # Spelling variants of the preferred term itself are not deviations
+            if not key or key == pattern_key(variant.preferred_term):
+                continue
+            pattern = self._insert(key)
+            if pattern == len(grouped):
+                grouped.append([])
+            # Same normalized variant, same replacement: report it once
+            if (pattern, variant.preferred_term) not in replacements:
+                replacements.add((pattern, variant.preferred_term))
+                grouped[pattern].append(variant)
+        self._variants = [tuple(group) for group in grouped]
+        self._link()
+
+    def _insert(self, key: tuple[str, ...]) -> int:
+        state = 0
+        for token in key:
+            following = self._goto[state].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][token] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append(-1)
+                self._outputs.append(())
+            state = following
+        if self._own[state] < 0:
+            self._own[state] = len(self._lengths)
+            self._lengths.append(len(key))
+        return self._own[state]
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs inherit their failure state's outputs."""
+        own = [(pattern,) if pattern >= 0 else () for pattern in self._own]
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+            self._outputs[state] = own[state]
+        while queue:
+            state = queue.popleft()
+            for token, following in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[following] = target
+                self._outputs[following] = own[following] + self._outputs[target]
+                queue.append(following)
+
+    # Scanning
+
+    def scan(
+        self,
+        text: str,
+        page_number: int = 1,
+        language_code: Optional[str] = None,
+    ) -> list[DeviationHit]:
+        """
+        Deviations in one page of text, in text order.
+
+        Args:
+            text: Page text
+            page_number: Reported with every hit
+            language_code: Only report variants of this language
+
+        Returns:
+            list[DeviationHit]: Leftmost-longest, non-overlapping matches;
+            a variant with several preferred terms gives one hit per
+            replacement
+        """
+        goto, fail, outputs, lengths = self._goto, self._fail, self._outputs, self._lengths
+        spans: list[tuple[int, int]] = []
+        matches: list[tuple[int, int, int]] = []  # (start token, -length, pattern)
+        state = 0
+        for position, (token, start, end) in enumerate(tokenize(text)):
+            spans.append((start, end))
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for pattern in outputs[state]:
+                if language_code is None or any(
+                    variant.language_code == language_code for variant in self._variants[pattern]
+                ):
+                    matches.append((position - lengths[pattern] + 1, -lengths[pattern], pattern))
+
+        hits: list[DeviationHit] = []
+        covered_until = 0
+        for first, negative_length, pattern in sorted(matches):
+            if first < covered_until:
+                continue
+            last = first - negative_length - 1
+            covered_until = last + 1
+            offset, end = spans[first][0], spans[last][1]
+            for variant in self._variants[pattern]:
+                if language_code is not None and variant.language_code != language_code:
+                    continue
+                hits.append(DeviationHit(
+                    page_number=page_number,
+                    offset=offset,
+                    length=end - offset,
+                    text=text[offset:end],
+                    term_id=variant.term_id,
+                    term=variant.term,
+                    language_code=variant.language_code,
+                    preferred_term_id=variant.preferred_term_id,
+                    replacement=variant.preferred_term,
+                ))
+        return hits
+
+    def scan_pages(
+        self,
+        pages: Iterable[tuple[str, int]],
+        language_code: Optional[str] = None,
+    ) -> Iterator[DeviationHit]:
+        """
+        Deviations in a document, page by page.
+
+        Args:
+            pages: (text, page number) pairs
+            language_code: Only report variants of this language
+        """
+        for text, page_number in pages:
+            yield from self.scan(text, page_number, language_code)
+
+    def stats(self) -> dict:
+        return {
+            "patterns": len(self._variants),
+            "variants": sum(len(group) for group in self._variants),
+            "states": len(self._goto),
+            "build_ms": round(self.build_seconds * 1000, 3),
+            "stale": self.stale,
+            "generation": self.generation,
+        }
+
+
+# Shared instance
+
+_checker: Optional[DeviationChecker] = None
+_checker_lock = threading.Lock()
+
+
+def _outdated(checker: Optional[DeviationChecker]) -> bool:
+    return checker is None or checker.stale or checker.generation < current_generation()
+
+
+def get_deviation_checker() -> DeviationChecker:
+    """Return the shared automaton, (re)building it on first use, when stale
+    or when another process changed the glossary."""
+    global _checker
+    checker = _checker
+    if not _outdated(checker):
+        return checker
+    with _checker_lock:
+        if _outdated(_checker):
+            with database.read_engine.connect() as conn:
+                _checker = DeviationChecker.build(conn)
+        return _checker
+
+
+def invalidate_deviation_checker() -> None:
+    """Force a rebuild on next use (e.g. after bulk imports)."""
+    checker = _checker
+    if checker is not None:
+        checker.stale = True
+
+
+def check_texts(pages: Iterable[str], language_code: Optional[str] = None) -> list[DeviationHit]:
+    """Deviations in page texts (page 1 first)."""
+    checker = get_deviation_checker()
+    return list(checker.scan_pages(((text, number) for number, text in enumerate(pages, 1)), language_code))
+
+
+def check_document(document_id: int, language_code: Optional[str] = None) -> list[DeviationHit]:
+    """
+    Deviations in an uploaded PDF; pages are scanned as they are extracted.
+
+    Raises:
+        ValueError: Unknown document
+    """
+    from services.pdf_extractor import extract_document
+
+    checker = get_deviation_checker()
+    pages = ((page.text, page.page_number) for page in extract_document(document_id) if not page.error)
+    return list(checker.scan_pages(pages, language_code))
+
+
+# Mark the glossary changed during flush, invalidate once the transaction commits
+
+def _mark(target: Term) -> None:
+    session = inspect(target).session
+    if session is not None:
+        session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(Term, "after_insert")
+def _term_inserted(mapper, connection, target):
+    if target.preferred_term_id is not None:
+        _mark(target)
+
+
+@event.listens_for(Term, "after_update")
+def _term_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _GLOSSARY_COLUMNS):
+        _mark(target)
+
+
+@event.listens_for(Term, "after_delete")
+def _term_deleted(mapper, connection, target):
+    _mark(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session):
+    if session.info.pop(_SESSION_KEY, False):
+        invalidate_deviation_checker()
+        return
+    # Glossary writes that do not touch preferred terms: keep the
+    # automaton, unless another process committed in between
+    generation = committed_generation()
+    checker = _checker
+    if generation is not None and checker is not None and checker.generation == generation - 1:
+        checker.generation = generation
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _session_rolled_back(session, previous_transaction):
+    session.info.pop(_SESSION_KEY, None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETEx glossary deviation checker")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    check_parser = subparsers.add_parser("check", help="Scan a PDF or text file")
+    check_parser.add_argument("path", type=Path)
+    check_parser.add_argument("--language", help="Only report variants of this language")
+    subparsers.add_parser("stats", help="Build the automaton and print its size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    deviation_checker = get_deviation_checker()
+    if args.command == "stats":
+        print(deviation_checker.stats())
+    else:
+        if args.path.suffix.lower() == ".pdf":
+            from services.pdf_extractor import PdfExtractor
+
+            document_pages = ((page.text, page.page_number) for page in PdfExtractor().extract(args.path))
+        else:
+            document_pages = [(args.path.read_text(encoding="utf-8"), 1)]
+        started = time.perf_counter()
+        found = 0
+        for hit in deviation_checker.scan_pages(document_pages, args.language):
+            found += 1
+            print(f"p. {hit.page_number:>4}  @{hit.offset:<6}  {hit.text!r} -> {hit.replacement!r}")
+        logger.info(f"{found} deviations in {time.perf_counter() - started:.1f}s")
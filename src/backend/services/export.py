@@ -0,0 +1,443 @@
+"""
+ETEx - Streaming Terminology Export
+
+Exports the terminology base (or a filtered part of it) as TBX, CSV or
+JSONL for translation vendors, with memory use independent of the number
+of terms:
+
+- Rows are read with one Core query through a ``yield_per`` cursor; no ORM
+  objects are built and the result is never materialized.
+- Each format is serialized incrementally and handed out in ~64 KB chunks
+  (a ``StreamingResponse`` body in main.py, a file in the CLI).
+- Optional gzip compresses the chunks on the fly (``zlib.compressobj``).
+
+Shape of the export:
+- one concept entry per term, with its translations (TBX termEntry, JSONL
+  object); CSV has one row per term/translation pair
+- with a source language, every term of that language is an entry
+  (language-pair export); without one, translations are stored in both
+  directions, so each concept is exported once, from its lowest-id term
+
+Filters: source, source tier, language pair and ``validated_by_human``.
+A target language or validation filter restricts the export to terms that
+have such a translation.
+
+Usage:
+    python -m services.export glossary.tbx --format tbx --source-language de --target-language en
+"""
+
+import argparse
+import csv
+import io
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+import orjson
+from sqlalchemy import and_, case, exists, func, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+
+import database
+from models import AuthoritativeSource, Term, TermSynonym, Translation
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "tbx": ("application/x-tbx+xml", "tbx"),
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+
+YIELD_PER = 1000  # rows per cursor fetch
+CHUNK_SIZE = 64 * 1024  # characters per yielded chunk
+
+CSV_COLUMNS = [
+    "term_id", "term", "language_code", "definition", "part_of_speech", "gender", "context",
+    "synonyms", "source", "tier", "target_term_id", "target_term", "target_language",
+    "target_definition", "target_part_of_speech", "target_gender", "target_synonyms",
+    "confidence", "validated_by_human",
+]
+CSV_LIST_SEPARATOR = "; "
+
+_TERM_FIELDS = ("term", "language_code", "definition", "part_of_speech", "gender", "context", "source", "tier")
+# JSONL translation object key -> row column
+_TRANSLATION_FIELDS = {
+    "term_id": "target_term_id",
+    "term": "target_term",
+    "target_language": "target_language",
+    "definition": "target_definition",
+    "part_of_speech": "target_part_of_speech",
+    "gender": "target_gender",
+    "confidence": "confidence",
+    "validated_by_human": "validated_by_human",
+}
+
+TBX_GENDERS = {"m": "masculine", "f": "feminine", "n": "neuter"}
+
+
+@dataclass
+class ExportFilters:
+    source_id: Optional[int] = None
+    tier: Optional[int] = None
+    source_language: Optional[str] = None
+    target_language: Optional[str] = None
+    validated_by_human: Optional[bool] = None
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: Target language without a source language, or both equal
+        """
+        if self.target_language and not self.source_language:
+            raise ValueError("target_language requires source_language")
+        if self.target_language and self.target_language == self.source_language:
+            raise ValueError("source_language and target_language must differ")
+
+    @property
+    def translated_only(self) -> bool:
+        return self.target_language is not None or self.validated_by_human is not None
+
+
+@dataclass
+class ExportStats:
+    entries: int = 0
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def _synonyms_of(term_id):
+    """JSON array of the approved synonyms of a term (correlated subquery)."""
+    link = aliased(TermSynonym)
+    other = aliased(Term)
+    return (
+        select(func.json_group_array(other.term))
+        .select_from(link)
+        .join(other, other.id == case((link.term_id_1 == term_id, link.term_id_2), else_=link.term_id_1))
+        .where(
+            or_(link.term_id_1 == term_id, link.term_id_2 == term_id),
+            link.relationship_type == "synonym",
+            # IS NOT 0 keeps the planner on the term id indexes instead of
+            # idx_synonym_approved
+            link.is_approved.is_not(False),
+        )
+        .scalar_subquery()
+    )
+
+
+def _is_secondary_synonym():
+    """
+    Term without translations that is an approved synonym of a term with
+    translations; it is exported inside that term's entry.
+    """
+    link = aliased(TermSynonym)
+    translated = aliased(Translation)
+    own = aliased(Translation)
+    linked = [
+        exists().where(
+            link.term_id_1 == Term.id if first else link.term_id_2 == Term.id,
+            link.relationship_type == "synonym",
+            link.is_approved.is_not(False),
+            translated.source_term_id == (link.term_id_2 if first else link.term_id_1),
+        )
+        for first in (True, False)
+    ]
+    return and_(or_(*linked), ~exists().where(own.source_term_id == Term.id))
+
+
+def export_query(filters: ExportFilters):
+    """
+    One row per term/translation pair (a term without matching translations
+    yields one row with empty target columns). Rows of one term are
+    consecutive: ordered by term id, or alphabetically for a language-pair
+    export (idx_term_language_term).
+    """
+    target = aliased(Term, name="target_term")
+    stmt = (
+        select(
+            Term.id.label("term_id"),
+            Term.term,
+            Term.language_code,
+            Term.definition,
+            Term.part_of_speech,
+            Term.gender,
+            Term.context,
+            _synonyms_of(Term.id).label("synonyms"),
+            AuthoritativeSource.name.label("source"),
+            AuthoritativeSource.tier,
+            target.id.label("target_term_id"),
+            target.term.label("target_term"),
+            Translation.target_language,
+            target.definition.label("target_definition"),
+            target.part_of_speech.label("target_part_of_speech"),
+            target.gender.label("target_gender"),
+            _synonyms_of(target.id).label("target_synonyms"),
+            Translation.confidence,
+            Translation.validated_by_human,
+        )
+        .select_from(Term)
+        .outerjoin(AuthoritativeSource, AuthoritativeSource.id == Term.source_id)
+    )
+
+    on_translation = [Translation.source_term_id == Term.id]
+    if filters.target_language is not None:
+        on_translation.append(Translation.target_language == filters.target_language)
+    if filters.validated_by_human is not None:
+        on_translation.append(Translation.validated_by_human == filters.validated_by_human)
+    outer = not filters.translated_only
+    stmt = stmt.join(Translation, and_(*on_translation), isouter=outer)
+    stmt = stmt.join(target, target.id == Translation.target_term_id, isouter=outer)
+
+    if filters.source_id is not None:
+        stmt = stmt.where(Term.source_id == filters.source_id)
+    if filters.tier is not None:
+        stmt = stmt.where(AuthoritativeSource.tier == filters.tier)
+    if outer:
+        stmt = stmt.where(~_is_secondary_synonym())
+
+    if filters.source_language is not None:
+        stmt = stmt.where(Term.language_code == filters.source_language).order_by(Term.term, Term.id)
+    else:
+        # Each concept once: skip terms that are a translation of a lower-id term
+        earlier = aliased(Translation, name="earlier")
+        stmt = stmt.where(~exists().where(
+            earlier.target_term_id == Term.id,
+            earlier.source_term_id < Term.id,
+        )).order_by(Term.id)
+    return stmt.order_by(Translation.target_language, Translation.id)
+
+
+def iter_rows(filters: ExportFilters, bind: Optional[Engine] = None, yield_per: int = YIELD_PER) -> Iterator[dict]:
+    """Stream export rows; the connection is held until the generator ends."""
+    with (bind or database.read_engine).connect() as connection:
+        result = connection.execution_options(yield_per=yield_per).execute(export_query(filters))
+        for row in result.mappings():
+            yield row
+
+
+def iter_entries(rows: Iterable[dict]) -> Iterator[tuple[dict, list[dict]]]:
+    """Group consecutive rows by term: (term row, translation rows)."""
+    for _, group in groupby(rows, key=lambda row: row["term_id"]):
+        first = next(group)
+        translations = [first] if first["target_term_id"] is not None else []
+        translations.extend(group)
+        yield first, translations
+
+
+def _buffered(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    buffer: list[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+# Serializers: text pieces, buffered into chunks by _buffered()
+
+def _csv_pieces(rows: Iterable[dict], stats: ExportStats) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        stats.rows += 1
+        values = dict(row)
+        for column in ("synonyms", "target_synonyms"):
+            values[column] = CSV_LIST_SEPARATOR.join(orjson.loads(row[column]))
+        writer.writerow([values[column] for column in CSV_COLUMNS])
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    yield out.getvalue()
+
+
+def _jsonl_pieces(rows: Iterable[dict], stats: ExportStats) -> Iterator[str]:
+    for term, translations in iter_entries(_counted(rows, stats)):
+        stats.entries += 1
+        entry = {"id": term["term_id"], **{name: term[name] for name in _TERM_FIELDS}}
+        entry["synonyms"] = orjson.loads(term["synonyms"])
+        entry["translations"] = [
+            {**{key: row[column] for key, column in _TRANSLATION_FIELDS.items()},
+             "synonyms": orjson.loads(row["target_synonyms"])}
+            for row in translations
+        ]
+        yield orjson.dumps(entry).decode("utf-8") + "\n"
+
+
+def _tbx_term(term: str, part_of_speech: Optional[str] = None, gender: Optional[str] = None) -> str:
+    parts = [f"<tig><term>{escape(term)}</term>"]
+    if part_of_speech:
+        parts.append(f'<termNote type="partOfSpeech">{escape(part_of_speech)}</termNote>')
+    if gender in TBX_GENDERS:
+        parts.append(f'<termNote type="grammaticalGender">{TBX_GENDERS[gender]}</termNote>')
+    parts.append("</tig>")
+    return "".join(parts)
+
+
+def _tbx_lang_set(language: str, definition: Optional[str], terms: list[tuple[str, str]]) -> str:
+    """langSet with one tig per distinct term; terms: (text, tig xml)."""
+    seen: set[str] = set()
+    tigs = []
+    for text, tig in terms:
+        if text not in seen:
+            seen.add(text)
+            tigs.append(tig)
+    definition_xml = f'<descrip type="definition">{escape(definition)}</descrip>' if definition else ""
+    return f"<langSet xml:lang={quoteattr(language)}>{definition_xml}{''.join(tigs)}</langSet>\n"
+
+
+def _tbx_terms(term: str, part_of_speech, gender, synonyms: str) -> list[tuple[str, str]]:
+    """The term's tig followed by tigs for its synonyms (first tig = primary on re-import)."""
+    tigs = [(term, _tbx_term(term, part_of_speech, gender))]
+    tigs.extend((synonym, _tbx_term(synonym)) for synonym in orjson.loads(synonyms))
+    return tigs
+
+
+def _tbx_pieces(rows: Iterable[dict], stats: ExportStats, language: str) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f"<martif type=\"TBX-Basic\" xml:lang={quoteattr(language)}>\n"
+        "<martifHeader><fileDesc><sourceDesc><p>ETEx terminology export</p></sourceDesc>"
+        "</fileDesc></martifHeader>\n<text><body>\n"
+    )
+    for term, translations in iter_entries(_counted(rows, stats)):
+        stats.entries += 1
+        parts = [f'<termEntry id="t{term["term_id"]}">\n']
+        if term["context"]:
+            parts.append(f'<descrip type="context">{escape(term["context"])}</descrip>\n')
+        if term["source"]:
+            parts.append(f'<admin type="source">{escape(term["source"])}</admin>\n')
+        parts.append(_tbx_lang_set(
+            term["language_code"],
+            term["definition"],
+            _tbx_terms(term["term"], term["part_of_speech"], term["gender"], term["synonyms"]),
+        ))
+        # Rows are ordered by target language: one langSet per language
+        for target_language, group in groupby(translations, key=lambda row: row["target_language"]):
+            group = list(group)
+            tigs = []
+            for row in group:
+                tigs.extend(_tbx_terms(row["target_term"], row["target_part_of_speech"],
+                                       row["target_gender"], row["target_synonyms"]))
+            parts.append(_tbx_lang_set(
+                target_language,
+                next((row["target_definition"] for row in group if row["target_definition"]), None),
+                tigs,
+            ))
+        parts.append("</termEntry>\n")
+        yield "".join(parts)
+    yield "</body></text>\n</martif>\n"
+
+
+def _counted(rows: Iterable[dict], stats: ExportStats) -> Iterator[dict]:
+    for row in rows:
+        stats.rows += 1
+        yield row
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into gzip format on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(
+    export_format: str,
+    filters: ExportFilters,
+    gzip: bool = False,
+    bind: Optional[Engine] = None,
+    stats: Optional[ExportStats] = None,
+) -> Iterator[bytes]:
+    """
+    Serialized export as a stream of byte chunks.
+
+    Args:
+        export_format: 'tbx', 'csv' or 'jsonl'
+        filters: Row filters (validated before the first row is read)
+        gzip: Compress the stream
+        bind: Engine to read from (default: read-only pool)
+        stats: Filled in while the stream is consumed
+
+    Raises:
+        ValueError: Unknown format or invalid filters (raised immediately,
+            not on first iteration)
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    filters.validate()
+    stats = stats if stats is not None else ExportStats()
+    return _stream(export_format, filters, gzip, bind, stats)
+
+
+def _stream(export_format: str, filters: ExportFilters, gzip: bool, bind: Optional[Engine], stats: ExportStats):
+    started = time.perf_counter()
+    rows = iter_rows(filters, bind)
+    if export_format == "csv":
+        pieces = _csv_pieces(rows, stats)
+    elif export_format == "jsonl":
+        pieces = _jsonl_pieces(rows, stats)
+    else:
+        pieces = _tbx_pieces(rows, stats, filters.source_language or "en")
+    chunks = _buffered(pieces)
+    if gzip:
+        chunks = gzip_chunks(chunks)
+    for chunk in chunks:
+        stats.bytes += len(chunk)
+        yield chunk
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        f"Export ({export_format}{', gzip' if gzip else ''}): {stats.entries or stats.rows} entries, "
+        f"{stats.rows} rows, {stats.bytes} bytes in {stats.seconds:.1f}s"
+    )
+
+
+def export_filename(export_format: str, filters: ExportFilters, gzip: bool = False) -> str:
+    """Download name, e.g. 'etex-de-en.tbx.gz'."""
+    parts = ["etex"]
+    if filters.source_language:
+        parts.append(filters.source_language)
+    if filters.target_language:
+        parts.append(filters.target_language)
+    name = "-".join(parts) + "." + FORMATS[export_format][1]
+    return name + ".gz" if gzip else name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the ETEx terminology base")
+    parser.add_argument("path", type=Path, help="Output file")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="tbx")
+    parser.add_argument("--source-id", type=int)
+    parser.add_argument("--tier", type=int, choices=[1, 2, 3])
+    parser.add_argument("--source-language")
+    parser.add_argument("--target-language")
+    parser.add_argument("--validated", dest="validated_by_human", action="store_const", const=True,
+                        help="Only human-validated translations")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    export_filters = ExportFilters(
+        source_id=args.source_id,
+        tier=args.tier,
+        source_language=args.source_language,
+        target_language=args.target_language,
+        validated_by_human=args.validated_by_human,
+    )
+    with args.path.open("wb") as output:
+        for data in export_chunks(args.format, export_filters, gzip=args.gzip):
+            output.write(data)
@@ -0,0 +1,318 @@
+"""
+ETEx - Typo-Tolerant Fuzzy Search
+
+Trigram candidate selection plus bounded edit-distance verification.
+
+1. The query is casefolded and split into padded character trigrams.
+2. ``term_trigrams`` (an inverted index, one posting per term/trigram,
+   clustered by trigram and term length) returns the terms within the
+   admissible length window that share at least the q-gram lemma minimum
+   of trigrams with the query and pass the language/source filters, best
+   overlap first.
+3. Only those candidates are verified with a bounded Damerau-Levenshtein
+   (optimal string alignment) distance that gives up as soon as the
+   bound is exceeded.
+
+Edit distance is therefore never computed against the whole table.
+
+The index is maintained automatically:
+- ORM writes: mapper events on Term (registered when this module is imported)
+- Existing rows: ``python -m services.fuzzy rebuild``
+"""
+
+import argparse
+import logging
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+import database
+from models import Term, TermTrigram
+
+logger = logging.getLogger(__name__)
+
+# Hard upper bound for the edit distance a caller may request
+MAX_EDIT_DISTANCE = 3
+
+# Candidates verified per query (best trigram overlap first)
+CANDIDATE_LIMIT = 200
+
+# A single edit (insert, delete, substitute) touches at most 3 trigrams,
+# an adjacent transposition at most 4.
+_TRIGRAMS_PER_EDIT = 4
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize(value: str) -> str:
+    """Casefold (ß -> ss) and collapse whitespace for trigram matching."""
+    value = unicodedata.normalize("NFC", value).casefold()
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def trigrams(value: str) -> set[str]:
+    """
+    Distinct padded trigrams of a normalized string.
+
+    Two leading blanks and one trailing blank make prefixes count more than
+    suffixes, as in PostgreSQL's pg_trgm.
+    """
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_max_distance(query: str) -> int:
+    """Edit budget scaled to query length: short words allow one typo."""
+    return 1 if len(query) <= 5 else 2
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance with a bound.
+
+    Only the diagonal band |i - j| <= max_distance is computed, and the
+    computation stops as soon as a whole row exceeds the bound.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Give up once the distance must exceed this
+
+    Returns:
+        Optional[int]: The distance, or None if it exceeds max_distance
+    """
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return None
+    if a == b:
+        return 0
+
+    over = max_distance + 1
+    previous2 = [over] * (len_b + 1)
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [over] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            char_b = b[j - 1]
+            value = previous[j - 1] + (char_a != char_b)  # substitution
+            if previous[j] + 1 < value:
+                value = previous[j] + 1                    # deletion
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1                 # insertion
+            if (
+                i > 1 and j > 1
+                and char_a == b[j - 2]
+                and a[i - 2] == char_b
+                and previous2[j - 2] + 1 < value
+            ):
+                value = previous2[j - 2] + 1               # transposition
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous2, previous = previous, current
+
+    distance = previous[len_b]
+    return distance if distance <= max_distance else None
+
+
+def _min_shared(grams: int, max_distance: int) -> int:
+    """q-gram lemma: trigrams two strings must share within max_distance."""
+    return max(1, grams - _TRIGRAMS_PER_EDIT * max_distance)
+
+
+def _write_postings(connection: Connection, rows: Iterable[tuple[int, str]]) -> int:
+    # Hundreds of thousands of tiny rows: plain DBAPI executemany skips
+    # per-row parameter processing, which dominates at this volume.
+    postings = [
+        (gram, len(value), term_id)
+        for term_id, term in rows
+        for value in (normalize(term),)
+        for gram in trigrams(value)
+    ]
+    if postings:
+        connection.exec_driver_sql(
+            "INSERT INTO term_trigrams (trigram, term_length, term_id) VALUES (?, ?, ?)",
+            postings,
+        )
+    return len(postings)
+
+
+def index_terms(
+    connection: Connection,
+    rows: Iterable[tuple[int, str]],
+    replace: bool = True,
+) -> int:
+    """
+    (Re)index trigrams for the given terms.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        rows: (term_id, term) tuples
+        replace: Remove existing postings first (False for brand-new terms)
+
+    Returns:
+        int: Number of trigram postings written
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    if replace:
+        connection.execute(
+            delete(TermTrigram).where(TermTrigram.term_id.in_([row[0] for row in rows]))
+        )
+    return _write_postings(connection, rows)
+
+
+def rebuild_trigram_index(connection: Connection, batch_size: int = 5000) -> int:
+    """
+    Rebuild the trigram index for every term.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        batch_size: Terms read per batch
+
+    Returns:
+        int: Number of trigram postings written
+    """
+    connection.execute(delete(TermTrigram))
+    result = connection.execution_options(yield_per=batch_size).execute(
+        select(Term.id, Term.term)
+    )
+    written = 0
+    for batch in result.partitions():
+        written += _write_postings(connection, batch)
+    return written
+
+
+def fuzzy_search(
+    db: Session,
+    query: str,
+    max_distance: Optional[int] = None,
+    language_code: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """
+    Find terms within a bounded edit distance of the query.
+
+    Args:
+        db: Database session
+        query: Possibly misspelled term
+        max_distance: Edit budget (default scales with query length,
+            capped at MAX_EDIT_DISTANCE)
+        language_code: Optional language filter
+        source_id: Optional authoritative source filter
+        limit: Maximum number of hits
+        offset: Hits to skip (paging over the ranked candidates; pages end
+            at CANDIDATE_LIMIT candidates)
+
+    Returns:
+        list[dict]: Hits ordered by distance, then trigram overlap
+    """
+    needle = normalize(query)
+    if not needle:
+        return []
+    if max_distance is None:
+        max_distance = default_max_distance(needle)
+    max_distance = max(0, min(max_distance, MAX_EDIT_DISTANCE))
+
+    grams = trigrams(needle)
+    length = len(needle)
+
+    shared = func.count().label("shared")
+    grouped = (
+        select(TermTrigram.term_id, TermTrigram.term_length, shared)
+        .where(
+            TermTrigram.trigram.in_(grams),
+            TermTrigram.term_length.between(length - max_distance, length + max_distance),
+        )
+        .group_by(TermTrigram.term_id, TermTrigram.term_length)
+        .having(shared >= _min_shared(len(grams), max_distance))
+    )
+    if language_code is None and source_id is None:
+        candidate_stmt = grouped.order_by(shared.desc())
+    else:
+        # Filter the grouped candidates before the limit, or other
+        # languages and sources could take all CANDIDATE_LIMIT slots. Only
+        # terms past the HAVING are looked up in ``terms``, not every posting
+        grouped = grouped.subquery()
+        candidate_stmt = (
+            select(grouped.c.term_id, grouped.c.term_length, grouped.c.shared)
+            .join(Term, Term.id == grouped.c.term_id)
+            .order_by(grouped.c.shared.desc())
+        )
+        if language_code is not None:
+            candidate_stmt = candidate_stmt.where(Term.language_code == language_code)
+        if source_id is not None:
+            candidate_stmt = candidate_stmt.where(Term.source_id == source_id)
+    candidates = db.execute(candidate_stmt.limit(CANDIDATE_LIMIT)).all()
+
+    overlap = {term_id: count for term_id, _, count in candidates}
+    if not overlap:
+        return []
+
+    stmt = select(
+        Term.id,
+        Term.term,
+        Term.language_code,
+        Term.definition,
+        Term.context,
+        Term.source_id,
+        Term.preferred_term_id,
+        Term.confidence,
+    ).where(Term.id.in_(overlap))
+
+    hits = []
+    for row in db.execute(stmt).mappings():
+        distance = bounded_distance(needle, normalize(row["term"]), max_distance)
+        if distance is None:
+            continue
+        hit = dict(row)
+        hit["distance"] = distance
+        hits.append(hit)
+
+    hits.sort(key=lambda hit: (hit["distance"], -overlap[hit["id"]], hit["term"]))
+    return hits[offset:offset + limit]
+
+
+# Keep the index in sync with ORM writes to Term
+
+@event.listens_for(Term, "after_insert")
+def _index_inserted_term(mapper, connection, target):
+    index_terms(connection, [(target.id, target.term)])
+
+
+@event.listens_for(Term, "after_update")
+def _index_updated_term(mapper, connection, target):
+    if inspect(target).attrs.term.history.has_changes():
+        index_terms(connection, [(target.id, target.term)])
+
+
+@event.listens_for(Term, "after_delete")
+def _unindex_deleted_term(mapper, connection, target):
+    connection.execute(delete(TermTrigram).where(TermTrigram.term_id == target.id))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETEx trigram index maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.engine.begin() as conn:
+        count = rebuild_trigram_index(conn)
+    logger.info(f"Trigram index rebuilt: {count} postings")
@@ -0,0 +1,130 @@
+"""
+ETEx - Glossary Generation
+
+A counter in ``glossary_generation`` that every transaction changing
+terms, synonyms, translations or sources bumps once, right before it
+commits (same ``commit`` event hook as services/term_cards.py):
+
+- ORM writes: mapper events on Term, TermSynonym, Translation and
+  AuthoritativeSource mark the connection
+- Core bulk writes: the services/bulk.py helpers mark it
+
+In-memory structures derived from the glossary (thesaurus graph,
+deviation automaton, search cache) remember the generation they were
+built from. Before reuse they compare it with ``current_generation()``,
+which re-reads the row at most every GLOSSARY_GENERATION_CHECK seconds
+(default 1), so writes committed by other processes (``python -m
+services.jobs worker``, CLI importers, suggestion runs) are picked up
+within that interval.
+
+Commits of the current process are applied in place instead: the bump
+returns the new generation (``committed_generation()``), and a structure
+that was at the generation just before it has missed no other writer.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Connection, Engine
+
+import database
+from models import AuthoritativeSource, GlossaryGeneration, Term, TermSynonym, Translation
+
+CHECK_INTERVAL = float(os.getenv("GLOSSARY_GENERATION_CHECK", "1.0"))
+
+_CONNECTION_KEY = "glossary_changed"
+
+_BUMP = (
+    update(GlossaryGeneration)
+    .where(GlossaryGeneration.id == 1)
+    .values(generation=GlossaryGeneration.generation + 1)
+    .returning(GlossaryGeneration.generation)
+)
+
+# Generation set by the last glossary-changing commit of this thread
+_committed = threading.local()
+
+_current: Optional[int] = None
+_checked = 0.0
+
+
+def mark_changed(connection: Connection) -> None:
+    """Bump the generation when the connection's transaction commits."""
+    connection.info[_CONNECTION_KEY] = True
+
+
+def read_generation(connection: Connection) -> int:
+    """Generation as stored in the database (0 before the first write)."""
+    return connection.execute(
+        select(GlossaryGeneration.generation).where(GlossaryGeneration.id == 1)
+    ).scalar() or 0
+
+
+def current_generation() -> int:
+    """
+    Latest committed generation, read from the database at most once per
+    CHECK_INTERVAL (one primary-key read).
+    """
+    global _current, _checked
+    now = time.monotonic()
+    if _current is not None and now - _checked < CHECK_INTERVAL:
+        return _current
+    with database.read_engine.connect() as connection:
+        generation = read_generation(connection)
+    _current, _checked = generation, now
+    return generation
+
+
+def generation_due() -> bool:
+    """Would ``current_generation()`` read the database (interval elapsed)?"""
+    return _current is None or time.monotonic() - _checked >= CHECK_INTERVAL
+
+
+def committed_generation() -> Optional[int]:
+    """
+    Generation written by this thread's last commit, for Session
+    ``after_commit`` listeners; None if that commit did not change the
+    glossary.
+    """
+    return getattr(_committed, "generation", None)
+
+
+# Bump as part of every glossary-changing commit
+
+@event.listens_for(Engine, "commit")
+def _bump_before_commit(connection: Connection) -> None:
+    global _current
+    if not connection.info.pop(_CONNECTION_KEY, False):
+        return
+    generation = connection.execute(_BUMP).scalar()
+    _committed.generation = generation
+    if generation is not None and (_current is None or generation > _current):
+        _current = generation
+
+
+@event.listens_for(Engine, "begin")
+@event.listens_for(Engine, "rollback")
+def _discard_mark(connection: Connection) -> None:
+    connection.info.pop(_CONNECTION_KEY, None)
+    _committed.generation = None
+
+
+# Mark ORM writes
+
+@event.listens_for(Term, "after_insert")
+@event.listens_for(Term, "after_update")
+@event.listens_for(Term, "after_delete")
+@event.listens_for(TermSynonym, "after_insert")
+@event.listens_for(TermSynonym, "after_update")
+@event.listens_for(TermSynonym, "after_delete")
+@event.listens_for(Translation, "after_insert")
+@event.listens_for(Translation, "after_update")
+@event.listens_for(Translation, "after_delete")
+@event.listens_for(AuthoritativeSource, "after_insert")
+@event.listens_for(AuthoritativeSource, "after_update")
+@event.listens_for(AuthoritativeSource, "after_delete")
+def _glossary_written(mapper, connection, target):
+    mark_changed(connection)
@@ -0,0 +1,382 @@
+"""
+ETEx - IATE API Client
+
+Authoritative module (Type A, REQUIREMENTS Section 5) for the IATE
+(EU Inter-Agency Terminology Exchange) API.
+
+- One shared ``httpx.AsyncClient`` per process (HTTP/2, keep-alive pool),
+  opened on the first request and closed on API shutdown. httpx itself is
+  imported then too, so importing this module stays cheap.
+- A semaphore caps concurrent requests to IATE; identical requests in
+  flight at the same time share one network call.
+- Transport errors, 429 and 5xx responses are retried with exponential
+  backoff and full jitter (Retry-After is honoured).
+- Responses are cached on disk under ``data/cache/iate``: a request index
+  (request hash -> ETag, fetch time, body hash) plus content-addressed
+  bodies. Fresh entries are served without any network access; stale ones
+  are revalidated with If-None-Match and only re-downloaded on change.
+
+Point IATE_API_URL at a local stub server to run without network access.
+
+Usage:
+    python -m services.iate search Drucksensor --source de --target en
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from database import PROJECT_ROOT
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://iate.europa.eu/em-api"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class IateError(Exception):
+    """Raised when IATE cannot be reached or returns an error response."""
+
+
+class ResponseCache:
+    """
+    On-disk IATE response cache.
+
+    Layout:
+        requests/<request hash>.json   {"etag", "fetched_at", "body"}
+        blobs/<aa>/<sha256 of body>    response body
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.requests_dir = root / "requests"
+        self.blobs_dir = root / "blobs"
+
+    @staticmethod
+    def request_key(method: str, path: str, params: Optional[dict], body: Any) -> str:
+        canonical = json.dumps(
+            {"method": method, "path": path, "params": params or {}, "body": body},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    def load(self, key: str) -> Optional[tuple[dict, bytes]]:
+        """Index record and body for a request, or None if not cached."""
+        try:
+            record = json.loads((self.requests_dir / f"{key}.json").read_text(encoding="utf-8"))
+            return record, self._blob_path(record["body"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, key: str, content: bytes, etag: Optional[str]) -> None:
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            _write_atomic(blob, content)
+        self.touch(key, {"etag": etag, "body": digest})
+
+    def touch(self, key: str, record: dict) -> None:
+        """Write the index record with a new fetch time."""
+        record = dict(record, fetched_at=time.time())
+        _write_atomic(self.requests_dir / f"{key}.json", json.dumps(record).encode("utf-8"))
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class IateClient:
+    """Pooled, rate-limited, caching IATE client."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+        cache_ttl: float = 7 * 24 * 3600,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        timeout: float = 15.0,
+        http2: bool = True,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.cache = ResponseCache(cache_dir or PROJECT_ROOT / "data" / "cache" / "iate")
+        self.cache_ttl = cache_ttl
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.counters = {
+            "cache_hits": 0,
+            "revalidated": 0,
+            "downloaded": 0,
+            "network_requests": 0,
+            "retries": 0,
+            "shared_inflight": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "IateClient":
+        cache_dir = os.getenv("IATE_CACHE_DIR")
+        return cls(
+            base_url=os.getenv("IATE_API_URL", DEFAULT_BASE_URL),
+            api_key=os.getenv("IATE_API_KEY") or None,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            cache_ttl=float(os.getenv("IATE_CACHE_TTL", str(7 * 24 * 3600))),
+            max_concurrency=int(os.getenv("IATE_MAX_CONCURRENCY", "4")),
+            max_retries=int(os.getenv("IATE_MAX_RETRIES", "4")),
+            http2=os.getenv("IATE_HTTP2", "true").lower() == "true",
+        )
+
+    # Lifecycle
+
+    async def open(self) -> None:
+        """Create the shared connection pool (idempotent)."""
+        if self._client is not None:
+            return
+        import httpx
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 not installed; IATE client falls back to HTTP/1.1")
+                http2 = False
+        headers = {"Accept": "application/json", "User-Agent": "ETEx/0.1"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60.0,
+            ),
+            transport=self.transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "IateClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # API
+
+    async def search(
+        self,
+        term: str,
+        source_language: str,
+        target_languages: Sequence[str] = (),
+        limit: int = 20,
+    ) -> dict:
+        """
+        Search IATE entries for a term.
+
+        Args:
+            term: Search text
+            source_language: ISO 639-1 code of the search text
+            target_languages: Languages to return besides the source language
+            limit: Maximum number of entries
+
+        Returns:
+            dict: Decoded IATE search response
+        """
+        body = {
+            "query": term,
+            "source": source_language,
+            "targets": sorted(set(target_languages)),
+        }
+        return await self.request("POST", "/entries/_search", params={"limit": limit}, body=body)
+
+    async def get_entry(self, entry_id: int) -> dict:
+        """Fetch a single IATE entry by id."""
+        return await self.request("GET", f"/entries/{entry_id}")
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        body: Any = None,
+    ) -> Any:
+        """
+        Cached, rate-limited request returning the decoded JSON response.
+
+        Raises:
+            IateError: Network failure after all retries, or an error status
+        """
+        key = ResponseCache.request_key(method, path, params, body)
+        cached = await asyncio.to_thread(self.cache.load, key)
+        if cached is not None and time.time() - cached[0]["fetched_at"] < self.cache_ttl:
+            self.counters["cache_hits"] += 1
+            return json.loads(cached[1])
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["shared_inflight"] += 1
+            return json.loads(await asyncio.shield(pending))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await self._fetch(key, method, path, params, body, cached)
+            future.set_result(content)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not logged as lost
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return json.loads(content)
+
+    async def _fetch(
+        self,
+        key: str,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        body: Any,
+        cached: Optional[tuple[dict, bytes]],
+    ) -> bytes:
+        if self._client is None:
+            await self.open()
+
+        headers = {}
+        if cached is not None and cached[0].get("etag"):
+            headers["If-None-Match"] = cached[0]["etag"]
+
+        response = await self._send(method, path, params, body, headers)
+        if response.status_code == 304 and cached is not None:
+            self.counters["revalidated"] += 1
+            await asyncio.to_thread(self.cache.touch, key, cached[0])
+            return cached[1]
+        if response.status_code >= 400:
+            raise IateError(f"IATE {method} {path} failed: HTTP {response.status_code}")
+
+        self.counters["downloaded"] += 1
+        content = response.content
+        await asyncio.to_thread(self.cache.store, key, content, response.headers.get("ETag"))
+        return content
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        body: Any,
+        headers: dict,
+    ) -> "httpx.Response":
+        import httpx
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    self.counters["network_requests"] += 1
+                    response = await self._client.request(
+                        method, path, params=params, json=body, headers=headers
+                    )
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+
+            if attempt == self.max_retries:
+                raise IateError(f"IATE {method} {path} failed after {attempt + 1} attempts: {error}")
+            delay = self._backoff(attempt, retry_after)
+            self.counters["retries"] += 1
+            logger.warning(f"IATE {method} {path}: {error}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Full-jitter exponential backoff; a numeric Retry-After wins."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_cap)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> dict:
+        return dict(self.counters, open=self._client is not None)
+
+
+# Shared instance, opened on first use and closed by the API lifespan hook
+iate_client = IateClient.from_env()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the IATE API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search_parser = subparsers.add_parser("search")
+    search_parser.add_argument("term")
+    search_parser.add_argument("--source", required=True, help="Language of the term, e.g. de")
+    search_parser.add_argument("--target", action="append", default=[], help="Target language (repeatable)")
+    entry_parser = subparsers.add_parser("entry")
+    entry_parser.add_argument("entry_id", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def _main():
+        async with iate_client as client:
+            if args.command == "search":
+                result = await client.search(args.term, args.source, args.target)
+            else:
+                result = await client.get_entry(args.entry_id)
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+            logger.info(client.stats())
+
+    asyncio.run(_main())
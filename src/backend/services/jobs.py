@@ -0,0 +1,620 @@
+"""
+ETEx - Background Job Queue
+
+Persistent queue for document processing (``processing_jobs``), driving
+the UploadedDocument lifecycle pending -> processing -> completed/failed.
+
+- Uploads insert the document and its job in one transaction and return
+  immediately; worker threads pick the job up.
+- A worker claims the highest-priority runnable job (FIFO within a
+  priority) with a single ``UPDATE ... WHERE id = (SELECT ...) RETURNING``
+  statement, so two workers can never claim the same job.
+- A claimed job is held under a lease that a heartbeat thread renews while
+  the handler runs. If a worker dies, the lease expires and the job is
+  claimed again, up to ``max_attempts``; exhausted jobs are failed.
+- Failed attempts are retried with exponential backoff (``run_after``).
+- ``UploadedDocument.processing_status``, ``error_message`` and
+  ``processed_at`` are kept in step with the job.
+
+Handlers (``register_handler``) exist for spreadsheets, TBX and PDF (page
+extraction, then NLP term extraction, services/term_extractor.py). They
+write through short transactions on the single SQLite writer connection,
+so several workers interleave instead of serializing whole documents.
+
+Configuration (environment): JOB_WORKERS (0 disables the in-process pool),
+JOB_LEASE_SECONDS, JOB_POLL_INTERVAL, JOB_MAX_ATTEMPTS.
+
+Usage:
+    python -m services.jobs worker --workers 4
+    python -m services.jobs enqueue 12 --priority 10
+    python -m services.jobs stats
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.engine import Connection, Engine, Row
+from sqlalchemy.orm import Session
+
+import database
+from models import AuthoritativeSource, ProcessingJob, Term, UploadedDocument
+from services import bulk
+from services.uploads import document_path
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Retry backoff: RETRY_BASE_SECONDS * 2 ** (attempt - 1), capped
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+JOB_TYPES = {
+    ".csv": "spreadsheet",
+    ".txt": "spreadsheet",
+    ".xlsx": "spreadsheet",
+    ".xlsm": "spreadsheet",
+    ".tbx": "tbx",
+    ".pdf": "pdf",
+}
+
+# Job type -> AuthoritativeSource.source_type for sources created on upload
+SOURCE_TYPES = {"spreadsheet": "manual", "tbx": "database", "pdf": "pdf"}
+
+Handler = Callable[[Row], None]
+_handlers: dict[str, Handler] = {}
+
+
+def _utcnow() -> datetime:
+    """Naive UTC, matching SQLite CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_type_for(filename: str) -> Optional[str]:
+    """Job type for a file name, or None if it cannot be processed."""
+    return JOB_TYPES.get(Path(filename).suffix.lower())
+
+
+def register_handler(job_type: str) -> Callable[[Handler], Handler]:
+    """Register the function that processes jobs of ``job_type``."""
+    def decorator(handler: Handler) -> Handler:
+        _handlers[job_type] = handler
+        return handler
+    return decorator
+
+
+# Queue operations
+
+def submit_document(
+    session: Session,
+    filename: str,
+    original_filename: str,
+    file_size: int,
+    mime_type: Optional[str] = None,
+    source_name: Optional[str] = None,
+    priority: int = 0,
+) -> tuple[UploadedDocument, ProcessingJob]:
+    """
+    Register an uploaded file and queue its processing job.
+
+    Both rows are added to the caller's session; they become visible to
+    workers when the caller commits.
+
+    Raises:
+        ValueError: No handler for the file type
+    """
+    job_type = job_type_for(original_filename)
+    if job_type is None:
+        raise ValueError(f"Unsupported file type: {Path(original_filename).suffix or original_filename}")
+
+    source_id = None
+    if source_name:
+        source_id = bulk.get_or_create_source(
+            session.connection(), source_name, source_type=SOURCE_TYPES[job_type], tier=2
+        )
+    document = UploadedDocument(
+        filename=filename,
+        original_filename=original_filename,
+        file_size=file_size,
+        mime_type=mime_type,
+        source_id=source_id,
+        processing_status="pending",
+    )
+    job = ProcessingJob(
+        document=document,
+        job_type=job_type,
+        priority=priority,
+        max_attempts=MAX_ATTEMPTS,
+        run_after=_utcnow(),
+    )
+    session.add_all([document, job])
+    session.flush()
+    return document, job
+
+
+def enqueue(
+    connection: Connection,
+    document_id: int,
+    job_type: str,
+    priority: int = 0,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> int:
+    """
+    Queue a job for an existing document (Core path).
+
+    Returns:
+        int: ProcessingJob id
+    """
+    connection.execute(
+        update(UploadedDocument)
+        .where(UploadedDocument.id == document_id)
+        .values(processing_status="pending", error_message=None)
+    )
+    return connection.execute(
+        ProcessingJob.__table__.insert()
+        .values(
+            document_id=document_id,
+            job_type=job_type,
+            priority=priority,
+            max_attempts=max_attempts,
+            run_after=_utcnow(),
+        )
+        .returning(ProcessingJob.id)
+    ).scalar_one()
+
+
+def claim(bind: Engine, owner: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Row]:
+    """
+    Atomically claim the next runnable job.
+
+    Runnable: queued jobs whose ``run_after`` has passed, and running jobs
+    whose lease expired with attempts left (their worker died).
+
+    Args:
+        bind: Writer engine
+        owner: Lease owner id of the claiming worker
+        lease_seconds: Lease duration
+
+    Returns:
+        Row | None: (id, document_id, job_type, attempts, max_attempts)
+    """
+    now = _utcnow()
+    runnable = or_(
+        and_(ProcessingJob.status == "queued", ProcessingJob.run_after <= now),
+        and_(
+            ProcessingJob.status == "running",
+            ProcessingJob.lease_expires_at < now,
+            ProcessingJob.attempts < ProcessingJob.max_attempts,
+        ),
+    )
+    candidate = (
+        select(ProcessingJob.id)
+        .where(runnable)
+        .order_by(ProcessingJob.priority.desc(), ProcessingJob.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    with bind.begin() as connection:
+        job = connection.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == candidate)
+            .values(
+                status="running",
+                attempts=ProcessingJob.attempts + 1,
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                started_at=now,
+            )
+            .returning(
+                ProcessingJob.id,
+                ProcessingJob.document_id,
+                ProcessingJob.job_type,
+                ProcessingJob.attempts,
+                ProcessingJob.max_attempts,
+            )
+        ).first()
+        if job is not None:
+            _set_document(connection, job.document_id, processing_status="processing",
+                          error_message=None, processed_at=None)
+    return job
+
+
+def renew_leases(bind: Engine, leases: dict[int, str], lease_seconds: float = LEASE_SECONDS) -> set[int]:
+    """
+    Extend the leases of running jobs.
+
+    Args:
+        leases: Job id -> lease owner
+
+    Returns:
+        set[int]: Jobs whose lease was lost (expired and taken over)
+    """
+    lost = set()
+    expires = _utcnow() + timedelta(seconds=lease_seconds)
+    with bind.begin() as connection:
+        for job_id, owner in leases.items():
+            renewed = connection.execute(
+                update(ProcessingJob)
+                .where(
+                    ProcessingJob.id == job_id,
+                    ProcessingJob.lease_owner == owner,
+                    ProcessingJob.status == "running",
+                )
+                .values(lease_expires_at=expires)
+            ).rowcount
+            if not renewed:
+                lost.add(job_id)
+    return lost
+
+
+def complete(bind: Engine, job: Row, owner: str) -> None:
+    now = _utcnow()
+    with bind.begin() as connection:
+        if not _finish(connection, job, owner, status="completed", error_message=None,
+                       finished_at=now):
+            return
+        _set_document(connection, job.document_id, processing_status="completed",
+                      error_message=None, processed_at=now)
+
+
+def fail(bind: Engine, job: Row, owner: str, error: str) -> None:
+    """Record a failed attempt: retry later, or fail for good when exhausted."""
+    now = _utcnow()
+    with bind.begin() as connection:
+        if job.attempts < job.max_attempts:
+            delay = min(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), RETRY_MAX_SECONDS)
+            if _finish(connection, job, owner, status="queued", error_message=error,
+                       run_after=now + timedelta(seconds=delay)):
+                _set_document(connection, job.document_id, processing_status="pending",
+                              error_message=error)
+                logger.warning(f"Job {job.id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+            return
+        if _finish(connection, job, owner, status="failed", error_message=error, finished_at=now):
+            _set_document(connection, job.document_id, processing_status="failed",
+                          error_message=error, processed_at=now)
+            logger.error(f"Job {job.id} failed after {job.attempts} attempts: {error}")
+
+
+def fail_expired(bind: Engine) -> int:
+    """
+    Fail running jobs whose lease expired with no attempts left.
+
+    Returns:
+        int: Number of jobs failed
+    """
+    now = _utcnow()
+    error = "Worker lease expired (worker crashed or stalled)"
+    with bind.begin() as connection:
+        expired = connection.execute(
+            update(ProcessingJob)
+            .where(
+                ProcessingJob.status == "running",
+                ProcessingJob.lease_expires_at < now,
+                ProcessingJob.attempts >= ProcessingJob.max_attempts,
+            )
+            .values(status="failed", error_message=error, finished_at=now,
+                    lease_owner=None, lease_expires_at=None)
+            .returning(ProcessingJob.id, ProcessingJob.document_id)
+        ).all()
+        for job in expired:
+            _set_document(connection, job.document_id, processing_status="failed",
+                          error_message=error, processed_at=now)
+            logger.error(f"Job {job.id} failed: {error}")
+    return len(expired)
+
+
+def queue_stats(connection: Union[Connection, Session]) -> dict:
+    """Job counts by status."""
+    counts = dict(connection.execute(
+        select(ProcessingJob.status, func.count()).group_by(ProcessingJob.status)
+    ).all())
+    return {status: counts.get(status, 0) for status in ("queued", "running", "completed", "failed")}
+
+
+def _finish(connection: Connection, job: Row, owner: str, **values) -> bool:
+    # Guarded by the lease owner: a worker whose lease was taken over must
+    # not overwrite the new attempt's state
+    finished = connection.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id == job.id, ProcessingJob.lease_owner == owner)
+        .values(lease_owner=None, lease_expires_at=None, **values)
+    ).rowcount
+    if not finished:
+        logger.warning(f"Job {job.id}: lease lost, result of this attempt discarded")
+    return bool(finished)
+
+
+def _set_document(connection: Connection, document_id: int, **values) -> None:
+    connection.execute(
+        update(UploadedDocument).where(UploadedDocument.id == document_id).values(**values)
+    )
+
+
+def _load_document(document_id: int) -> Row:
+    with database.engine.connect() as connection:
+        document = connection.execute(
+            select(UploadedDocument, AuthoritativeSource.name.label("source_name"))
+            .outerjoin(AuthoritativeSource, AuthoritativeSource.id == UploadedDocument.source_id)
+            .where(UploadedDocument.id == document_id)
+        ).first()
+    if document is None:
+        raise ValueError(f"Uploaded document {document_id} not found")
+    return document
+
+
+# Handlers
+
+@register_handler("spreadsheet")
+def _process_spreadsheet(job: Row) -> None:
+    from services.spreadsheet_import import import_spreadsheet
+
+    # Resumes from import_checkpoint on retried attempts
+    import_spreadsheet(job.document_id)
+
+
+@register_handler("tbx")
+def _process_tbx(job: Row) -> None:
+    from services.tbx_import import import_tbx
+
+    document = _load_document(job.document_id)
+    _check_no_earlier_terms(job)
+    import_tbx(
+        document_path(document),
+        document.source_name or Path(document.original_filename).stem,
+        document_id=job.document_id,
+    )
+
+
+@register_handler("pdf")
+def _process_pdf(job: Row) -> None:
+    from services.pdf_extractor import extract_document
+    from services.term_extractor import extract_terms_from_pages
+
+    document = _load_document(job.document_id)
+    _check_no_earlier_terms(job)
+    terms, _ = extract_terms_from_pages(extract_document(job.document_id))
+    rows = [
+        {
+            "term": term.term,
+            "language_code": term.language_code,
+            "definition": None,
+            "source_id": document.source_id,
+            "document_id": job.document_id,
+            "page_reference": term.page_reference,
+            "gender": None,
+            "part_of_speech": "noun",
+            "context": None,
+            "confidence": term.confidence,
+        }
+        for term in terms
+    ]
+    # All terms of the document in one transaction: an attempt either
+    # stores everything or nothing
+    with database.engine.begin() as connection:
+        bulk.insert_terms(connection, rows)
+    if rows:
+        bulk.finish_bulk_write()
+
+
+def _check_no_earlier_terms(job: Row) -> None:
+    """Refuse to re-run a non-resumable import over an earlier attempt's terms."""
+    if job.attempts == 1:
+        return
+    with database.engine.connect() as connection:
+        earlier = connection.execute(
+            select(Term.id).where(Term.document_id == job.document_id).limit(1)
+        ).first()
+    if earlier is not None:
+        raise RuntimeError("Earlier attempt already stored terms; remove them and requeue")
+
+
+def run_job(job: Row) -> None:
+    handler = _handlers.get(job.job_type)
+    if handler is None:
+        raise ValueError(f"No handler for job type '{job.job_type}'")
+    handler(job)
+
+
+# Worker pool
+
+class JobWorkerPool:
+    """Worker threads processing the job queue, plus a lease heartbeat."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        bind: Optional[Engine] = None,
+        poll_interval: float = POLL_INTERVAL,
+        lease_seconds: float = LEASE_SECONDS,
+    ):
+        self.workers = workers
+        self._bind = bind
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._wake_pending = 0
+        self._threads: list[threading.Thread] = []
+        # Job id -> lease owner, for the heartbeat
+        self._leases: dict[int, str] = {}
+        self._leases_lock = threading.Lock()
+        self.processed = 0
+        self.failed_attempts = 0
+
+    @property
+    def bind(self) -> Engine:
+        # Resolved on first use: the module-level pool must not create the
+        # engine when jobs.py is imported
+        return self._bind or database.engine
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, args=(f"{prefix}:worker-{index}",),
+                name=f"job-worker-{index}", daemon=True,
+            )
+            self._threads.append(thread)
+        self._threads.append(threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Job worker pool started with {self.workers} workers")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop claiming jobs and wait for running handlers to return.
+
+        Jobs still running after ``timeout`` keep their lease until it
+        expires and are then picked up again by the next worker.
+        """
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake one idle worker (a job was just queued)."""
+        with self._wake:
+            self._wake_pending += 1
+            self._wake.notify()
+
+    def stats(self) -> dict:
+        with self._leases_lock:
+            active = len(self._leases)
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "active_jobs": active,
+            "processed": self.processed,
+            "failed_attempts": self.failed_attempts,
+            "lease_seconds": self.lease_seconds,
+        }
+
+    def _idle(self) -> None:
+        with self._wake:
+            if not self._wake_pending and not self._stop.is_set():
+                self._wake.wait(self.poll_interval)
+            self._wake_pending = max(0, self._wake_pending - 1)
+
+    def _work(self, owner: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job = claim(self.bind, owner, self.lease_seconds)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                self._idle()
+                continue
+
+            with self._leases_lock:
+                self._leases[job.id] = owner
+            started = time.perf_counter()
+            try:
+                try:
+                    run_job(job)
+                except Exception as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    error = None
+                # Recording the outcome needs the writer connection, which
+                # can time out or hit SQLITE_BUSY under load. The worker must
+                # survive that: the lease expires and fail_expired() requeues
+                # the job.
+                try:
+                    if error is not None:
+                        fail(self.bind, job, owner, error)
+                    else:
+                        complete(self.bind, job, owner)
+                except Exception:
+                    logger.exception(f"Recording the outcome of job {job.id} failed")
+                    continue
+                with self._leases_lock:
+                    if error is not None:
+                        self.failed_attempts += 1
+                    else:
+                        self.processed += 1
+                if error is None:
+                    logger.info(
+                        f"Job {job.id} ({job.job_type}, document {job.document_id}) "
+                        f"completed in {time.perf_counter() - started:.1f}s"
+                    )
+            finally:
+                with self._leases_lock:
+                    self._leases.pop(job.id, None)
+
+    def _heartbeat(self) -> None:
+        interval = max(self.lease_seconds / 3, 0.1)
+        while not self._stop.wait(interval):
+            try:
+                with self._leases_lock:
+                    leases = dict(self._leases)
+                if leases:
+                    lost = renew_leases(self.bind, leases, self.lease_seconds)
+                    with self._leases_lock:
+                        # Jobs that finished meanwhile are not lost
+                        lost.intersection_update(self._leases)
+                    for job_id in lost:
+                        logger.warning(f"Job {job_id}: lease lost")
+                fail_expired(self.bind)
+            except Exception:
+                logger.exception("Job lease heartbeat failed")
+
+
+# Shared pool, started/stopped by the FastAPI startup/shutdown events
+job_pool = JobWorkerPool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background job queue")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="Process jobs until interrupted")
+    worker_parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1))
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue (re)processing of a document")
+    enqueue_parser.add_argument("document_id", type=int)
+    enqueue_parser.add_argument("--type", dest="job_type", help="Job type (default: from the file name)")
+    enqueue_parser.add_argument("--priority", type=int, default=0)
+    subparsers.add_parser("stats", help="Job counts by status")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "worker":
+        pool = JobWorkerPool(workers=args.workers)
+        pool.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            logger.info("Stopping workers after their current job...")
+            pool.stop()
+    elif args.command == "enqueue":
+        document = _load_document(args.document_id)
+        job_type = args.job_type or job_type_for(document.original_filename)
+        if job_type is None:
+            parser.error(f"cannot derive a job type from {document.original_filename}; use --type")
+        with database.engine.begin() as connection:
+            job_id = enqueue(connection, args.document_id, job_type, priority=args.priority)
+        logger.info(f"Queued job {job_id} ({job_type}) for document {args.document_id}")
+    else:
+        with database.engine.connect() as connection:
+            print(queue_stats(connection))
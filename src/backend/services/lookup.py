@@ -0,0 +1,173 @@
+"""
+ETEx - Batch Term Lookup
+
+Resolves many (term, language) pairs to full term cards (source,
+translations, synonyms) in a constant number of queries, for the
+frontend's term cards and CAT-tool integration.
+
+Terms are matched on their normalized key (services/term_key.py), so
+"der Druckmeßumformer" finds "Druckmessumformer".
+
+Query plan, independent of the number of pairs:
+1. Term ids: ``term_key IN (...) AND language_code IN (...)`` seeks
+   ``idx_term_key_language``; pairs outside the request are dropped in
+   Python
+2. Cards: one primary-key IN read of the precomputed ``term_cards`` JSON
+   (services/term_cards.py), no ORM objects
+3. Only for terms without a card yet: sources, translations
+   (``idx_translation_source``) and their target terms, synonym links in
+   both directions (``idx_synonym_term1/2``) and the linked terms, one
+   ``selectinload`` IN query each
+"""
+
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from models import AuthoritativeSource, Term, TermSynonym, Translation
+from services.term_cards import get_cards
+from services.term_key import term_key
+
+
+def _term_ref(term: Term) -> dict:
+    return {
+        "id": term.id,
+        "term": term.term,
+        "language_code": term.language_code,
+        "source_id": term.source_id,
+    }
+
+
+def _source_dict(source: Optional[AuthoritativeSource]) -> Optional[dict]:
+    if source is None:
+        return None
+    return {
+        "id": source.id,
+        "name": source.name,
+        "display_name": source.display_name,
+        "tier": source.tier,
+    }
+
+
+def term_card(term: Term) -> dict:
+    """Card payload for a term whose relationships are loaded."""
+    synonyms = [
+        (link, link.term_2) for link in term.synonyms_as_term1
+    ] + [
+        (link, link.term_1) for link in term.synonyms_as_term2
+    ]
+    return {
+        "id": term.id,
+        "term": term.term,
+        "language_code": term.language_code,
+        "definition": term.definition,
+        "gender": term.gender,
+        "part_of_speech": term.part_of_speech,
+        "context": term.context,
+        "page_reference": term.page_reference,
+        "confidence": term.confidence,
+        "preferred_term_id": term.preferred_term_id,
+        "source": _source_dict(term.source),
+        "translations": [
+            {
+                "id": translation.id,
+                "target_language": translation.target_language,
+                "confidence": translation.confidence,
+                "validated_by_human": translation.validated_by_human,
+                "term": _term_ref(translation.target_term),
+            }
+            for translation in sorted(
+                term.translations_as_source,
+                key=lambda translation: (translation.target_language, -translation.confidence),
+            )
+        ],
+        "synonyms": [
+            {
+                "id": link.id,
+                "relationship_type": link.relationship_type,
+                "is_approved": link.is_approved,
+                "confidence": link.confidence,
+                "term": _term_ref(other),
+            }
+            for link, other in sorted(synonyms, key=lambda pair: (pair[0].relationship_type, pair[1].term))
+        ],
+    }
+
+
+def _load_cards(db: Session, term_ids: list[int]) -> dict[int, dict]:
+    """Cards built from the ORM, for terms the read model has not caught up with."""
+    stmt = (
+        select(Term)
+        .where(Term.id.in_(term_ids))
+        .options(
+            selectinload(Term.source),
+            selectinload(Term.translations_as_source).selectinload(Translation.target_term),
+            selectinload(Term.synonyms_as_term1).selectinload(TermSynonym.term_2),
+            selectinload(Term.synonyms_as_term2).selectinload(TermSynonym.term_1),
+        )
+    )
+    return {term.id: term_card(term) for term in db.scalars(stmt)}
+
+
+def lookup_terms(
+    db: Session,
+    pairs: Iterable[tuple[str, str]],
+    target_languages: Optional[Sequence[str]] = None,
+) -> list[dict]:
+    """
+    Look up term cards for (term, language) pairs.
+
+    Args:
+        db: Database session
+        pairs: (term text, language code) in request order, matched on
+            the term key
+        target_languages: Restrict translations to these languages
+
+    Returns:
+        list[dict]: One result per input pair, in input order, each with
+        the query, ``found`` and the cards of all matching terms (one per
+        source), highest confidence first
+    """
+    pairs = [(text, language.lower()) for text, language in pairs]
+    keys = [(term_key(text, language), language) for text, language in pairs]
+    wanted = set(keys)
+    if not wanted:
+        return []
+
+    stmt = (
+        select(Term.id, Term.term_key, Term.language_code)
+        .where(
+            Term.term_key.in_({key for key, _ in wanted}),
+            Term.language_code.in_({language for _, language in wanted}),
+        )
+        .order_by(Term.confidence.desc(), Term.id)
+    )
+    matches = [(term_id, (key, language)) for term_id, key, language in db.execute(stmt)
+               if (key, language) in wanted]
+
+    by_id = get_cards(db, [term_id for term_id, _ in matches])
+    missing = [term_id for term_id, _ in matches if term_id not in by_id]
+    if missing:
+        by_id.update(_load_cards(db, missing))
+
+    languages = {language.lower() for language in target_languages} if target_languages else None
+    cards: dict[tuple[str, str], list[dict]] = {pair: [] for pair in wanted}
+    for term_id, key in matches:
+        card = by_id[term_id]
+        if languages is not None:
+            card["translations"] = [
+                translation for translation in card["translations"]
+                if translation["target_language"] in languages
+            ]
+        cards[key].append(card)
+
+    return [
+        {
+            "term": text,
+            "language": language,
+            "found": bool(cards[key]),
+            "terms": cards[key],
+        }
+        for (text, language), key in zip(pairs, keys)
+    ]
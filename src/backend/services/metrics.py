@@ -0,0 +1,311 @@
+"""
+ETEx - Request and SQL Metrics
+
+Per-route request latency and SQL activity, exposed in the Prometheus text
+format on ``GET /metrics``:
+
+- ``etex_http_request_duration_seconds`` (histogram): time to the last
+  response byte, by method and route template ("/terms/{term_id}/synonyms",
+  not the raw path; requests that match no route count as "unmatched")
+- ``etex_http_requests_total``: requests by method, route and status
+- ``etex_http_request_sql_queries`` / ``etex_http_request_sql_seconds``
+  (histograms): statements executed and time spent in them per request. An
+  N+1 regression shows up as the query-count buckets of one route moving up
+- ``etex_sql_query_duration_seconds`` (histogram): every statement, by
+  context ("request", or "background" for job workers and startup)
+- ``etex_sql_slow_queries_total``: statements over SLOW_QUERY_MS, by route
+
+SQL is measured with ``before_cursor_execute`` / ``after_cursor_execute``
+listeners on all engines (including the sync engines behind the async
+ones), attributed to the request through a context variable that
+``MetricsMiddleware`` sets; it reaches threadpool endpoints and
+``AsyncSession.run_sync`` callables as well.
+
+Slow statements are logged (logger ``etex.slow_query``) with their
+parameters and, on SQLite, their ``EXPLAIN QUERY PLAN``; the most recent
+ones are kept for ``GET /metrics/slow-queries``.
+
+Configuration (environment): METRICS_ENABLED (default true), SLOW_QUERY_MS
+(default 200; 0 disables the slow-query log), SLOW_QUERY_EXPLAIN (default
+true), SLOW_QUERY_HISTORY (default 50).
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_logger = logging.getLogger("etex.slow_query")
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_HISTORY = int(os.getenv("SLOW_QUERY_HISTORY", "50"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500, 1000)
+SQL_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Statements EXPLAIN QUERY PLAN is run for (not PRAGMA, BEGIN, ...)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+_MAX_LOGGED_STATEMENT = 2000
+_MAX_LOGGED_PARAMETERS = 500
+
+
+@dataclass
+class RequestStats:
+    """SQL activity of one request."""
+    scope: dict
+    queries: int = 0
+    sql_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the (shared) scope
+        return _route_label(self.scope)
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("etex_request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """SQL counters of the request being handled (None outside requests)."""
+    return _request_stats.get()
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one label set."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) else f"{bound:.1f}"
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by label values; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> (kind, help, label names, buckets, {label values: value})
+        self._metrics: dict[str, tuple] = {}
+        self.slow_queries: deque = deque(maxlen=SLOW_QUERY_HISTORY)
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> None:
+        self._metrics[name] = ("counter", help_text, labels, None, {})
+
+    def gauge(self, name: str, help_text: str, labels: tuple = ()) -> None:
+        self._metrics[name] = ("gauge", help_text, labels, None, {})
+
+    def histogram(self, name: str, help_text: str, buckets: tuple, labels: tuple = ()) -> None:
+        self._metrics[name] = ("histogram", help_text, labels, buckets, {})
+
+    def inc(self, name: str, values: tuple = (), amount: float = 1) -> None:
+        series = self._metrics[name][4]
+        with self._lock:
+            series[values] = series.get(values, 0) + amount
+
+    def observe(self, name: str, values: tuple, value: float) -> None:
+        _, _, _, buckets, series = self._metrics[name]
+        with self._lock:
+            histogram = series.get(values)
+            if histogram is None:
+                histogram = series[values] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names, buckets, series) in self._metrics.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for values, value in sorted(series.items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{_labels(label_names, values)} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets, value.counts):
+                        cumulative += count
+                        le = f'le="{_format_bound(bound)}"'
+                        lines.append(f"{name}_bucket{_labels(label_names, values, le)} {cumulative}")
+                    inf = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_labels(label_names, values, inf)} {value.count}")
+                    lines.append(f"{name}_sum{_labels(label_names, values)} {value.sum}")
+                    lines.append(f"{name}_count{_labels(label_names, values)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.histogram(
+    "etex_http_request_duration_seconds", "Request latency to the last response byte",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+metrics.counter("etex_http_requests_total", "Requests handled", ("method", "route", "status"))
+metrics.gauge("etex_http_requests_in_progress", "Requests being handled")
+metrics.histogram(
+    "etex_http_request_sql_queries", "SQL statements executed per request",
+    QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+metrics.histogram(
+    "etex_http_request_sql_seconds", "Time spent in SQL statements per request",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+metrics.histogram(
+    "etex_sql_query_duration_seconds", "SQL statement execution time",
+    SQL_LATENCY_BUCKETS, ("context",),
+)
+metrics.counter("etex_sql_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS", ("route",))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and SQL counters per
+    route template (taken from the scope once the router has matched).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.inc("etex_http_requests_in_progress")
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            metrics.inc("etex_http_requests_in_progress", amount=-1)
+            elapsed = time.perf_counter() - started
+            route = stats.route
+            method = scope["method"]
+            metrics.observe("etex_http_request_duration_seconds", (method, route), elapsed)
+            metrics.inc("etex_http_requests_total", (method, route, str(status)))
+            metrics.observe("etex_http_request_sql_queries", (method, route), stats.queries)
+            metrics.observe("etex_http_request_sql_seconds", (method, route), stats.sql_seconds)
+
+
+def _explain(conn, statement: str, parameters, executemany: bool) -> Optional[list[str]]:
+    """EXPLAIN QUERY PLAN rows of a statement (SQLite only), or None."""
+    if conn.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    # A separate DBAPI cursor: bypasses these listeners and leaves the
+    # statement's own cursor (whose rows are not fetched yet) alone
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as error:  # plan is best effort, never fail the query
+        return [f"(no plan: {error})"]
+    finally:
+        cursor.close()
+
+
+def _record_slow_query(conn, statement, parameters, executemany, elapsed, stats) -> None:
+    route = stats.route if stats else "background"
+    plan = _explain(conn, statement, parameters, executemany) if SLOW_QUERY_EXPLAIN else None
+    metrics.inc("etex_sql_slow_queries_total", (route,))
+    entry = {
+        "at": time.time(),
+        "route": route,
+        "ms": round(elapsed * 1000, 1),
+        "statement": statement[:_MAX_LOGGED_STATEMENT],
+        "parameters": repr(parameters)[:_MAX_LOGGED_PARAMETERS],
+        "plan": plan,
+    }
+    metrics.slow_queries.append(entry)
+    slow_query_logger.warning(
+        "Slow query (%.1f ms, %s): %s\n  parameters: %s%s",
+        entry["ms"], route, entry["statement"], entry["parameters"],
+        "".join(f"\n  plan: {line}" for line in plan or ()),
+    )
+
+
+def slow_queries() -> list[dict]:
+    """The most recent slow statements, newest first."""
+    return list(reversed(metrics.slow_queries))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("etex_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("etex_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if not METRICS_ENABLED:
+        return
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+    metrics.observe(
+        "etex_sql_query_duration_seconds", ("request" if stats else "background",), elapsed
+    )
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        _record_slow_query(conn, statement, parameters, executemany, elapsed, stats)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_query_timer(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("etex_query_start"):
+        conn.info["etex_query_start"].pop()
@@ -0,0 +1,265 @@
+"""
+ETEx - Page-Parallel PDF Extraction
+
+Text extraction for REQUIREMENTS Workflow A (authoritative PDFs such as
+NAMUR or DIN standards), spread over all cores.
+
+- The document is split into contiguous page ranges; each range is one
+  task for a ``ProcessPoolExecutor``.
+- Worker processes are initialised once: pdfplumber is imported, the
+  address-space limit is set (PDF_WORKER_MEMORY_MB) and the open PDF
+  handle is kept between tasks of the same document, so each range only
+  pays for its own pages. With a single worker the ranges run in the
+  calling process on one handle opened and closed by ``extract()``.
+- Results are yielded strictly in page order (``Executor.map``), so
+  ``Term.page_reference`` stays correct however the ranges finish.
+- A page that fails (damaged content stream, MemoryError at the cap) is
+  reported with its error instead of aborting the whole document.
+
+Workers use the 'spawn' start method: the parent may hold database
+connections and threads, which must not be forked. This module therefore
+does not import the database layer at module level.
+
+Usage:
+    python -m services.pdf_extractor data/uploads/ne107.pdf --workers 4
+"""
+
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+# Address-space cap per worker process (0 = unlimited)
+WORKER_MEMORY_MB = int(os.getenv("PDF_WORKER_MEMORY_MB", "1536"))
+
+# Ranges per worker: enough to balance uneven pages, few enough to keep
+# per-task overhead low
+_RANGES_PER_WORKER = 4
+_MIN_RANGE_PAGES = 2
+
+_LIGATURES = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl",
+    "\u00ad": None,  # soft hyphen
+})
+_HYPHENATED_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACES_RE = re.compile(r"[ \t\u00a0]+")
+
+
+@dataclass
+class ExtractedPage:
+    page_number: int  # 1-based, as printed in page_reference
+    text: str
+    error: Optional[str] = None
+
+
+@dataclass
+class ExtractionStats:
+    pages: int = 0
+    failed_pages: int = 0
+    workers: int = 1
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+def normalize_text(text: str) -> str:
+    """Repair common PDF text artefacts: ligatures, soft and line-break hyphens, spacing."""
+    text = unicodedata.normalize("NFC", text).translate(_LIGATURES)
+    text = _HYPHENATED_BREAK_RE.sub(r"\1\2", text)
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """
+    Split pages 1..page_count into contiguous (first, last) ranges.
+
+    Args:
+        page_count: Number of pages
+        workers: Worker processes the ranges are spread over
+
+    Returns:
+        list[tuple[int, int]]: Inclusive 1-based ranges in page order
+    """
+    if page_count <= 0:
+        return []
+    size = max(_MIN_RANGE_PAGES, math.ceil(page_count / (workers * _RANGES_PER_WORKER)))
+    return [(first, min(first + size - 1, page_count)) for first in range(1, page_count + 1, size)]
+
+
+# Worker process state (only ever set inside spawned pool workers; the
+# in-process path opens its own handle per extract() call)
+
+_worker_pdf = None
+_worker_path: Optional[str] = None
+
+
+def _init_worker(memory_mb: int) -> None:
+    """Runs once per worker process: import pdfplumber and cap memory."""
+    import pdfplumber  # noqa: F401  (warm the import for all tasks)
+
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _open_pdf(path: str):
+    """Open path in this worker process, reusing the handle across tasks."""
+    global _worker_pdf, _worker_path
+    if _worker_path != path:
+        import pdfplumber
+
+        if _worker_pdf is not None:
+            _worker_pdf.close()
+        _worker_pdf = pdfplumber.open(path)
+        _worker_path = path
+    return _worker_pdf
+
+
+def _extract_range(path: str, first: int, last: int) -> list[ExtractedPage]:
+    """Pool task: extract pages first..last with the worker's cached handle."""
+    return _extract_pages(_open_pdf(path), first, last)
+
+
+def _extract_pages(pdf, first: int, last: int) -> list[ExtractedPage]:
+    pages = []
+    for number in range(first, last + 1):
+        try:
+            page = pdf.pages[number - 1]
+            try:
+                text = normalize_text(page.extract_text() or "")
+            finally:
+                # Drop the parsed layout objects; the page list stays cheap
+                page.close()
+            pages.append(ExtractedPage(number, text))
+        except MemoryError:
+            pages.append(ExtractedPage(number, "", error="MemoryError: worker memory cap reached"))
+        except Exception as exc:
+            pages.append(ExtractedPage(number, "", error=f"{type(exc).__name__}: {exc}"))
+    return pages
+
+
+def count_pages(path: Path) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(str(path)) as pdf:
+        return len(pdf.pages)
+
+
+class PdfExtractor:
+    """Extracts PDF text page by page in a process pool."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, memory_mb: int = WORKER_MEMORY_MB):
+        self.workers = max(1, workers)
+        self.memory_mb = memory_mb
+        self.stats = ExtractionStats(workers=self.workers)
+
+    def extract(self, path: Path) -> Iterator[ExtractedPage]:
+        """
+        Yield the pages of a PDF in page order.
+
+        Args:
+            path: PDF file
+
+        Yields:
+            ExtractedPage: One per page, starting at page 1
+        """
+        started = time.perf_counter()
+        path = Path(path).resolve()
+        ranges = page_ranges(count_pages(path), self.workers)
+        workers = min(self.workers, len(ranges)) or 1
+        self.stats = ExtractionStats(workers=workers)
+
+        if workers == 1:
+            import pdfplumber
+
+            # Scoped to this call: concurrent extractions in threads of the
+            # same process never share or close each other's handle
+            with pdfplumber.open(str(path)) as pdf:
+                results = (_extract_pages(pdf, first, last) for first, last in ranges)
+                yield from self._collect(results)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.memory_mb,),
+            ) as executor:
+                firsts, lasts = zip(*ranges)
+                results = executor.map(_extract_range, [str(path)] * len(ranges), firsts, lasts)
+                yield from self._collect(results)
+
+        self.stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Extracted {self.stats.pages} pages from {path.name} with {workers} workers "
+            f"in {self.stats.seconds:.1f}s ({self.stats.pages_per_second:.1f} pages/s, "
+            f"{self.stats.failed_pages} failed)"
+        )
+
+    def _collect(self, results) -> Iterator[ExtractedPage]:
+        for batch in results:
+            for page in batch:
+                self.stats.pages += 1
+                if page.error:
+                    self.stats.failed_pages += 1
+                    logger.warning(f"Page {page.page_number}: {page.error}")
+                yield page
+
+
+def extract_document(document_id: int, workers: int = DEFAULT_WORKERS) -> Iterator[ExtractedPage]:
+    """
+    Yield the pages of an uploaded PDF document in page order.
+
+    Args:
+        document_id: UploadedDocument id
+        workers: Worker processes
+
+    Raises:
+        ValueError: Unknown document
+    """
+    # Imported here so spawned workers, which import this module, stay
+    # free of the database layer
+    from database import SessionLocal
+    from models import UploadedDocument
+    from services.uploads import document_path
+
+    with SessionLocal() as db:
+        document = db.get(UploadedDocument, document_id)
+        if document is None:
+            raise ValueError(f"Uploaded document {document_id} not found")
+        path = document_path(document)
+    yield from PdfExtractor(workers=workers).extract(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract PDF text page by page")
+    parser.add_argument("path", type=Path, help="PDF file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--memory-mb", type=int, default=WORKER_MEMORY_MB)
+    parser.add_argument("--print", action="store_true", help="Print page texts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    extractor = PdfExtractor(workers=args.workers, memory_mb=args.memory_mb)
+    for page in extractor.extract(args.path):
+        if args.print:
+            print(f"--- page {page.page_number} ---\n{page.text}")
@@ -0,0 +1,195 @@
+"""
+ETEx - Response Serialization and Compression
+
+- ``FastJSONResponse``: JSON rendered with orjson, the application's
+  default response class. Endpoints with large payloads (search, lookup,
+  browse, thesaurus) return it directly, which also skips FastAPI's
+  ``jsonable_encoder`` walk over the service dicts; orjson serializes
+  datetimes, dataclasses and integer keys natively
+- ``CompressionMiddleware``: brotli or gzip, negotiated from the
+  request's ``Accept-Encoding``, for text and JSON/XML responses of at
+  least COMPRESSION_MIN_SIZE bytes. Streamed exports are compressed chunk
+  by chunk. Other media types are passed through, e.g.
+  ``/export/csv?gzip=true``, which is sent as an ``application/gzip`` file
+  (no ``Content-Encoding``) and must stay out of ``is_compressible``; so
+  are responses that already carry a ``Content-Encoding``
+
+Configuration (environment): COMPRESSION_ENABLED (default true),
+COMPRESSION_MIN_SIZE (default 1024 bytes), COMPRESSION_GZIP_LEVEL
+(default 6), COMPRESSION_BROTLI_QUALITY (default 4; 11 is far too slow
+for dynamic responses). Brotli needs the ``brotli`` package; without it
+only gzip is offered.
+"""
+
+import os
+import zlib
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Offered encodings, preferred first on equal q-values
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE_SUFFIXES = ("json", "xml", "ndjson", "javascript")
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not serialize itself (sets, Decimal, Path, ...)."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (compact UTF-8, integer keys allowed)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the content coding for a request.
+
+    Args:
+        accept_encoding: ``Accept-Encoding`` header value, e.g.
+            "gzip, deflate, br;q=0.9"
+
+    Returns:
+        Optional[str]: "br", "gzip" or None (send the body uncompressed)
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    chosen, best = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best:
+            chosen, best = encoding, weight
+    return chosen
+
+
+def is_compressible(content_type: str) -> bool:
+    """Text, JSON and XML bodies; not archives, images or PDFs."""
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return mime.startswith("text/") or mime.endswith(_COMPRESSIBLE_SUFFIXES)
+
+
+def _compressor(encoding: str) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """(compress, finish) functions of a streaming compressor."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # gzip container
+    return compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with the negotiated
+    content coding (brotli preferred over gzip).
+
+    A complete body smaller than ``minimum_size`` is sent as is; a
+    streamed body is compressed as it is produced, without buffering.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSender(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSender:
+    """``send`` wrapper that holds the response start until the first body."""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[dict] = None
+        self.passthrough = False
+        self.compress: Optional[Callable[[bytes], bytes]] = None
+        self.finish: Optional[Callable[[], bytes]] = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            compressible = is_compressible(headers.get("content-type", ""))
+            if compressible:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            if not compressible or "content-encoding" in headers:
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and (not body or len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compress, self.finish = _compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compress(body) + self.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        body = self.compress(body)
+        if not more_body:
+            body += self.finish()
+        elif not body:
+            return
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
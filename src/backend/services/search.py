@@ -0,0 +1,333 @@
+"""
+ETEx - Full-Text Search Service
+
+Compiles the search modes from docs/REQUIREMENTS.md Section 9 into SQLite
+FTS5 MATCH expressions and runs them against the ``terms_fts`` index.
+
+The ``terms_fts`` virtual table is an external-content FTS5 index over
+``terms.term``, ``terms.definition`` and ``terms.context``. It is created and
+kept in sync by triggers in Alembic revision ``3f9a2c7d8e41``.
+
+Search modes:
+- simple:   every word must appear (implicit AND)
+- phrase:   the words must appear as one contiguous phrase
+- boolean:  AND / OR / NOT operators, parentheses and "quoted phrases"
+- wildcard: trailing ``*`` for prefix matching (e.g. ``Druck*``); a single
+            leading-wildcard word (e.g. ``*sensor``) is answered from the
+            compound head index (services/decompounding.py) for compound
+            languages, and by a suffix match on the term text otherwise
+- exact:    the whole term, on its normalized key (services/term_key.py):
+            "der Druckmeßumformer" finds "Druckmessumformer"; an index seek
+            on ``idx_term_key_language`` instead of an FTS5 query
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from models import Term
+from services.decompounding import COMPOUND_LANGUAGES, find_terms_by_part
+from services.term_key import query_keys
+
+SEARCH_MODES = ("simple", "phrase", "boolean", "wildcard", "exact")
+
+# Column weights for bm25(): a hit in the term itself outranks a hit in
+# the definition or context text.
+BM25_WEIGHTS = (10.0, 1.0, 1.0)
+
+# Words as seen by the unicode61 tokenizer (letters, digits, underscore)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Single leading-wildcard word: "*sensor"
+_HEAD_QUERY_RE = re.compile(r"^\*(\w+)$", re.UNICODE)
+
+# Boolean query tokens: quoted phrases, parentheses, or bare words
+_BOOLEAN_TOKEN_RE = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)', re.UNICODE)
+
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class SearchQueryError(ValueError):
+    """Raised when a search query cannot be compiled for the requested mode."""
+
+
+def _quote(word: str) -> str:
+    """Quote a word or phrase as an FTS5 string literal."""
+    return '"' + word.replace('"', '""') + '"'
+
+
+def _words(query: str) -> list[str]:
+    return _WORD_RE.findall(query)
+
+
+def _compile_simple(query: str) -> str:
+    words = _words(query)
+    if not words:
+        raise SearchQueryError("Search query contains no searchable words")
+    return " ".join(_quote(word) for word in words)
+
+
+def _compile_phrase(query: str) -> str:
+    words = _words(query)
+    if not words:
+        raise SearchQueryError("Search query contains no searchable words")
+    return _quote(" ".join(words))
+
+
+def _compile_wildcard(query: str) -> str:
+    parts = []
+    for raw in query.split():
+        if raw.startswith("*"):
+            raise SearchQueryError(
+                f"Unsupported wildcard in '{raw}': a leading '*' is only "
+                f"supported as a single compound-head query, e.g. '*sensor'"
+            )
+        is_prefix = raw.endswith("*")
+        body = raw.rstrip("*")
+        if "*" in body or "?" in body:
+            raise SearchQueryError(
+                f"Unsupported wildcard in '{raw}': only a trailing '*' is allowed"
+            )
+        words = _words(body)
+        if not words:
+            continue
+        # FTS5 applies a prefix marker to the last token of a phrase, so
+        # "Druck-Mess*" becomes "druck mess"* and still matches in order.
+        literal = _quote(" ".join(words))
+        parts.append(f"{literal}*" if is_prefix else literal)
+    if not parts:
+        raise SearchQueryError("Search query contains no searchable words")
+    return " ".join(parts)
+
+
+def _compile_boolean(query: str) -> str:
+    output: list[str] = []
+    depth = 0
+    expect_operand = True
+
+    for match in _BOOLEAN_TOKEN_RE.finditer(query):
+        phrase, lparen, rparen, word = match.groups()
+
+        if lparen:
+            if not expect_operand:
+                output.append("AND")
+            output.append("(")
+            depth += 1
+            expect_operand = True
+            continue
+
+        if rparen:
+            if expect_operand or depth == 0:
+                raise SearchQueryError("Unbalanced or empty parentheses in query")
+            output.append(")")
+            depth -= 1
+            continue
+
+        if word is not None and word.upper() in _OPERATORS:
+            operator = word.upper()
+            if expect_operand:
+                if operator == "NOT":
+                    raise SearchQueryError(
+                        "NOT needs a left operand, e.g. 'sensor NOT temperature'"
+                    )
+                raise SearchQueryError(f"Operator {operator} is missing an operand")
+            output.append(operator)
+            expect_operand = True
+            continue
+
+        words = _words(phrase if phrase is not None else word)
+        if not words:
+            continue
+        if not expect_operand:
+            output.append("AND")
+        output.append(_quote(" ".join(words)))
+        expect_operand = False
+
+    if depth != 0:
+        raise SearchQueryError("Unbalanced parentheses in query")
+    if expect_operand:
+        if not output:
+            raise SearchQueryError("Search query contains no searchable words")
+        raise SearchQueryError("Query ends with an operator")
+    return " ".join(output)
+
+
+_COMPILERS = {
+    "simple": _compile_simple,
+    "phrase": _compile_phrase,
+    "boolean": _compile_boolean,
+    "wildcard": _compile_wildcard,
+}
+
+
+def compile_match_query(query: str, mode: str = "simple") -> str:
+    """
+    Compile a user query into an FTS5 MATCH expression.
+
+    Args:
+        query: Raw query string as typed by the user
+        mode: One of SEARCH_MODES
+
+    Returns:
+        str: FTS5 MATCH expression with every user word quoted
+
+    Raises:
+        SearchQueryError: If the mode is unknown or the query is invalid
+    """
+    compiler = _COMPILERS.get(mode)
+    if compiler is None:
+        raise SearchQueryError(
+            f"Unknown search mode '{mode}' (expected one of: {', '.join(SEARCH_MODES)})"
+        )
+    return compiler(query)
+
+
+def find_terms_by_key(
+    db: Session,
+    query: str,
+    language_code: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """Whole-term matches on the normalized term key, most confident first."""
+    stmt = (
+        select(
+            Term.id,
+            Term.term,
+            Term.language_code,
+            Term.definition,
+            Term.context,
+            Term.source_id,
+            Term.preferred_term_id,
+            Term.confidence,
+        )
+        .where(Term.term_key.in_(query_keys(query, language_code)))
+        .order_by(Term.confidence.desc(), Term.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    if language_code is not None:
+        stmt = stmt.where(Term.language_code == language_code)
+    if source_id is not None:
+        stmt = stmt.where(Term.source_id == source_id)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def find_terms_by_suffix(
+    db: Session,
+    suffix: str,
+    language_code: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """
+    Terms whose text ends with ``suffix`` (case-insensitive), ordered by
+    term text. A scan of ``terms``: used for leading-wildcard queries in
+    languages without a compound index.
+    """
+    pattern = "%" + suffix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    stmt = (
+        select(
+            Term.id,
+            Term.term,
+            Term.language_code,
+            Term.definition,
+            Term.context,
+            Term.source_id,
+            Term.preferred_term_id,
+            Term.confidence,
+        )
+        .where(Term.term.ilike(pattern, escape="\\"))
+        .order_by(Term.term, Term.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    if language_code is not None:
+        stmt = stmt.where(Term.language_code == language_code)
+    if source_id is not None:
+        stmt = stmt.where(Term.source_id == source_id)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def search_terms(
+    db: Session,
+    query: str,
+    mode: str = "simple",
+    language_code: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """
+    Search terms, definitions and context through the FTS5 index.
+
+    Args:
+        db: Database session
+        query: Raw query string
+        mode: One of SEARCH_MODES
+        language_code: Optional ISO 639-1 filter
+        source_id: Optional authoritative source filter
+        limit: Maximum number of hits
+        offset: Number of hits to skip
+
+    Returns:
+        list[dict]: Hits ordered by bm25 relevance (best first; exact mode:
+        by confidence)
+    """
+    if mode == "exact":
+        return find_terms_by_key(
+            db, query, language_code=language_code, source_id=source_id, limit=limit, offset=offset
+        )
+    if mode == "wildcard":
+        head_query = _HEAD_QUERY_RE.match(query.strip())
+        if head_query:
+            # The head index only covers compound languages; without a
+            # language filter, other languages' terms must match too
+            if language_code in COMPOUND_LANGUAGES:
+                return find_terms_by_part(
+                    db,
+                    head_query.group(1),
+                    role="head",
+                    language_code=language_code,
+                    source_id=source_id,
+                    limit=limit,
+                    offset=offset,
+                )
+            return find_terms_by_suffix(
+                db,
+                head_query.group(1),
+                language_code=language_code,
+                source_id=source_id,
+                limit=limit,
+                offset=offset,
+            )
+
+    match = compile_match_query(query, mode)
+
+    filters = ""
+    params: dict = {"match": match, "limit": limit, "offset": offset}
+    if language_code is not None:
+        filters += " AND t.language_code = :language_code"
+        params["language_code"] = language_code
+    if source_id is not None:
+        filters += " AND t.source_id = :source_id"
+        params["source_id"] = source_id
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    sql = text(
+        f"""
+        SELECT t.id, t.term, t.language_code, t.definition, t.context,
+               t.source_id, t.preferred_term_id, t.confidence,
+               bm25(terms_fts, {weights}) AS rank
+        FROM terms_fts
+        JOIN terms AS t ON t.id = terms_fts.rowid
+        WHERE terms_fts MATCH :match{filters}
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+        """
+    )
+    return [dict(row) for row in db.execute(sql, params).mappings()]
@@ -0,0 +1,405 @@
+"""
+ETEx - Chunked CSV/Excel Importer
+
+Imports glossary spreadsheets (NAMUR, internal glossaries; typically
+100k+ rows) into ``terms`` without one ORM object per row.
+
+- CSV is read with ``pandas.read_csv(chunksize=...)``, XLSX with openpyxl in
+  read-only streaming mode; only one chunk of rows is in memory at a time.
+- Every chunk is validated column-wise against the Term constraints
+  (non-empty term, gender in m/f/n, confidence in 0.0-1.0). Invalid rows
+  are counted and skipped, never sent to the database.
+- Valid rows are written with SQLAlchemy Core ``executemany`` inserts
+  (services/bulk.py), one transaction per chunk.
+- The number of rows consumed is stored in
+  ``UploadedDocument.import_checkpoint`` in the same transaction as the
+  chunk, so a failed import resumes after the last committed chunk.
+
+Expected header (case-insensitive, aliases in COLUMN_ALIASES):
+    term, language_code, definition, gender, part_of_speech, context,
+    confidence, page_reference
+Only ``term`` is required; rows without a language use --language.
+
+Usage:
+    python -m services.spreadsheet_import data/uploads/namur.xlsx --source NAMUR
+    python -m services.spreadsheet_import --resume 12
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Connection, Engine
+
+import database
+from models import UploadedDocument
+from services import bulk
+from services.tbx_import import GENDER_MAP
+from services.uploads import document_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000  # rows per transaction
+
+CSV_SUFFIXES = {".csv", ".txt"}
+EXCEL_SUFFIXES = {".xlsx", ".xlsm"}
+
+MIME_TYPES = {
+    ".csv": "text/csv",
+    ".txt": "text/csv",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xlsm": "application/vnd.ms-excel.sheet.macroEnabled.12",
+}
+
+# Spreadsheet header -> Term column
+COLUMN_ALIASES = {
+    "term": "term",
+    "benennung": "term",
+    "language": "language_code",
+    "language_code": "language_code",
+    "lang": "language_code",
+    "sprache": "language_code",
+    "definition": "definition",
+    "gender": "gender",
+    "genus": "gender",
+    "part_of_speech": "part_of_speech",
+    "pos": "part_of_speech",
+    "context": "context",
+    "domain": "context",
+    "confidence": "confidence",
+    "page_reference": "page_reference",
+    "page": "page_reference",
+}
+
+TEXT_COLUMNS = ("definition", "part_of_speech", "context", "page_reference")
+
+# Column widths from models.Term
+_MAX_LENGTHS = {"term": 500, "language_code": 10, "part_of_speech": 50, "page_reference": 100}
+
+
+@dataclass
+class SpreadsheetImportStats:
+    rows: int = 0
+    terms: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    resumed_from: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _normalize_header(values) -> list[Optional[str]]:
+    header = []
+    for value in values:
+        key = str(value).strip().lower().replace(" ", "_") if value is not None else ""
+        header.append(COLUMN_ALIASES.get(key))
+    if "term" not in header:
+        raise ValueError("Spreadsheet has no 'term' column")
+    return header
+
+
+def _iter_csv(path: Path, chunk_size: int, skip_rows: int) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        sep=None,
+        engine="python",
+        encoding="utf-8-sig",
+        chunksize=chunk_size,
+        skiprows=range(1, skip_rows + 1),
+    )
+    with reader:
+        for chunk in reader:
+            chunk.columns = _normalize_header(chunk.columns)
+            yield chunk
+
+
+def _iter_excel(path: Path, chunk_size: int, skip_rows: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalize_header(next(rows, ()))
+        buffer: list[tuple] = []
+        for index, row in enumerate(rows):
+            if index < skip_rows:
+                continue
+            buffer.append(row[:len(header)])
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or XLSX file in chunks of data rows.
+
+    Args:
+        path: Spreadsheet file
+        chunk_size: Data rows per chunk
+        skip_rows: Data rows (after the header) to skip, e.g. a checkpoint
+
+    Yields:
+        pd.DataFrame: Chunk with Term column names; unknown columns are None
+    """
+    suffix = path.suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        return _iter_csv(path, chunk_size, skip_rows)
+    if suffix in EXCEL_SUFFIXES:
+        return _iter_excel(path, chunk_size, skip_rows)
+    raise ValueError(f"Unsupported spreadsheet type: {path.suffix}")
+
+
+def _text(column: pd.Series) -> pd.Series:
+    """Stripped strings; empty cells become ''."""
+    return column.where(column.notna(), "").astype(str).str.strip()
+
+
+def validate_chunk(chunk: pd.DataFrame, default_language: Optional[str] = None) -> tuple[list[dict], int]:
+    """
+    Validate a chunk against the Term constraints and build insert rows.
+
+    Args:
+        chunk: Rows from iter_chunks
+        default_language: Language for rows without language_code
+
+    Returns:
+        tuple[list[dict], int]: Term column dicts (without source/document)
+        and the number of rejected rows
+    """
+    chunk = chunk.loc[:, [column for column in chunk.columns if column is not None]]
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+    empty = pd.Series("", index=chunk.index)
+
+    term = _text(chunk["term"])
+    valid = term.ne("") & term.str.len().le(_MAX_LENGTHS["term"])
+
+    language = _text(chunk["language_code"]) if "language_code" in chunk else empty
+    language = language.str.split(r"[-_]", n=1, regex=True).str[0].str.lower()
+    if default_language:
+        language = language.mask(language.eq(""), default_language)
+    valid &= language.ne("") & language.str.len().le(_MAX_LENGTHS["language_code"])
+
+    gender_text = _text(chunk["gender"]).str.lower() if "gender" in chunk else empty
+    gender = gender_text.map(GENDER_MAP)
+    valid &= gender_text.eq("") | gender.notna()
+
+    confidence_text = _text(chunk["confidence"]) if "confidence" in chunk else empty
+    confidence = pd.to_numeric(confidence_text.str.replace(",", ".", regex=False), errors="coerce")
+    confidence = confidence.mask(confidence_text.eq(""), 1.0)
+    valid &= confidence.between(0.0, 1.0)
+
+    columns = {
+        "term": term,
+        "language_code": language,
+        "gender": gender.astype(object).where(gender.notna(), None),
+        "confidence": confidence,
+    }
+    for name in TEXT_COLUMNS:
+        value = _text(chunk[name]) if name in chunk else empty
+        if name in _MAX_LENGTHS:
+            value = value.str.slice(0, _MAX_LENGTHS[name])
+        columns[name] = value.astype(object).mask(value.eq(""), None)
+
+    frame = pd.DataFrame(columns)[valid]
+    frame["confidence"] = frame["confidence"].astype(float)
+    return frame.to_dict("records"), int((~valid).sum())
+
+
+class SpreadsheetImporter:
+    """Chunked, resumable importer for one UploadedDocument."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        document_id: int,
+        source_name: Optional[str] = None,
+        default_language: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.bind = bind
+        self.document_id = document_id
+        self.source_name = source_name
+        self.default_language = default_language
+        self.chunk_size = chunk_size
+        self.source_id: Optional[int] = None
+        self.stats = SpreadsheetImportStats()
+
+    def run(self) -> SpreadsheetImportStats:
+        """
+        Import (or resume importing) the document's spreadsheet.
+
+        Returns:
+            SpreadsheetImportStats: Counts and elapsed time for this run
+
+        Raises:
+            ValueError: Unknown document or unsupported file
+        """
+        started = time.perf_counter()
+        with self.bind.begin() as connection:
+            document = connection.execute(
+                select(UploadedDocument).where(UploadedDocument.id == self.document_id)
+            ).first()
+            if document is None:
+                raise ValueError(f"Uploaded document {self.document_id} not found")
+            path = document_path(document)
+            self.source_id = document.source_id
+            if self.source_id is None and self.source_name:
+                self.source_id = bulk.get_or_create_source(
+                    connection, self.source_name, source_type="manual", tier=2
+                )
+            checkpoint = document.import_checkpoint
+            self._set_document(connection, processing_status="processing", error_message=None,
+                               source_id=self.source_id)
+
+        self.stats.resumed_from = checkpoint
+        if checkpoint:
+            logger.info(f"Resuming import of {path.name} after row {checkpoint}")
+
+        # The writer connection is checked out per chunk, not for the whole
+        # run, so concurrent imports and API writes interleave
+        try:
+            for chunk in iter_chunks(path, self.chunk_size, skip_rows=checkpoint):
+                self._write_chunk(chunk, checkpoint + len(chunk))
+                checkpoint += len(chunk)
+        except Exception as exc:
+            with self.bind.begin() as connection:
+                self._set_document(connection, processing_status="failed",
+                                   error_message=str(exc), processed_at=func.now())
+            logger.error(f"Import of {path.name} failed after row {checkpoint}: {exc}")
+            raise
+        finally:
+            if self.stats.terms:
+                bulk.finish_bulk_write()
+
+        with self.bind.begin() as connection:
+            self._set_document(connection, processing_status="completed",
+                               processed_at=func.now())
+
+        self.stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Spreadsheet import from {path.name}: {self.stats.rows} rows, "
+            f"{self.stats.terms} terms, {self.stats.rejected} rejected in "
+            f"{self.stats.seconds:.1f}s ({self.stats.rows_per_second:.0f} rows/s)"
+        )
+        return self.stats
+
+    def _set_document(self, connection: Connection, **values) -> None:
+        connection.execute(
+            update(UploadedDocument)
+            .where(UploadedDocument.id == self.document_id)
+            .values(**values)
+        )
+
+    def _write_chunk(self, chunk: pd.DataFrame, checkpoint: int) -> None:
+        rows, rejected = validate_chunk(chunk, self.default_language)
+        for row in rows:
+            row["source_id"] = self.source_id
+            row["document_id"] = self.document_id
+
+        # Terms and checkpoint commit together: a crash leaves either both
+        # or neither, so a resume never duplicates or skips rows.
+        with self.bind.begin() as connection:
+            bulk.insert_terms(connection, rows)
+            self._set_document(connection, import_checkpoint=checkpoint)
+
+        self.stats.chunks += 1
+        self.stats.rows += len(chunk)
+        self.stats.terms += len(rows)
+        self.stats.rejected += rejected
+
+
+def register_document(
+    path: Path,
+    source_name: Optional[str] = None,
+    bind: Optional[Engine] = None,
+) -> int:
+    """
+    Create an UploadedDocument row for a spreadsheet on disk.
+
+    Returns:
+        int: UploadedDocument id
+    """
+    path = Path(path).resolve()
+    with (bind or database.engine).begin() as connection:
+        source_id = None
+        if source_name:
+            source_id = bulk.get_or_create_source(connection, source_name, source_type="manual", tier=2)
+        return connection.execute(
+            UploadedDocument.__table__.insert()
+            .values(
+                filename=str(path),
+                original_filename=path.name,
+                file_size=path.stat().st_size,
+                mime_type=MIME_TYPES.get(path.suffix.lower()),
+                source_id=source_id,
+                processing_status="pending",
+            )
+            .returning(UploadedDocument.id)
+        ).scalar_one()
+
+
+def import_spreadsheet(
+    document_id: int,
+    source_name: Optional[str] = None,
+    default_language: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    bind: Optional[Engine] = None,
+) -> SpreadsheetImportStats:
+    """
+    Import an uploaded CSV/XLSX document, resuming from its checkpoint.
+
+    Args:
+        document_id: UploadedDocument to import
+        source_name: AuthoritativeSource name if the document has none
+        default_language: Language for rows without language_code
+        chunk_size: Rows per transaction
+        bind: Engine to write to (default: application engine)
+
+    Returns:
+        SpreadsheetImportStats: Counts and elapsed time for this run
+    """
+    importer = SpreadsheetImporter(
+        bind or database.engine,
+        document_id,
+        source_name=source_name,
+        default_language=default_language,
+        chunk_size=chunk_size,
+    )
+    return importer.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a CSV/XLSX glossary")
+    parser.add_argument("path", type=Path, nargs="?", help="CSV or XLSX file")
+    parser.add_argument("--resume", type=int, metavar="DOCUMENT_ID", help="Resume an earlier import")
+    parser.add_argument("--source", help="AuthoritativeSource name, e.g. NAMUR")
+    parser.add_argument("--language", help="Language for rows without language_code")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    if (args.path is None) == (args.resume is None):
+        parser.error("give either a file path or --resume DOCUMENT_ID")
+
+    logging.basicConfig(level=logging.INFO)
+    document_id = args.resume or register_document(args.path, args.source)
+    logger.info(f"Uploaded document {document_id}")
+    import_spreadsheet(
+        document_id,
+        source_name=args.source,
+        default_language=args.language,
+        chunk_size=args.chunk_size,
+    )
@@ -0,0 +1,369 @@
+"""
+ETEx - Cross-Source Synonym Candidates (MinHash LSH)
+
+Offline discovery of terms from different authoritative sources (NAMUR,
+IATE, DIN, IEC, ...) whose definitions say the same thing in different
+words. Found pairs are written as unapproved ``TermSynonym`` suggestions
+(detection_method 'minhash') with the estimated definition similarity as
+``confidence``, for review via ``PUT /synonyms/{id}/approve``.
+
+Comparing all pairs of definitions is O(n^2); instead:
+- Definitions are normalized (services/deviation.py ``normalize_token``)
+  and cut into character 5-gram shingles.
+- Each shingle set is reduced to a 128-value MinHash signature (NumPy,
+  vectorized over batches of definitions). Signatures are stored in
+  ``definition_signatures``; a run only signs new or edited definitions.
+- Signatures are split into 32 bands of 4 rows and bucketed per band
+  (sort + run detection over all terms). Only terms sharing a bucket in
+  at least one band are compared, so the run is O(n log n). With these
+  parameters pairs above ~0.42 Jaccard similarity become candidates.
+- Candidates are verified with the full signatures (fraction of equal
+  MinHash values estimates the Jaccard similarity) and kept from
+  MIN_SIMILARITY up.
+
+Incremental: only pairs involving a term whose signature is pending
+(``compared_at`` NULL: new or changed definition, e.g. a freshly imported
+source) are considered; ``--full`` compares everything again.
+
+Usage:
+    python -m services.synonym_candidates run
+    python -m services.synonym_candidates run --full --min-similarity 0.6
+"""
+
+import argparse
+import logging
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+import database
+from models import DefinitionSignature, Term
+from services import bulk
+from services.deviation import normalize_token
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+MIN_SIMILARITY = 0.5
+# Definitions shorter than this (normalized characters) are not signed:
+# "see IEC 60050" matches far too much
+MIN_DEFINITION_LENGTH = 20
+# Buckets larger than this are boilerplate ("device for measuring ..."
+# repeated verbatim); comparing inside them would be quadratic
+MAX_BUCKET_SIZE = 50
+
+DETECTION_METHOD = "minhash"
+
+_BATCH_SIZE = 1000
+# Definitions hashed per array operation (~100 shingles each: 128 x 25k
+# uint64 intermediate values, ~26 MB)
+_SIGN_BATCH_SIZE = 250
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+# Hash family parameters (odd multipliers), fixed so that stored
+# signatures stay comparable across runs
+_random = np.random.RandomState(20251124)
+_A = _random.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _random.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_BAND_MIX = _random.randint(1, 1 << 62, size=ROWS, dtype=np.int64).astype(np.uint64)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass
+class DiscoveryStats:
+    signed: int = 0
+    compared: int = 0
+    pending: int = 0
+    candidates: int = 0
+    suggestions: int = 0
+    seconds: float = 0.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_definition(text: str) -> str:
+    return " ".join(normalize_token(token) for token in _TOKEN_RE.findall(text))
+
+
+def shingle_hashes(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    64-bit polynomial hashes of the character shingles of normalized
+    definitions, concatenated, plus the start offset of each text.
+
+    Computed for the whole batch at once over the code points; windows
+    crossing from one text into the next are dropped. Repeated shingles
+    stay in (the minimum is the same for a set and a multiset).
+    """
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+    window_count = len(codes) - SHINGLE_SIZE + 1
+    hashes = np.zeros(window_count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + window_count]  # wraps modulo 2^64
+    text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    position = np.arange(window_count) - np.repeat(text_starts, lengths)[:window_count]
+    keep = position <= np.repeat(lengths - SHINGLE_SIZE, lengths)[:window_count]
+    starts = np.concatenate(([0], np.cumsum(lengths - SHINGLE_SIZE + 1)[:-1]))
+    return hashes[keep], starts
+
+
+def minhash_many(texts: list[str]) -> np.ndarray:
+    """
+    MinHash signatures of normalized definitions (each at least
+    SHINGLE_SIZE characters): (n, NUM_PERM) uint32.
+
+    Multiply-shift hash family h(x) = (a * x + b) >> 32 over 64-bit
+    arithmetic, all shingles of the batch in one array operation; per-text
+    minima come from ``np.minimum.reduceat``.
+    """
+    hashes, starts = shingle_hashes(texts)
+    hashed = (_A[:, None] * hashes[None, :] + _B[:, None]) >> np.uint64(32)
+    return np.minimum.reduceat(hashed, starts, axis=1).T.astype("<u4")
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of one normalized definition: NUM_PERM uint32 values."""
+    return minhash_many([text])[0]
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(n, BANDS) bucket keys: each band's ROWS values mixed into one uint64."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    return (bands * _BAND_MIX).sum(axis=2)  # wraps modulo 2^64
+
+
+def sign_definitions(connection: Connection, stats: DiscoveryStats) -> None:
+    """Sign new and edited definitions of sourced terms; drop signatures of removed ones."""
+    connection.execute(
+        delete(DefinitionSignature).where(
+            DefinitionSignature.term_id.in_(select(Term.id).where(Term.definition.is_(None)))
+        )
+    )
+    rows = connection.execution_options(yield_per=_BATCH_SIZE).execute(
+        select(Term.id, Term.definition, DefinitionSignature.definition_hash)
+        .outerjoin(DefinitionSignature, DefinitionSignature.term_id == Term.id)
+        .where(Term.definition.is_not(None), Term.source_id.is_not(None))
+    )
+    batch: list[dict] = []
+    texts: list[str] = []
+    stale: list[int] = []
+    for term_id, definition, stored_hash in rows:
+        definition_hash = zlib.crc32(definition.encode("utf-8"))
+        if definition_hash == stored_hash:
+            continue
+        text = normalize_definition(definition)
+        if len(text) < MIN_DEFINITION_LENGTH:
+            if stored_hash is not None:
+                stale.append(term_id)
+            continue
+        batch.append({"term_id": term_id, "definition_hash": definition_hash})
+        texts.append(text)
+        if len(batch) >= _SIGN_BATCH_SIZE:
+            _write_signatures(connection, batch, texts, stats)
+    _write_signatures(connection, batch, texts, stats)
+    if stale:
+        connection.execute(delete(DefinitionSignature).where(DefinitionSignature.term_id.in_(stale)))
+
+
+def _write_signatures(connection: Connection, batch: list[dict], texts: list[str], stats: DiscoveryStats) -> None:
+    if not batch:
+        return
+    for row, signature in zip(batch, minhash_many(texts)):
+        row["signature"] = signature.tobytes()
+    stmt = sqlite_insert(DefinitionSignature)
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DefinitionSignature.term_id],
+            set_={
+                "definition_hash": stmt.excluded.definition_hash,
+                "signature": stmt.excluded.signature,
+                "updated_at": _utcnow(),
+                "compared_at": None,
+            },
+        ),
+        batch,
+    )
+    stats.signed += len(batch)
+    batch.clear()
+    texts.clear()
+
+
+def find_candidates(
+    term_ids: np.ndarray,
+    source_ids: np.ndarray,
+    languages: np.ndarray,
+    pending: np.ndarray,
+    signatures: np.ndarray,
+    min_similarity: float = MIN_SIMILARITY,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    LSH candidate pairs across sources, verified on the full signatures.
+
+    Args:
+        term_ids, source_ids, languages, pending: Per-signature arrays (n,),
+            term_ids ascending
+        signatures: (n, NUM_PERM) MinHash values
+        min_similarity: Minimum estimated Jaccard similarity
+
+    Returns:
+        tuple: (term id 1, term id 2, similarity) arrays, term id 1 < term id 2
+    """
+    keys = band_keys(signatures)
+    found: list[np.ndarray] = []
+    scores: list[np.ndarray] = []
+
+    def collect(left: np.ndarray, right: np.ndarray) -> None:
+        # Verified right away: candidates of common buckets never pile up
+        keep = (
+            (pending[left] | pending[right])
+            & (source_ids[left] != source_ids[right])
+            & (languages[left] == languages[right])
+        )
+        left, right = left[keep], right[keep]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = similarity >= min_similarity
+        if keep.any():
+            left, right = left[keep], right[keep]
+            found.append(np.stack([np.minimum(left, right), np.maximum(left, right)], axis=1))
+            scores.append(similarity[keep])
+
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        lengths = np.diff(np.r_[starts, len(order)])
+        has_pending = np.add.reduceat(pending[order], starts) > 0
+        # Buckets of two, by far the most common: all at once
+        pairs = starts[(lengths == 2) & has_pending]
+        collect(order[pairs], order[pairs + 1])
+        for run in np.flatnonzero((lengths > 2) & (lengths <= MAX_BUCKET_SIZE) & has_pending):
+            members = order[starts[run]:starts[run] + lengths[run]]
+            left, right = np.triu_indices(len(members), k=1)
+            collect(members[left], members[right])
+
+    if not found:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64)
+    # A pair sharing several bands was found once per band
+    pairs, first_seen = np.unique(np.concatenate(found), axis=0, return_index=True)
+    similarity = np.concatenate(scores)[first_seen]
+    return term_ids[pairs[:, 0]], term_ids[pairs[:, 1]], similarity
+
+
+def _load_signatures(connection: Connection, full: bool):
+    rows = connection.execute(
+        select(
+            DefinitionSignature.term_id,
+            Term.source_id,
+            Term.language_code,
+            DefinitionSignature.compared_at.is_(None),
+            DefinitionSignature.signature,
+        )
+        .join(Term, Term.id == DefinitionSignature.term_id)
+        .where(Term.source_id.is_not(None))
+        .order_by(DefinitionSignature.term_id)
+    ).all()
+    count = len(rows)
+    term_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+    source_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+    _, languages = np.unique(np.array([row[2] for row in rows], dtype=object), return_inverse=True)
+    pending = np.ones(count, dtype=bool) if full else np.fromiter((bool(row[3]) for row in rows), dtype=bool, count=count)
+    signatures = np.frombuffer(b"".join(row[4] for row in rows), dtype="<u4").reshape(count, NUM_PERM)
+    return term_ids, source_ids, languages, pending, signatures
+
+
+def discover_synonym_candidates(
+    bind: Optional[Engine] = None,
+    full: bool = False,
+    min_similarity: float = MIN_SIMILARITY,
+) -> DiscoveryStats:
+    """
+    Sign pending definitions, find cross-source candidates and store them
+    as unapproved TermSynonym suggestions.
+
+    Args:
+        bind: Writer engine (default: application engine)
+        full: Compare all signatures, not only pending ones
+        min_similarity: Minimum estimated Jaccard similarity of definitions
+
+    Returns:
+        DiscoveryStats
+    """
+    started = time.perf_counter()
+    bind = bind or database.engine
+    stats = DiscoveryStats()
+    with bind.begin() as connection:
+        sign_definitions(connection, stats)
+
+    # Reading and bucketing needs no transaction on the writer
+    with bind.connect() as connection:
+        term_ids, source_ids, languages, pending, signatures = _load_signatures(connection, full)
+    stats.compared = len(term_ids)
+    stats.pending = int(pending.sum())
+    if stats.pending:
+        first, second, similarity = find_candidates(
+            term_ids, source_ids, languages, pending, signatures, min_similarity
+        )
+    else:
+        first = second = np.array([], dtype=np.int64)
+        similarity = np.array([], dtype=np.float64)
+    stats.candidates = len(first)
+
+    with bind.begin() as connection:
+        existing = bulk.linked_pairs(connection, set(first.tolist()) | set(second.tolist()))
+        rows = [
+            {
+                "term_id_1": term_id_1,
+                "term_id_2": term_id_2,
+                "relationship_type": "synonym",
+                "confidence": round(score, 3),
+                "is_approved": False,
+                "detection_method": DETECTION_METHOD,
+            }
+            for term_id_1, term_id_2, score in zip(first.tolist(), second.tolist(), similarity.tolist())
+            if (term_id_1, term_id_2) not in existing
+        ]
+        for start in range(0, len(rows), _BATCH_SIZE):
+            bulk.insert_synonyms(connection, rows[start:start + _BATCH_SIZE])
+        stats.suggestions = len(rows)
+        connection.execute(
+            update(DefinitionSignature)
+            .where(DefinitionSignature.compared_at.is_(None))
+            .values(compared_at=_utcnow())
+        )
+    if rows:
+        bulk.finish_bulk_write()
+
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        f"Synonym candidates: {stats.signed} definitions signed, {stats.pending}/{stats.compared} "
+        f"pending, {stats.candidates} candidates, {stats.suggestions} new suggestions "
+        f"in {stats.seconds:.1f}s"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-source synonym candidates from definitions")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--full", action="store_true", help="Compare all definitions, not only new ones")
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(discover_synonym_candidates(full=args.full, min_similarity=args.min_similarity))
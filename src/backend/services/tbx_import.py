@@ -0,0 +1,482 @@
+"""
+ETEx - Streaming TBX Importer
+
+Imports TBX terminology exports (REQUIREMENTS Workflow C, e.g. the IEC
+Electropedia export) with flat memory use regardless of file size.
+
+- The file is parsed incrementally with ``iterparse``; every concept entry
+  is converted and then detached from the tree, so at most one entry's
+  elements are alive at a time.
+- Entries are buffered into batches and written with SQLAlchemy Core
+  ``executemany`` inserts (services/bulk.py), one transaction per batch.
+- Cross-references between entries are resolved through an in-memory map
+  of entry id -> {language: term id}; references to entries that appear
+  later in the file are resolved at the end.
+
+Supported layouts: TBX-Basic / TBX 2008 (termEntry, langSet, tig/ntig) and
+TBX v3 (conceptEntry, langSec, termSec), with or without namespaces.
+
+Mapping:
+- each <term>                       -> Term (linked to the AuthoritativeSource)
+- several terms in one language     -> TermSynonym 'synonym' + preferred_term_id
+- terms in different languages      -> Translation (primary term to primary term)
+- crossReference / relatedConcept   -> TermSynonym 'related'
+- relatedConceptBroader             -> TermSynonym 'broader' (target is
+                                       the broader concept)
+
+Links are stored once per unordered term pair, as (smaller id, larger
+id): reciprocal references (A -> B and B -> A, the usual case in TBX) and
+pairs that are already linked are skipped.
+
+Usage:
+    python -m services.tbx_import data/uploads/iec.tbx --source IEC
+"""
+
+import argparse
+import logging
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.engine import Connection, Engine
+
+import database
+from models import AuthoritativeSource
+from services import bulk
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000  # concept entries per transaction
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+ENTRY_TAGS = {"termEntry", "conceptEntry"}
+LANG_TAGS = {"langSet", "langSec"}
+TERM_GROUP_TAGS = {"tig", "ntig", "termSec"}
+# TBX reference type -> TermSynonym relationship (source entry to target)
+REFERENCE_TYPES = {
+    "crossReference": "related",
+    "relatedConcept": "related",
+    "relatedConceptBroader": "broader",
+}
+# Relationship of the reversed pair
+_INVERSE_RELATIONS = {"related": "related", "broader": "narrower", "narrower": "broader"}
+
+GENDER_MAP = {
+    "masculine": "m",
+    "feminine": "f",
+    "neuter": "n",
+    "m": "m",
+    "f": "f",
+    "n": "n",
+}
+
+PREFERRED_STATUSES = {"preferredTerm-admn-sts", "preferred"}
+
+
+@dataclass
+class TbxTerm:
+    text: str
+    definition: Optional[str] = None
+    part_of_speech: Optional[str] = None
+    gender: Optional[str] = None
+    preferred: bool = False
+
+
+@dataclass
+class TbxLanguage:
+    code: str
+    definition: Optional[str] = None
+    terms: list[TbxTerm] = field(default_factory=list)
+
+
+@dataclass
+class TbxEntry:
+    entry_id: Optional[str]
+    context: Optional[str] = None
+    languages: list[TbxLanguage] = field(default_factory=list)
+    # (target entry id, relationship type)
+    references: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class ImportStats:
+    entries: int = 0
+    terms: int = 0
+    synonyms: int = 0
+    translations: int = 0
+    references: int = 0
+    unresolved_references: int = 0
+    seconds: float = 0.0
+
+    @property
+    def terms_per_second(self) -> float:
+        return self.terms / self.seconds if self.seconds else 0.0
+
+
+def _local(tag: str) -> str:
+    """Tag name without namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(element: ET.Element) -> Optional[str]:
+    value = "".join(element.itertext()).strip()
+    return value or None
+
+
+def _language_code(value: Optional[str]) -> Optional[str]:
+    """'de-DE' -> 'de'"""
+    if not value:
+        return None
+    return value.split("-")[0].split("_")[0].lower()[:10]
+
+
+def _parse_term_group(group: ET.Element) -> Optional[TbxTerm]:
+    term = TbxTerm(text="")
+    for child in group.iter():
+        tag = _local(child.tag)
+        kind = child.get("type")
+        if tag == "term":
+            term.text = _text(child) or ""
+        elif tag == "termNote":
+            value = _text(child)
+            if kind == "partOfSpeech" and value:
+                term.part_of_speech = value[:50]
+            elif kind == "grammaticalGender" and value:
+                term.gender = GENDER_MAP.get(value.lower())
+            elif kind == "administrativeStatus" and value in PREFERRED_STATUSES:
+                term.preferred = True
+        elif tag == "descrip" and kind == "definition":
+            term.definition = _text(child)
+    return term if term.text else None
+
+
+def _parse_language(element: ET.Element) -> TbxLanguage:
+    language = TbxLanguage(code=_language_code(element.get(XML_LANG)) or "")
+    for item in element:
+        tag = _local(item.tag)
+        if tag in TERM_GROUP_TAGS:
+            term = _parse_term_group(item)
+            if term is not None:
+                language.terms.append(term)
+        elif tag in ("descrip", "descripGrp"):
+            for descrip in item.iter():
+                if _local(descrip.tag) == "descrip" and descrip.get("type") == "definition":
+                    language.definition = _text(descrip)
+    return language
+
+
+def parse_entry(element: ET.Element) -> TbxEntry:
+    """Convert one termEntry/conceptEntry element."""
+    entry = TbxEntry(entry_id=element.get("id"))
+    subject_field = None
+    for child in element:
+        if _local(child.tag) in LANG_TAGS:
+            language = _parse_language(child)
+            if language.code and language.terms:
+                entry.languages.append(language)
+            continue
+        # Entry-level descriptions and references
+        for item in child.iter():
+            kind = item.get("type")
+            target = item.get("target")
+            if kind in REFERENCE_TYPES and target:
+                entry.references.append((target.lstrip("#"), REFERENCE_TYPES[kind]))
+            elif _local(item.tag) == "descrip" and kind == "context":
+                entry.context = _text(item)
+            elif _local(item.tag) == "descrip" and kind == "subjectField":
+                subject_field = _text(item)
+    if entry.context is None:
+        entry.context = subject_field
+    return entry
+
+
+def iter_entries(path: Path) -> Iterator[TbxEntry]:
+    """
+    Stream concept entries from a TBX file.
+
+    Each entry element is removed from its parent once converted, so the
+    in-memory tree never grows beyond the entry currently being read.
+    """
+    stack: list[ET.Element] = []
+    for event_name, element in ET.iterparse(str(path), events=("start", "end")):
+        if event_name == "start":
+            stack.append(element)
+            continue
+        stack.pop()
+        if _local(element.tag) in ENTRY_TAGS:
+            yield parse_entry(element)
+            if stack:
+                stack[-1].remove(element)
+            element.clear()
+
+
+class TbxImporter:
+    """Batching TBX importer writing through SQLAlchemy Core."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        source_name: str,
+        display_name: Optional[str] = None,
+        tier: int = 1,
+        document_id: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.bind = bind
+        self.source_name = source_name
+        self.display_name = display_name
+        self.tier = tier
+        self.document_id = document_id
+        self.batch_size = batch_size
+        self.source_id: Optional[int] = None
+        self.stats = ImportStats()
+        # entry id -> ((language, primary term id), ...)
+        self._entry_terms: dict[str, tuple[tuple[str, int], ...]] = {}
+        self._pending_references: list[tuple[str, str, str]] = []
+
+    def run(self, path: Path) -> ImportStats:
+        """
+        Import a TBX file.
+
+        Args:
+            path: TBX file path
+
+        Returns:
+            ImportStats: Counts and elapsed time
+        """
+        started = time.perf_counter()
+        # One short writer transaction per batch: the single SQLite writer
+        # connection is returned to the pool between batches, so other
+        # writers (API, concurrent jobs) interleave instead of waiting for
+        # the whole file.
+        with self.bind.begin() as connection:
+            self.source_id = bulk.get_or_create_source(
+                connection,
+                self.source_name,
+                display_name=self.display_name,
+                source_type="database",
+                tier=self.tier,
+            )
+
+        batch: list[TbxEntry] = []
+        for entry in iter_entries(path):
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+
+        with self.bind.begin() as connection:
+            self._resolve_references(connection, self._pending_references, final=True)
+            connection.execute(
+                update(AuthoritativeSource)
+                .where(AuthoritativeSource.id == self.source_id)
+                .values(last_updated=func.now())
+            )
+
+        bulk.finish_bulk_write()
+        self.stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"TBX import from {path.name}: {self.stats.entries} entries, "
+            f"{self.stats.terms} terms, {self.stats.translations} translations, "
+            f"{self.stats.synonyms} synonyms in {self.stats.seconds:.1f}s "
+            f"({self.stats.terms_per_second:.0f} terms/s)"
+        )
+        return self.stats
+
+    def _term_row(self, term: TbxTerm, language: TbxLanguage, entry: TbxEntry) -> dict:
+        return {
+            "term": term.text[:500],
+            "language_code": language.code,
+            "definition": term.definition or language.definition,
+            "source_id": self.source_id,
+            "document_id": self.document_id,
+            "page_reference": None,
+            "gender": term.gender,
+            "part_of_speech": term.part_of_speech,
+            "context": entry.context,
+            "confidence": 1.0,
+        }
+
+    def _write_batch(self, batch: list[TbxEntry]) -> None:
+        term_rows: list[dict] = []
+        for entry in batch:
+            for language in entry.languages:
+                for term in language.terms:
+                    term_rows.append(self._term_row(term, language, entry))
+
+        with self.bind.begin() as connection:
+            ids = iter(bulk.insert_terms(connection, term_rows))
+
+            synonyms: list[dict] = []
+            translations: list[dict] = []
+            preferred_pairs: list[tuple[int, int]] = []
+            references: list[tuple[str, str, str]] = []
+
+            for entry in batch:
+                primaries: list[tuple[str, int]] = []
+                for language in entry.languages:
+                    term_ids = [next(ids) for _ in language.terms]
+                    preferred_index = next(
+                        (i for i, term in enumerate(language.terms) if term.preferred), None
+                    )
+                    primary = term_ids[preferred_index or 0]
+                    primaries.append((language.code, primary))
+
+                    for term_id in term_ids:
+                        if term_id == primary:
+                            continue
+                        synonyms.append(self._synonym_row(primary, term_id, "synonym"))
+                        if preferred_index is not None:
+                            preferred_pairs.append((term_id, primary))
+
+                for source_language, source_term_id in primaries:
+                    for target_language, target_term_id in primaries:
+                        if source_language != target_language:
+                            translations.append({
+                                "source_term_id": source_term_id,
+                                "target_term_id": target_term_id,
+                                "source_language": source_language,
+                                "target_language": target_language,
+                                "confidence": 1.0,
+                                "validated_by_human": False,
+                            })
+
+                if entry.entry_id:
+                    self._entry_terms[entry.entry_id] = tuple(primaries)
+                    references.extend(
+                        (entry.entry_id, target, relation) for target, relation in entry.references
+                    )
+
+            bulk.set_preferred_terms(connection, preferred_pairs)
+            bulk.insert_synonyms(connection, synonyms)
+            bulk.insert_translations(connection, translations)
+            self._resolve_references(connection, references)
+
+        self.stats.entries += len(batch)
+        self.stats.terms += len(term_rows)
+        self.stats.synonyms += len(synonyms)
+        self.stats.translations += len(translations)
+
+    def _synonym_row(self, term_id_1: int, term_id_2: int, relationship_type: str) -> dict:
+        return {
+            "term_id_1": term_id_1,
+            "term_id_2": term_id_2,
+            "relationship_type": relationship_type,
+            "confidence": 1.0,
+            "is_approved": True,
+            "detection_method": "import",
+        }
+
+    def _resolve_references(
+        self,
+        connection: Connection,
+        references: list[tuple[str, str, str]],
+        final: bool = False,
+    ) -> None:
+        """Link primary terms of referencing entries per shared language."""
+        # (smaller id, larger id) -> relationship of the smaller to the larger
+        pairs: dict[tuple[int, int], str] = {}
+        for source_entry, target_entry, relation in references:
+            target_terms = self._entry_terms.get(target_entry)
+            if target_terms is None:
+                if final:
+                    self.stats.unresolved_references += 1
+                else:
+                    self._pending_references.append((source_entry, target_entry, relation))
+                continue
+            targets = dict(target_terms)
+            for language, term_id in self._entry_terms[source_entry]:
+                target_id = targets.get(language)
+                if target_id is None or target_id == term_id:
+                    continue
+                if term_id < target_id:
+                    pair, pair_relation = (term_id, target_id), relation
+                else:
+                    pair, pair_relation = (target_id, term_id), _INVERSE_RELATIONS[relation]
+                # A hierarchical link wins over a plain cross-reference
+                if pairs.get(pair, "related") == "related":
+                    pairs[pair] = pair_relation
+
+        if not pairs:
+            return
+        existing = bulk.linked_pairs(connection, {term_id for pair in pairs for term_id in pair})
+        rows = [
+            self._synonym_row(term_id_1, term_id_2, relation)
+            for (term_id_1, term_id_2), relation in pairs.items()
+            if (term_id_1, term_id_2) not in existing
+        ]
+        # A broader reference resolved after a plain cross-reference (other
+        # batch, or the final pass) refines the existing link; the row may
+        # be stored in either order
+        bulk.refine_related(connection, [
+            row
+            for (term_id_1, term_id_2), relation in pairs.items()
+            if relation != "related" and (term_id_1, term_id_2) in existing
+            for row in (
+                self._synonym_row(term_id_1, term_id_2, relation),
+                self._synonym_row(term_id_2, term_id_1, _INVERSE_RELATIONS[relation]),
+            )
+        ])
+        bulk.insert_synonyms(connection, rows)
+        self.stats.references += len(rows)
+        self.stats.synonyms += len(rows)
+
+
+def import_tbx(
+    path: Path,
+    source_name: str,
+    display_name: Optional[str] = None,
+    tier: int = 1,
+    document_id: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    bind: Optional[Engine] = None,
+) -> ImportStats:
+    """
+    Import a TBX file into the terminology base.
+
+    Args:
+        path: TBX file path
+        source_name: AuthoritativeSource.name to link terms to (created if missing)
+        display_name: Display name when the source is created
+        tier: Source tier when the source is created
+        document_id: Optional UploadedDocument the file belongs to
+        batch_size: Concept entries per transaction
+        bind: Engine to write to (default: application engine)
+
+    Returns:
+        ImportStats: Counts and elapsed time
+    """
+    importer = TbxImporter(
+        bind or database.engine,
+        source_name,
+        display_name=display_name,
+        tier=tier,
+        document_id=document_id,
+        batch_size=batch_size,
+    )
+    return importer.run(Path(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a TBX terminology export")
+    parser.add_argument("path", type=Path, help="TBX file")
+    parser.add_argument("--source", required=True, help="AuthoritativeSource name, e.g. IEC")
+    parser.add_argument("--display-name", help="Display name if the source is created")
+    parser.add_argument("--tier", type=int, default=1, choices=[1, 2, 3])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    import_tbx(
+        args.path,
+        args.source,
+        display_name=args.display_name,
+        tier=args.tier,
+        batch_size=args.batch_size,
+    )
@@ -0,0 +1,276 @@
+"""
+ETEx - Term Card Read Model
+
+Maintains ``term_cards``: one precomputed JSON card per term (term
+fields, source badge and tier, translations, synonym links), so that a
+search result page costs one primary-key read per hit instead of five
+joined tables.
+
+Cards are rebuilt incrementally, inside the writing transaction:
+- ORM writes: mapper events on Term, TermSynonym, Translation and
+  AuthoritativeSource mark the affected terms
+- Core bulk writes: the services/bulk.py helpers mark the terms they write
+- When the transaction commits, the cards of all marked terms are rebuilt
+  with one set-based ``INSERT ... SELECT json_object(...)`` per 500 terms,
+  right before the commit itself (Connection ``commit`` event)
+
+A changed term text, language or source also changes the cards that
+embed it as a translation or synonym; those neighbours are rebuilt too.
+
+Existing rows: ``python -m services.term_cards rebuild``
+"""
+
+import argparse
+import logging
+from typing import Iterable, Optional
+
+import orjson
+from sqlalchemy import bindparam, delete, event, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+import database
+from models import AuthoritativeSource, Term, TermCard, TermSynonym, Translation
+
+logger = logging.getLogger(__name__)
+
+_CONNECTION_KEY = "term_cards_dirty"
+
+# Terms per rebuild statement (bound parameters)
+_BATCH_SIZE = 500
+
+# Columns embedded in other terms' cards
+_EMBEDDED_COLUMNS = ("term", "language_code", "source_id")
+
+# Card JSON, built by SQLite's JSON1 functions. Same payload as
+# services/lookup.py term_card().
+_CARD_SELECT = """
+SELECT t.id, json_object(
+    'id', t.id,
+    'term', t.term,
+    'language_code', t.language_code,
+    'definition', t.definition,
+    'gender', t.gender,
+    'part_of_speech', t.part_of_speech,
+    'context', t.context,
+    'page_reference', t.page_reference,
+    'confidence', t.confidence,
+    'preferred_term_id', t.preferred_term_id,
+    'source', CASE WHEN s.id IS NULL THEN NULL ELSE json_object(
+        'id', s.id, 'name', s.name, 'display_name', s.display_name, 'tier', s.tier
+    ) END,
+    'translations', json((
+        SELECT json_group_array(json_object(
+            'id', x.id,
+            'target_language', x.target_language,
+            'confidence', x.confidence,
+            'validated_by_human', CASE WHEN x.validated_by_human THEN json('true') ELSE json('false') END,
+            'term', json_object('id', x.tid, 'term', x.tterm, 'language_code', x.tlang, 'source_id', x.tsource)
+        ))
+        FROM (
+            SELECT tr.id, tr.target_language, tr.confidence, tr.validated_by_human,
+                   tt.id AS tid, tt.term AS tterm, tt.language_code AS tlang, tt.source_id AS tsource
+            FROM translations tr JOIN terms tt ON tt.id = tr.target_term_id
+            WHERE tr.source_term_id = t.id
+            ORDER BY tr.target_language, tr.confidence DESC, tr.id
+        ) x
+    )),
+    'synonyms', json((
+        SELECT json_group_array(json_object(
+            'id', y.id,
+            'relationship_type', y.relationship_type,
+            'is_approved', CASE WHEN y.is_approved THEN json('true') ELSE json('false') END,
+            'confidence', y.confidence,
+            'term', json_object('id', y.oid, 'term', y.oterm, 'language_code', y.olang, 'source_id', y.osource)
+        ))
+        FROM (
+            SELECT ts.id, ts.relationship_type, ts.is_approved, ts.confidence,
+                   o.id AS oid, o.term AS oterm, o.language_code AS olang, o.source_id AS osource
+            FROM term_synonyms ts JOIN terms o
+              ON o.id = CASE WHEN ts.term_id_1 = t.id THEN ts.term_id_2 ELSE ts.term_id_1 END
+            WHERE ts.term_id_1 = t.id OR ts.term_id_2 = t.id
+            ORDER BY ts.relationship_type, o.term, ts.id
+        ) y
+    ))
+), CURRENT_TIMESTAMP
+FROM terms t LEFT JOIN authoritative_sources s ON s.id = t.source_id
+"""
+
+_REFRESH = text(
+    f"INSERT INTO term_cards (term_id, card, updated_at) {_CARD_SELECT} WHERE t.id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+_REBUILD_RANGE = text(
+    f"INSERT INTO term_cards (term_id, card, updated_at) {_CARD_SELECT} "
+    "WHERE t.id > :after AND t.id <= :until"
+)
+
+
+class _Dirty:
+    """Terms whose cards are stale in the current transaction."""
+
+    __slots__ = ("terms", "neighbours_of", "sources")
+
+    def __init__(self):
+        self.terms: set[int] = set()
+        # Terms whose text/language/source changed: their neighbours'
+        # cards embed them
+        self.neighbours_of: set[int] = set()
+        self.sources: set[int] = set()
+
+
+def _dirty(connection: Connection) -> _Dirty:
+    dirty = connection.info.get(_CONNECTION_KEY)
+    if dirty is None:
+        dirty = connection.info[_CONNECTION_KEY] = _Dirty()
+    return dirty
+
+
+def mark_terms(connection: Connection, term_ids: Iterable[int], embedded: bool = False) -> None:
+    """
+    Mark term cards stale; they are rebuilt when the transaction commits.
+
+    Args:
+        connection: Connection of the writing transaction
+        term_ids: Changed terms
+        embedded: Fields shown in other cards changed (text, language,
+            source); cards linking to these terms are rebuilt as well
+    """
+    dirty = _dirty(connection)
+    dirty.terms.update(term_ids)
+    if embedded:
+        dirty.neighbours_of.update(term_ids)
+
+
+def mark_source(connection: Connection, source_id: int) -> None:
+    """Mark the cards of all terms of a source stale."""
+    _dirty(connection).sources.add(source_id)
+
+
+def _neighbours(connection: Connection, term_ids: list[int]) -> set[int]:
+    found: set[int] = set()
+    for start in range(0, len(term_ids), _BATCH_SIZE):
+        batch = term_ids[start:start + _BATCH_SIZE]
+        found.update(connection.execute(
+            select(Translation.source_term_id).where(Translation.target_term_id.in_(batch))
+        ).scalars())
+        found.update(connection.execute(
+            select(TermSynonym.term_id_1).where(TermSynonym.term_id_2.in_(batch))
+        ).scalars())
+        found.update(connection.execute(
+            select(TermSynonym.term_id_2).where(TermSynonym.term_id_1.in_(batch))
+        ).scalars())
+    return found
+
+
+def refresh_cards(connection: Connection, term_ids: Iterable[int]) -> int:
+    """
+    Rebuild the cards of the given terms (deleted terms lose their card).
+
+    Returns:
+        int: Number of cards written
+    """
+    term_ids = sorted(set(term_ids))
+    written = 0
+    for start in range(0, len(term_ids), _BATCH_SIZE):
+        batch = term_ids[start:start + _BATCH_SIZE]
+        connection.execute(delete(TermCard).where(TermCard.term_id.in_(batch)))
+        written += connection.execute(_REFRESH, {"ids": batch}).rowcount
+    return written
+
+
+def rebuild_term_cards(connection: Connection, batch_size: int = 5000) -> int:
+    """
+    Rebuild every card.
+
+    Args:
+        connection: Connection inside the caller's transaction
+        batch_size: Terms per statement (id range)
+
+    Returns:
+        int: Number of cards written
+    """
+    connection.execute(delete(TermCard))
+    max_id = connection.execute(select(func.max(Term.id))).scalar() or 0
+    written = 0
+    for after in range(0, max_id, batch_size):
+        written += connection.execute(_REBUILD_RANGE, {"after": after, "until": after + batch_size}).rowcount
+    return written
+
+
+def get_cards(db: Session, term_ids: Iterable[int]) -> dict[int, dict]:
+    """Cards by term id (one primary-key IN read)."""
+    term_ids = list(term_ids)
+    if not term_ids:
+        return {}
+    rows = db.execute(select(TermCard.term_id, TermCard.card).where(TermCard.term_id.in_(term_ids)))
+    return {term_id: orjson.loads(card) for term_id, card in rows}
+
+
+# Rebuild marked cards as part of every commit
+
+@event.listens_for(Engine, "commit")
+def _refresh_before_commit(connection: Connection) -> None:
+    dirty: Optional[_Dirty] = connection.info.pop(_CONNECTION_KEY, None)
+    if dirty is None:
+        return
+    term_ids = set(dirty.terms)
+    if dirty.neighbours_of:
+        term_ids |= _neighbours(connection, sorted(dirty.neighbours_of))
+    for source_id in dirty.sources:
+        term_ids.update(connection.execute(select(Term.id).where(Term.source_id == source_id)).scalars())
+    if term_ids:
+        refresh_cards(connection, term_ids)
+
+
+@event.listens_for(Engine, "begin")
+@event.listens_for(Engine, "rollback")
+def _discard_marks(connection: Connection) -> None:
+    # Marks live on the pooled DBAPI connection; never carry them over
+    # from a transaction that did not commit
+    connection.info.pop(_CONNECTION_KEY, None)
+
+
+# Mark terms on ORM writes
+
+@event.listens_for(Term, "after_insert")
+@event.listens_for(Term, "after_delete")
+def _term_written(mapper, connection, target):
+    mark_terms(connection, (target.id,))
+
+
+@event.listens_for(Term, "after_update")
+def _term_updated(mapper, connection, target):
+    state = inspect(target)
+    embedded = any(state.attrs[name].history.has_changes() for name in _EMBEDDED_COLUMNS)
+    mark_terms(connection, (target.id,), embedded=embedded)
+
+
+@event.listens_for(TermSynonym, "after_insert")
+@event.listens_for(TermSynonym, "after_update")
+@event.listens_for(TermSynonym, "after_delete")
+def _synonym_written(mapper, connection, target):
+    mark_terms(connection, (target.term_id_1, target.term_id_2))
+
+
+@event.listens_for(Translation, "after_insert")
+@event.listens_for(Translation, "after_update")
+@event.listens_for(Translation, "after_delete")
+def _translation_written(mapper, connection, target):
+    mark_terms(connection, (target.source_term_id,))
+
+
+@event.listens_for(AuthoritativeSource, "after_update")
+def _source_updated(mapper, connection, target):
+    mark_source(connection, target.id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETEx term card maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with database.engine.begin() as conn:
+        count = rebuild_term_cards(conn)
+    logger.info(f"Term cards rebuilt: {count} cards")
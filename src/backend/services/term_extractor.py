@@ -0,0 +1,322 @@
+"""
+ETEx - NLP Term Extraction
+
+Candidate term extraction from PDF page texts (REQUIREMENTS Workflow A,
+step 3) with spaCy (``de_core_news_sm`` / ``en_core_web_sm``).
+
+- Each language model is loaded once per process, on first use or at
+  startup (SPACY_PRELOAD), with the components term extraction does not
+  need (NER, lemmatizer, text classification) excluded.
+- Page texts are streamed through ``nlp.pipe(batch_size=..., n_process=...)``
+  instead of calling ``nlp(text)`` per page.
+- Noun chunks are filtered in generator stages (``clean_term``, article
+  stripping, validation) and aggregated by frequency; only the aggregate
+  is held in memory.
+- Every run reports pages per second.
+
+``clean_term()`` and ``strip_leading_articles()`` follow the Glossary APP
+term extractor utilities (see docs/reference/code-reuse-strategy.md); the
+spaCy pipeline itself is ETEx-specific.
+
+Usage:
+    python -m services.term_extractor data/uploads/ne107.pdf --language de
+"""
+
+import argparse
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MODELS = {
+    "de": os.getenv("SPACY_MODEL_DE", "de_core_news_sm"),
+    "en": os.getenv("SPACY_MODEL_EN", "en_core_web_sm"),
+}
+
+# Components not needed for noun chunks (tok2vec, tagger/morphologizer and
+# parser are kept)
+EXCLUDED_COMPONENTS = ["ner", "lemmatizer", "textcat", "entity_ruler", "senter"]
+
+BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "32"))
+N_PROCESS = int(os.getenv("SPACY_PROCESSES", "1"))
+
+# Languages whose models are loaded at application startup
+PRELOAD_LANGUAGES = [code.strip() for code in os.getenv("SPACY_PRELOAD", "").split(",") if code.strip()]
+
+# Texts longer than this are cut before parsing (spaCy's default max_length
+# guards memory; one PDF page is far below it)
+MAX_PAGE_CHARS = 100_000
+
+ARTICLES = {
+    "en": {"the", "a", "an"},
+    "de": {"der", "die", "das", "den", "dem", "des",
+           "ein", "eine", "einer", "eines", "einem", "einen"},
+}
+
+# Frequent function words, used to guess the document language
+_STOPWORDS = {
+    "en": {"the", "and", "of", "to", "is", "in", "for", "with", "that", "be", "are", "or"},
+    "de": {"der", "die", "und", "das", "ist", "mit", "f\u00fcr", "von", "zu", "den", "nicht", "oder"},
+}
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 100
+MAX_TERM_WORDS = 6
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Leading list markers and section numbers: "1.2.3 ", "a) ", "- ", bullets
+_LEADING_MARKER_RE = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[a-z]\)|[-\u2013\u2022*\u00b7])\s+", re.IGNORECASE)
+_EDGE_PUNCTUATION = " \t\"'`\u201c\u201d\u201e\u2018\u2019\u00ab\u00bb()[]{}<>.,;:!?/\\|"
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_INVALID_CHARS_RE = re.compile(r"[@#$%^=~\u00a7]|https?:|www\.")
+
+_models: dict = {}
+_models_lock = threading.Lock()
+
+
+@dataclass
+class TermCandidate:
+    text: str
+    page_number: int
+
+
+@dataclass
+class ExtractedTerm:
+    term: str
+    language_code: str
+    frequency: int
+    first_page: int
+    pages: list[int] = field(default_factory=list)
+
+    @property
+    def confidence(self) -> float:
+        """Frequency-based score: single mentions 0.5, rising to 0.9."""
+        return round(min(0.9, 0.4 + 0.1 * self.frequency), 2)
+
+    @property
+    def page_reference(self) -> str:
+        """Pages as printed in Term.page_reference, e.g. '3, 7, 12' (max 100 chars)."""
+        reference = ", ".join(str(page) for page in self.pages)
+        if len(reference) <= 100:
+            return reference
+        return reference[:reference.rindex(", ", 0, 95)] + ", ..."
+
+
+@dataclass
+class TermExtractionStats:
+    pages: int = 0
+    candidates: int = 0
+    terms: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+def clean_term(term: str) -> str:
+    """Collapse whitespace and strip list markers and edge punctuation."""
+    term = _WHITESPACE_RE.sub(" ", term).strip()
+    term = _LEADING_MARKER_RE.sub("", term)
+    return term.strip(_EDGE_PUNCTUATION)
+
+
+def strip_leading_articles(term: str, language: str) -> str:
+    """Remove leading articles: 'der Drucksensor' -> 'Drucksensor'."""
+    articles = ARTICLES.get(language, set())
+    words = term.split(" ")
+    while len(words) > 1 and words[0].lower() in articles:
+        words = words[1:]
+    return " ".join(words)
+
+
+def is_valid_term(term: str) -> bool:
+    """Length, word count and character checks for a cleaned candidate."""
+    if not MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH:
+        return False
+    if term.count(" ") >= MAX_TERM_WORDS:
+        return False
+    if not _LETTER_RE.search(term) or _INVALID_CHARS_RE.search(term):
+        return False
+    return True
+
+
+def guess_language(texts: Iterable[str], default: str = "de") -> str:
+    """Pick the model language whose function words occur most often."""
+    counts = Counter()
+    for text in texts:
+        for word in re.findall(r"\w+", text.lower()):
+            for language, words in _STOPWORDS.items():
+                if word in words:
+                    counts[language] += 1
+    return counts.most_common(1)[0][0] if counts else default
+
+
+def load_model(language: str):
+    """
+    spaCy pipeline for a language, loaded once per process.
+
+    Raises:
+        ValueError: No model configured for the language
+        ImportError / OSError: spaCy or the model package is not installed
+    """
+    model = _models.get(language)
+    if model is not None:
+        return model
+    if language not in MODELS:
+        raise ValueError(f"No spaCy model configured for language '{language}'")
+    with _models_lock:
+        if language not in _models:
+            import spacy
+
+            started = time.perf_counter()
+            _models[language] = spacy.load(MODELS[language], exclude=EXCLUDED_COMPONENTS)
+            logger.info(
+                f"Loaded spaCy model {MODELS[language]} in {time.perf_counter() - started:.1f}s "
+                f"(pipes: {', '.join(_models[language].pipe_names)})"
+            )
+        return _models[language]
+
+
+def preload_models(languages: Iterable[str]) -> None:
+    """Load models up front (application startup); failures are logged."""
+    for language in languages:
+        try:
+            load_model(language)
+        except (ImportError, OSError, ValueError) as exc:
+            logger.warning(f"spaCy model for '{language}' not preloaded: {exc}")
+
+
+class TermExtractor:
+    """Streams page texts through a spaCy pipeline and aggregates candidates."""
+
+    def __init__(
+        self,
+        language: str,
+        batch_size: int = BATCH_SIZE,
+        n_process: int = N_PROCESS,
+        min_frequency: int = 1,
+    ):
+        self.language = language
+        self.batch_size = batch_size
+        self.n_process = max(1, n_process)
+        self.min_frequency = min_frequency
+        self.stats = TermExtractionStats()
+
+    def candidates(self, pages: Iterable[tuple[str, int]]) -> Iterator[TermCandidate]:
+        """
+        Yield cleaned noun-phrase candidates.
+
+        Args:
+            pages: (text, page number) pairs, in any order
+
+        Yields:
+            TermCandidate: One per valid noun chunk occurrence
+        """
+        nlp = load_model(self.language)
+        texts = ((text[:MAX_PAGE_CHARS], number) for text, number in pages if text)
+        docs = nlp.pipe(texts, as_tuples=True, batch_size=self.batch_size, n_process=self.n_process)
+        for doc, page_number in docs:
+            self.stats.pages += 1
+            for chunk in doc.noun_chunks:
+                text = strip_leading_articles(clean_term(chunk.text), self.language)
+                if is_valid_term(text):
+                    self.stats.candidates += 1
+                    yield TermCandidate(text, page_number)
+
+    def extract(self, pages: Iterable[tuple[str, int]]) -> list[ExtractedTerm]:
+        """
+        Extract terms with frequency and page references.
+
+        Returns:
+            list[ExtractedTerm]: Terms seen at least ``min_frequency`` times,
+            most frequent first
+        """
+        started = time.perf_counter()
+        self.stats = TermExtractionStats()
+        terms: dict[str, ExtractedTerm] = {}
+        for candidate in self.candidates(pages):
+            # Case variants ("Drucksensor", "DRUCKSENSOR") count as one term;
+            # the first spelling seen is kept
+            key = candidate.text.casefold()
+            term = terms.get(key)
+            if term is None:
+                terms[key] = ExtractedTerm(candidate.text, self.language, 1,
+                                           candidate.page_number, [candidate.page_number])
+                continue
+            term.frequency += 1
+            if candidate.page_number not in term.pages:
+                term.pages.append(candidate.page_number)
+                term.first_page = min(term.first_page, candidate.page_number)
+
+        result = sorted(
+            (term for term in terms.values() if term.frequency >= self.min_frequency),
+            key=lambda term: (-term.frequency, term.first_page),
+        )
+        for term in result:
+            term.pages.sort()
+        self.stats.terms = len(result)
+        self.stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Term extraction ({self.language}): {self.stats.pages} pages, "
+            f"{self.stats.candidates} candidates, {self.stats.terms} terms in "
+            f"{self.stats.seconds:.1f}s ({self.stats.pages_per_second:.1f} pages/s)"
+        )
+        return result
+
+
+def extract_terms_from_pages(
+    pages: Iterable,
+    language: Optional[str] = None,
+    **options,
+) -> tuple[list[ExtractedTerm], TermExtractionStats]:
+    """
+    Extract terms from ExtractedPage objects (services/pdf_extractor.py).
+
+    Args:
+        pages: Pages in page order; failed pages are skipped
+        language: Model language; guessed from the first pages if None
+        options: TermExtractor options (batch_size, n_process, min_frequency)
+
+    Returns:
+        tuple[list[ExtractedTerm], TermExtractionStats]
+    """
+    pairs = ((page.text, page.page_number) for page in pages if not page.error)
+    if language is None:
+        head = list(islice(pairs, 5))
+        language = guess_language(text for text, _ in head)
+        pairs = chain(head, pairs)
+    extractor = TermExtractor(language, **options)
+    return extractor.extract(pairs), extractor.stats
+
+
+if __name__ == "__main__":
+    from services.pdf_extractor import PdfExtractor
+
+    parser = argparse.ArgumentParser(description="Extract candidate terms from a PDF")
+    parser.add_argument("path", type=Path, help="PDF file")
+    parser.add_argument("--language", choices=sorted(MODELS), help="Default: guessed")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--processes", type=int, default=N_PROCESS, help="nlp.pipe n_process")
+    parser.add_argument("--min-frequency", type=int, default=1)
+    parser.add_argument("--top", type=int, default=50, help="Terms to print")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    terms, stats = extract_terms_from_pages(
+        PdfExtractor().extract(args.path),
+        language=args.language,
+        batch_size=args.batch_size,
+        n_process=args.processes,
+        min_frequency=args.min_frequency,
+    )
+    for term in terms[:args.top]:
+        print(f"{term.frequency:5d}  {term.term}  (p. {term.page_reference})")
@@ -0,0 +1,70 @@
+"""
+ETEx - Normalized Term Keys
+
+``Term.term_key`` is the lookup form of a term, so that exact lookups
+match the spellings of one term without wildcard or full-text search:
+
+    "Druckmessumformer", "druckmessumformer", "Druckmeßumformer",
+    "der Druckmessumformer", "Druck-Messumformer" -> "druckmessumformer"
+
+Folding rules, in order:
+1. Whitespace runs (including no-break spaces) collapse to one space.
+2. Dashes between letters join the words ("Druck-Messumformer",
+   "Druck - Messumformer"); other dashes become "-" ("4–20 mA" keeps
+   its digits apart).
+3. Leading articles of the term's language are stripped
+   (``strip_leading_articles`` from services/term_extractor.py).
+4. Casefolding (which also folds ß to ss), umlaut transliteration and
+   removal of other diacritics (``fold_text`` from services/deviation.py).
+
+Lookups on ``(term_key, language_code)`` seek ``idx_term_key_language``.
+The key is set on ORM inserts and on updates of ``term`` or
+``language_code`` (mapper events below); ``bulk.insert_terms`` sets it
+for Core inserts. Rows that existed before revision ``f4c2b7e9d016`` were
+backfilled by that migration.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from models import Term
+from services.deviation import fold_text
+from services.term_extractor import ARTICLES, strip_leading_articles
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_DASHES = "-\u2010\u2011\u2012\u2013\u2014\u2212"
+_DASH_RE = re.compile(f"[{_DASHES}]")
+_JOINING_DASH_RE = re.compile(f"(?<=[^\\W\\d_]) ?[{_DASHES}] ?(?=[^\\W\\d_])")
+
+
+def term_key(term: str, language: str) -> str:
+    """Lookup key of a term: 'der Druck-Meßumformer' -> 'druckmessumformer'."""
+    text = _WHITESPACE_RE.sub(" ", term).strip()
+    text = _JOINING_DASH_RE.sub("", text)
+    text = _DASH_RE.sub("-", text)
+    text = strip_leading_articles(text, language.lower())
+    return fold_text(text)
+
+
+def query_keys(query: str, language: Optional[str] = None) -> set[str]:
+    """
+    Keys to look a query up by: its key in ``language``, or in every
+    language with article rules when the language is not known.
+    """
+    if language:
+        return {term_key(query, language)}
+    return {term_key(query, "")} | {term_key(query, code) for code in ARTICLES}
+
+
+@event.listens_for(Term, "before_insert")
+def _key_new_term(mapper, connection, target: Term) -> None:
+    target.term_key = term_key(target.term, target.language_code)
+
+
+@event.listens_for(Term, "before_update")
+def _rekey_term(mapper, connection, target: Term) -> None:
+    state = inspect(target)
+    if state.attrs.term.history.has_changes() or state.attrs.language_code.history.has_changes():
+        target.term_key = term_key(target.term, target.language_code)
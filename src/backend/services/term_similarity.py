@@ -0,0 +1,362 @@
+"""
+ETEx - Term Similarity Synonym Suggestions (character n-gram TF-IDF)
+
+Automatic synonym detection by string similarity (REQUIREMENTS §5):
+spelling and compounding variants such as "Durchflußmesser" /
+"Durchfluss-Messer" or "Messumformer" / "Meßumformer" within one
+language. Found pairs are written as unapproved ``TermSynonym``
+suggestions (detection_method 'tfidf') with the cosine similarity as
+``confidence``, for review via ``PUT /synonyms/{id}/approve``.
+
+Per ``language_code``:
+- Terms are normalized (services/deviation.py ``normalize_token``, word
+  breaks and hyphens removed), padded with spaces and cut into character
+  trigrams. Three code points pack losslessly into one 63-bit key, so the
+  vocabulary is built with ``np.unique`` over all trigrams at once.
+- The sparse (terms x trigrams) matrix X is weighted with sublinear tf and
+  smoothed idf and L2-normalized rows (SciPy CSR, float32).
+- Cosine similarity is X @ X.T, but frequent trigrams ("ung", "ng ") would
+  dominate that product. Candidate pairs come from the prefix matrix P
+  instead (each row without its most frequent trigrams, see
+  ``prefix_matrix``); candidates are filtered on an upper bound and then
+  scored with the exact cosine on the full rows. No pair from
+  MIN_SIMILARITY up is lost.
+- P @ P.T is computed in row blocks, upper triangle only. Each block is
+  sized so that the partial products it generates stay under
+  PRODUCT_BUDGET, which bounds the memory of the block result; only exact
+  pairs from MIN_SIMILARITY up outlive their block.
+- A pair is kept if either term has the other among its TOP_K most
+  similar.
+
+Pairs that are already linked (any relationship, either direction), that
+are linked through ``preferred_term_id`` or that only differ in case are
+not suggested. The run is a full recomputation; suggestions from earlier
+runs are kept and not duplicated.
+
+Usage:
+    python -m services.term_similarity run
+    python -m services.term_similarity run --language de --min-similarity 0.8
+"""
+
+import argparse
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+import database
+from models import Term
+from services import bulk
+from services.deviation import normalize_token
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+TOP_K = 5
+MIN_SIMILARITY = 0.75
+# Prefix filter cutoff relative to MIN_SIMILARITY: lower means longer
+# prefixes (more work in the product) but a tighter bound (fewer exact
+# rescorings)
+SUFFIX_SHARE = 0.8
+# Multiply-adds per block of P[block] @ P.T; bounds the block result
+# (8 bytes per stored value) to well under 100 MB
+PRODUCT_BUDGET = 8_000_000
+
+DETECTION_METHOD = "tfidf"
+
+_BATCH_SIZE = 1000
+_CODE_POINT_BITS = 21
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass
+class SimilarityStats:
+    languages: int = 0
+    terms: int = 0
+    features: int = 0
+    blocks: int = 0
+    candidates: int = 0
+    suggestions: int = 0
+    seconds: float = 0.0
+
+
+def normalize_term(term: str) -> str:
+    """
+    Normalized tokens written together: "Druck-Sensor", "Druck Sensor" and
+    "Drucksensor" (and "flow meter" / "flowmeter") get the same trigrams.
+    """
+    return "".join(normalize_token(token) for token in _TOKEN_RE.findall(term))
+
+
+def ngram_keys(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Character trigram keys of normalized terms, concatenated, plus the
+    row (term index) of each key.
+
+    Every text is padded with a space on both sides, so word starts and
+    ends are trigrams of their own and texts of one character still have
+    one. Windows crossing from one text into the next are dropped.
+    """
+    padded = [f" {text} " for text in texts]
+    lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+    window_count = max(0, len(codes) - NGRAM_SIZE + 1)
+    keys = np.zeros(window_count, dtype=np.uint64)
+    for offset in range(NGRAM_SIZE):
+        keys = (keys << np.uint64(_CODE_POINT_BITS)) | codes[offset:offset + window_count]
+    text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    rows = np.repeat(np.arange(len(padded)), lengths)[:window_count]
+    position = np.arange(window_count) - text_starts[rows]
+    keep = position <= lengths[rows] - NGRAM_SIZE
+    return keys[keep], rows[keep]
+
+
+def tfidf_matrix(texts: list[str]) -> sp.csr_matrix:
+    """L2-normalized sublinear-tf / smoothed-idf trigram matrix, float32 CSR."""
+    keys, rows = ngram_keys(texts)
+    _, columns = np.unique(keys, return_inverse=True)
+    weights = sp.csr_matrix(
+        (np.ones(len(keys), dtype=np.float32), (rows, columns)),
+        shape=(len(texts), int(columns.max()) + 1 if len(columns) else 0),
+    )
+    weights.sum_duplicates()
+    document_frequency = np.bincount(weights.indices, minlength=weights.shape[1])
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1
+    weights.data = (1 + np.log(weights.data)) * idf[weights.indices]
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.csr_matrix(sp.diags(1 / norms, dtype=np.float32) @ weights, dtype=np.float32)
+
+
+def prefix_matrix(matrix: sp.csr_matrix, max_suffix_norm: float) -> tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Prefix filter: each row without its most frequent trigrams, as many as
+    fit into a weight norm below ``max_suffix_norm``, and the norm of what
+    was dropped (the suffix).
+
+    Trigrams are ordered globally (document frequency, then column), so of
+    two rows x and y the one with the earlier cutoff, say x, has every
+    trigram of the suffix of y in its own suffix. A trigram shared outside
+    both prefixes is therefore in suffix(x), and
+    x . y <= prefix(x) . prefix(y) + |suffix(x)|: pairs from
+    ``max_suffix_norm`` up always share a prefix trigram.
+    """
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    entry_rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    # Within each row, most frequent trigram first
+    order = np.lexsort((-matrix.indices, -document_frequency[matrix.indices], entry_rows))
+    cumulative = np.cumsum((matrix.data[order] ** 2).astype(np.float64))
+    row_offset = np.concatenate(([0.0], cumulative))[matrix.indptr[:-1]]
+    suffix = np.zeros(len(order), dtype=bool)
+    suffix[order] = cumulative - row_offset[entry_rows] < max_suffix_norm ** 2
+    suffix_norm = np.sqrt(
+        np.bincount(entry_rows, weights=np.where(suffix, matrix.data, 0) ** 2, minlength=matrix.shape[0])
+    )
+    prefixes = matrix.copy()
+    prefixes.data[suffix] = 0
+    prefixes.eliminate_zeros()
+    return prefixes, suffix_norm.astype(np.float32)
+
+
+def _blocks(matrix: sp.csr_matrix, budget: int) -> list[tuple[int, int]]:
+    """Row ranges whose X[block] @ X.T products each stay near the budget (an upper bound)."""
+    binary = matrix.copy()
+    binary.data[:] = 1
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1]).astype(np.float64)
+    products = np.cumsum(binary @ document_frequency)
+    blocks = []
+    start = 0
+    while start < matrix.shape[0]:
+        limit = (products[start - 1] if start else 0) + budget
+        end = max(start + 1, int(np.searchsorted(products, limit, side="right")))
+        blocks.append((start, min(end, matrix.shape[0])))
+        start = end
+    return blocks
+
+
+def top_k_neighbours(
+    matrix: sp.csr_matrix,
+    top_k: int = TOP_K,
+    min_similarity: float = MIN_SIMILARITY,
+    budget: int = PRODUCT_BUDGET,
+    stats: Optional[SimilarityStats] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs of rows from ``min_similarity`` up where either row is among the
+    ``top_k`` most similar of the other, computed blockwise.
+
+    Candidates come from the product of the prefixes (see
+    ``prefix_matrix``); those whose upper bound reaches ``min_similarity``
+    get their exact cosine from the full rows. Only exact pairs above the
+    threshold outlive their block.
+
+    Returns:
+        tuple: (row, neighbour, cosine) arrays, row < neighbour
+    """
+    prefixes, suffix_norm = prefix_matrix(matrix, SUFFIX_SHARE * min_similarity)
+    # No bound reaches min_similarity below this product value
+    floor = min_similarity - (suffix_norm.max() if len(suffix_norm) else 0)
+    found_rows: list[np.ndarray] = []
+    found_columns: list[np.ndarray] = []
+    scores: list[np.ndarray] = []
+    for start, end in _blocks(prefixes, budget):
+        # Each pair is scored from its lower row: columns from start on
+        block = prefixes[start:end] @ prefixes[start:].T.tocsr()
+        hits = np.flatnonzero(block.data >= floor)
+        rows = np.searchsorted(block.indptr, hits, side="right") - 1 + start
+        columns = block.indices[hits].astype(np.int64) + start
+        bound = block.data[hits] + np.maximum(suffix_norm[rows], suffix_norm[columns])
+        keep = (bound >= min_similarity) & (rows < columns)
+        rows, columns = rows[keep], columns[keep]
+        del block, hits, bound
+        values = np.asarray(matrix[rows].multiply(matrix[columns]).sum(axis=1)).ravel()
+        keep = values >= min_similarity
+        found_rows.append(rows[keep])
+        found_columns.append(columns[keep])
+        scores.append(values[keep])
+        if stats is not None:
+            stats.blocks += 1
+
+    rows = np.concatenate(found_rows) if found_rows else np.array([], dtype=np.int64)
+    columns = np.concatenate(found_columns) if found_columns else np.array([], dtype=np.int64)
+    values = np.concatenate(scores) if scores else np.array([], dtype=np.float32)
+    # Rank each pair from both of its rows by descending similarity
+    both = np.concatenate([rows, columns])
+    pair = np.concatenate([np.arange(len(rows)), np.arange(len(rows))])
+    order = np.lexsort((-np.concatenate([values, values]), both))
+    both, pair = both[order], pair[order]
+    row_starts = np.flatnonzero(np.r_[True, both[1:] != both[:-1]]) if len(both) else np.array([], dtype=np.int64)
+    rank = np.arange(len(both)) - np.repeat(row_starts, np.diff(np.r_[row_starts, len(both)]))
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[pair[rank < top_k]] = True
+    return rows[keep], columns[keep], values[keep]
+
+
+def _load_terms(connection: Connection, language: Optional[str]):
+    query = select(Term.language_code, Term.id, Term.term, Term.preferred_term_id).order_by(
+        Term.language_code, Term.id
+    )
+    if language:
+        query = query.where(Term.language_code == language)
+    rows = connection.execute(query).all()
+    by_language: dict[str, list] = {}
+    for row in rows:
+        by_language.setdefault(row[0], []).append(row[1:])
+    return by_language
+
+
+def similar_term_pairs(
+    terms: list[tuple[int, str, Optional[int]]],
+    top_k: int = TOP_K,
+    min_similarity: float = MIN_SIMILARITY,
+    stats: Optional[SimilarityStats] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Similar pairs among the terms of one language.
+
+    Args:
+        terms: (id, term, preferred_term_id) rows
+
+    Returns:
+        tuple: (term id 1, term id 2, cosine) arrays, term id 1 < term id 2
+    """
+    term_ids = np.fromiter((row[0] for row in terms), dtype=np.int64, count=len(terms))
+    preferred = np.fromiter((row[2] or 0 for row in terms), dtype=np.int64, count=len(terms))
+    matrix = tfidf_matrix([normalize_term(row[1]) for row in terms])
+    if stats is not None:
+        stats.terms += len(terms)
+        stats.features += matrix.shape[1]
+    left, right, similarity = top_k_neighbours(matrix, top_k, min_similarity, stats=stats)
+
+    # Case-only duplicates are dropped; lower(), not casefold(), which would
+    # also fold ß to ss and drop "Messumformer" / "Meßumformer"
+    lowered = np.array([row[1].lower() for row in terms], dtype=object)
+    keep = (
+        (lowered[left] != lowered[right])
+        & (preferred[left] != term_ids[right])
+        & (preferred[right] != term_ids[left])
+    )
+    left, right, similarity = left[keep], right[keep], similarity[keep]
+    first, second = term_ids[left], term_ids[right]
+    return np.minimum(first, second), np.maximum(first, second), similarity
+
+
+def suggest_similar_terms(
+    bind: Optional[Engine] = None,
+    language: Optional[str] = None,
+    top_k: int = TOP_K,
+    min_similarity: float = MIN_SIMILARITY,
+) -> SimilarityStats:
+    """
+    Find similarly spelled terms per language and store them as unapproved
+    TermSynonym suggestions.
+
+    Args:
+        bind: Writer engine (default: application engine)
+        language: Only this language_code (default: all)
+        top_k: Neighbours kept per term
+        min_similarity: Minimum cosine similarity of the trigram vectors
+
+    Returns:
+        SimilarityStats
+    """
+    started = time.perf_counter()
+    bind = bind or database.engine
+    stats = SimilarityStats()
+    with bind.connect() as connection:
+        by_language = _load_terms(connection, language)
+
+    suggestions: list[tuple[int, int, float]] = []
+    for language_code, terms in by_language.items():
+        first, second, similarity = similar_term_pairs(terms, top_k, min_similarity, stats)
+        suggestions.extend(zip(first.tolist(), second.tolist(), similarity.tolist()))
+        stats.languages += 1
+        logger.info(f"Term similarity [{language_code}]: {len(terms)} terms, {len(first)} pairs")
+    del by_language
+    stats.candidates = len(suggestions)
+
+    with bind.begin() as connection:
+        existing = bulk.linked_pairs(connection, {term_id for pair in suggestions for term_id in pair[:2]})
+        rows = [
+            {
+                "term_id_1": term_id_1,
+                "term_id_2": term_id_2,
+                "relationship_type": "synonym",
+                "confidence": round(score, 3),
+                "is_approved": False,
+                "detection_method": DETECTION_METHOD,
+            }
+            for term_id_1, term_id_2, score in suggestions
+            if (term_id_1, term_id_2) not in existing
+        ]
+        for start in range(0, len(rows), _BATCH_SIZE):
+            bulk.insert_synonyms(connection, rows[start:start + _BATCH_SIZE])
+        stats.suggestions = len(rows)
+    if rows:
+        bulk.finish_bulk_write()
+
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        f"Term similarity: {stats.terms} terms in {stats.languages} languages, {stats.blocks} blocks, "
+        f"{stats.candidates} pairs, {stats.suggestions} new suggestions in {stats.seconds:.1f}s"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synonym suggestions from term spelling similarity")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--language", help="Only this language code")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(suggest_similar_terms(language=args.language, top_k=args.top_k, min_similarity=args.min_similarity))
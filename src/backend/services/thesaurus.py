@@ -0,0 +1,400 @@
+"""
+ETEx - In-Memory Thesaurus Engine
+
+Answers "all variants of this term" without recursive ORM walks over
+TermSynonym (in both directions) and Term.preferred_term_id.
+
+Approved TermSynonym edges are loaded once into compact structures:
+- ``synonym`` edges: union-find over dense term indexes, with the member
+  list of every cluster precomputed
+- ``broader`` / ``narrower`` / ``related`` edges: CSR adjacency arrays
+  (offsets + targets), one per direction
+- ``Term.preferred_term_id``: sparse term -> preferred term map
+
+Edge semantics: a TermSynonym(term_id_1, term_id_2, 'broader') row says
+term 2 is broader than term 1; 'narrower' is the inverse; 'related' and
+'synonym' are symmetric.
+
+Maintenance:
+- Approving or adding a synonym link is applied incrementally when the
+  session commits (union of two clusters, or an overlay edge for the
+  hierarchical relations until the next rebuild).
+- Removing links or terms cannot be undone in a union-find, so those
+  mark the graph stale and it is rebuilt on next use.
+- Writes committed by other processes (job workers, CLI importers,
+  suggestion runs) advance the glossary generation (services/generation.py)
+  past the graph's; it is rebuilt on next use.
+- ``ThesaurusGraph.build_seconds`` records the cold rebuild time;
+  ``python -m services.thesaurus stats`` prints it.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from array import array
+from itertools import accumulate
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+import database
+from models import Term, TermSynonym
+from services.generation import committed_generation, current_generation, read_generation
+
+logger = logging.getLogger(__name__)
+
+HIERARCHY_RELATIONS = ("broader", "narrower", "related")
+
+_SESSION_KEY = "thesaurus_changes"
+
+
+class _CSR:
+    """Compressed sparse row adjacency over dense indexes."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, size: int, edges: list[tuple[int, int]]):
+        counts = [0] * (size + 1)
+        for source, _ in edges:
+            counts[source + 1] += 1
+        self.offsets = array("l", accumulate(counts))
+        self.targets = array("l", [0] * len(edges))
+        cursor = list(self.offsets[:-1])
+        for source, target in edges:
+            self.targets[cursor[source]] = target
+            cursor[source] += 1
+
+    def neighbours(self, index: int) -> array:
+        if index + 1 >= len(self.offsets):
+            return array("l")
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+
+class ThesaurusGraph:
+    """Compact, read-mostly thesaurus over approved TermSynonym edges."""
+
+    def __init__(self):
+        self._index: dict[int, int] = {}
+        self._ids = array("q")
+        self._parent = array("l")
+        self._size = array("l")
+        self._members: dict[int, list[int]] = {}
+        self._preferred: dict[int, int] = {}
+        self._csr: dict[str, _CSR] = {}
+        self._overlay: dict[str, dict[int, list[int]]] = {
+            relation: {} for relation in HIERARCHY_RELATIONS
+        }
+        self._lock = threading.RLock()
+        self.stale = False
+        # Glossary generation the graph reflects (services/generation.py)
+        self.generation = 0
+        self.build_seconds = 0.0
+        self.edge_count = 0
+
+    # Construction
+
+    @classmethod
+    def build(cls, connection: Connection) -> "ThesaurusGraph":
+        """
+        Load all approved edges and preferred-term links from the database.
+
+        Args:
+            connection: Database connection
+
+        Returns:
+            ThesaurusGraph: Fully built graph with build_seconds set
+        """
+        started = time.perf_counter()
+        graph = cls()
+        # Read first: a write committed during the build makes the graph
+        # look older than it is (one extra rebuild), never newer
+        graph.generation = read_generation(connection)
+
+        edges = connection.execute(
+            select(
+                TermSynonym.term_id_1,
+                TermSynonym.term_id_2,
+                TermSynonym.relationship_type,
+            ).where(TermSynonym.is_approved.is_(True))
+        ).all()
+        preferred = connection.execute(
+            select(Term.id, Term.preferred_term_id)
+            .where(Term.preferred_term_id.is_not(None))
+        ).all()
+
+        hierarchy: dict[str, list[tuple[int, int]]] = {
+            relation: [] for relation in HIERARCHY_RELATIONS
+        }
+        for term_id_1, term_id_2, relation in edges:
+            a, b = graph._dense(term_id_1), graph._dense(term_id_2)
+            if relation == "synonym":
+                graph._union(a, b)
+            else:
+                for key, source, target in graph._directed(relation, a, b):
+                    hierarchy[key].append((source, target))
+
+        for term_id, preferred_term_id in preferred:
+            graph._preferred[term_id] = preferred_term_id
+
+        size = len(graph._ids)
+        graph._csr = {
+            relation: _CSR(size, pairs) for relation, pairs in hierarchy.items()
+        }
+        graph.edge_count = len(edges)
+        graph.build_seconds = time.perf_counter() - started
+        logger.info(
+            f"Thesaurus built: {size} terms, {len(edges)} edges "
+            f"in {graph.build_seconds * 1000:.1f} ms"
+        )
+        return graph
+
+    @staticmethod
+    def _directed(relation: str, a: int, b: int) -> list[tuple[str, int, int]]:
+        """Adjacency entries for one stored edge (term 1 = a, term 2 = b)."""
+        if relation == "broader":
+            return [("broader", a, b), ("narrower", b, a)]
+        if relation == "narrower":
+            return [("narrower", a, b), ("broader", b, a)]
+        return [("related", a, b), ("related", b, a)]
+
+    def _dense(self, term_id: int) -> int:
+        index = self._index.get(term_id)
+        if index is None:
+            index = len(self._ids)
+            self._index[term_id] = index
+            self._ids.append(term_id)
+            self._parent.append(index)
+            self._size.append(1)
+            self._members[index] = [index]
+        return index
+
+    # Union-find
+
+    def _find(self, index: int) -> int:
+        root = index
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[index] != root:
+            self._parent[index], index = root, self._parent[index]
+        return root
+
+    def _union(self, a: int, b: int) -> int:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return root_a
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+        self._members[root_a].extend(self._members.pop(root_b))
+        return root_a
+
+    # Incremental maintenance
+
+    def add_edge(self, term_id_1: int, term_id_2: int, relation: str) -> None:
+        """Apply a newly approved edge without rebuilding."""
+        with self._lock:
+            a, b = self._dense(term_id_1), self._dense(term_id_2)
+            if relation == "synonym":
+                self._union(a, b)
+            else:
+                for key, source, target in self._directed(relation, a, b):
+                    self._overlay[key].setdefault(source, []).append(target)
+            self.edge_count += 1
+
+    def set_preferred(self, term_id: int, preferred_term_id: Optional[int]) -> None:
+        """Apply a change of Term.preferred_term_id."""
+        with self._lock:
+            if preferred_term_id is None:
+                self._preferred.pop(term_id, None)
+            else:
+                self._preferred[term_id] = preferred_term_id
+
+    # Queries
+
+    def cluster(self, term_id: int) -> list[int]:
+        """All term ids in the synonym cluster of term_id (including itself)."""
+        with self._lock:
+            index = self._index.get(term_id)
+            if index is None:
+                return [term_id]
+            return sorted(self._ids[member] for member in self._members[self._find(index)])
+
+    def preferred_term(self, term_id: int) -> Optional[int]:
+        """
+        Preferred term for term_id.
+
+        The term's own preferred_term_id wins; otherwise the preferred term
+        chosen by any other member of its synonym cluster is used.
+        """
+        with self._lock:
+            if term_id in self._preferred:
+                return self._preferred[term_id]
+            for member in self.cluster(term_id):
+                if member in self._preferred:
+                    return self._preferred[member]
+            return None
+
+    def _neighbours(self, relation: str, term_id: int) -> list[int]:
+        with self._lock:
+            index = self._index.get(term_id)
+            if index is None:
+                return []
+            targets = set(self._csr[relation].neighbours(index))
+            targets.update(self._overlay[relation].get(index, ()))
+            return sorted(self._ids[target] for target in targets)
+
+    def broader(self, term_id: int) -> list[int]:
+        return self._neighbours("broader", term_id)
+
+    def narrower(self, term_id: int) -> list[int]:
+        return self._neighbours("narrower", term_id)
+
+    def related(self, term_id: int) -> list[int]:
+        return self._neighbours("related", term_id)
+
+    def expand(self, term_id: int) -> dict:
+        """Cluster, preferred term and hierarchy neighbours of a term."""
+        return {
+            "term_id": term_id,
+            "synonyms": [member for member in self.cluster(term_id) if member != term_id],
+            "preferred_term_id": self.preferred_term(term_id),
+            "broader": self.broader(term_id),
+            "narrower": self.narrower(term_id),
+            "related": self.related(term_id),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self._ids),
+            "edges": self.edge_count,
+            "clusters": sum(1 for members in self._members.values() if len(members) > 1),
+            "build_ms": round(self.build_seconds * 1000, 3),
+            "stale": self.stale,
+            "generation": self.generation,
+        }
+
+
+# Shared instance
+
+_graph: Optional[ThesaurusGraph] = None
+_graph_lock = threading.Lock()
+
+
+def _outdated(graph: Optional[ThesaurusGraph]) -> bool:
+    return graph is None or graph.stale or graph.generation < current_generation()
+
+
+def get_thesaurus() -> ThesaurusGraph:
+    """Return the shared graph, (re)building it on first use, when stale or
+    when another process changed the glossary."""
+    global _graph
+    graph = _graph
+    if not _outdated(graph):
+        return graph
+    with _graph_lock:
+        if _outdated(_graph):
+            with database.read_engine.connect() as conn:
+                _graph = ThesaurusGraph.build(conn)
+        return _graph
+
+
+def invalidate_thesaurus() -> None:
+    """Force a rebuild on next use (e.g. after bulk imports)."""
+    graph = _graph
+    if graph is not None:
+        graph.stale = True
+
+
+def _queue(session: Session, change: tuple) -> None:
+    session.info.setdefault(_SESSION_KEY, []).append(change)
+
+
+def _apply(changes: Iterable[tuple]) -> None:
+    graph = _graph
+    if graph is None or graph.stale:
+        return
+    for change in changes:
+        kind = change[0]
+        if kind == "edge":
+            graph.add_edge(*change[1:])
+        elif kind == "preferred":
+            graph.set_preferred(*change[1:])
+        else:
+            graph.stale = True
+            return
+
+
+# Collect changes during flush, apply them once the transaction commits
+
+@event.listens_for(TermSynonym, "after_insert")
+def _synonym_inserted(mapper, connection, target):
+    if target.is_approved:
+        session = inspect(target).session
+        _queue(session, ("edge", target.term_id_1, target.term_id_2, target.relationship_type))
+
+
+@event.listens_for(TermSynonym, "after_update")
+def _synonym_updated(mapper, connection, target):
+    state = inspect(target)
+    approved = state.attrs.is_approved.history
+    structural = any(
+        state.attrs[name].history.has_changes()
+        for name in ("term_id_1", "term_id_2", "relationship_type")
+    )
+    if structural or (approved.has_changes() and not target.is_approved):
+        _queue(state.session, ("rebuild",))
+    elif approved.has_changes() and target.is_approved:
+        _queue(state.session, ("edge", target.term_id_1, target.term_id_2, target.relationship_type))
+
+
+@event.listens_for(TermSynonym, "after_delete")
+def _synonym_deleted(mapper, connection, target):
+    _queue(inspect(target).session, ("rebuild",))
+
+
+@event.listens_for(Term, "after_insert")
+@event.listens_for(Term, "after_update")
+def _term_written(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.preferred_term_id.history.has_changes():
+        _queue(state.session, ("preferred", target.id, target.preferred_term_id))
+
+
+@event.listens_for(Term, "after_delete")
+def _term_deleted(mapper, connection, target):
+    _queue(inspect(target).session, ("rebuild",))
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session):
+    changes = session.info.pop(_SESSION_KEY, None)
+    generation = committed_generation()
+    graph = _graph
+    if generation is None or graph is None or graph.stale:
+        return
+    if graph.generation != generation - 1:
+        # Another process committed in between: incremental changes alone
+        # would miss its writes
+        graph.stale = True
+        return
+    if changes:
+        _apply(changes)
+    graph.generation = generation
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _session_rolled_back(session, previous_transaction):
+    session.info.pop(_SESSION_KEY, None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETEx thesaurus engine")
+    parser.add_argument("command", choices=["stats"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(get_thesaurus().stats())
@@ -0,0 +1,77 @@
+"""
+ETEx - Upload Storage
+
+Location of uploaded files on disk and upload limits (UPLOAD_DIR,
+MAX_UPLOAD_SIZE, ALLOWED_FILE_TYPES, see .env.example).
+"""
+
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+from database import PROJECT_ROOT
+from models import UploadedDocument
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", PROJECT_ROOT / "data" / "uploads"))
+if not UPLOAD_DIR.is_absolute():
+    UPLOAD_DIR = PROJECT_ROOT / UPLOAD_DIR
+
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))
+ALLOWED_FILE_TYPES = frozenset(
+    suffix.strip().lower()
+    for suffix in os.getenv("ALLOWED_FILE_TYPES", ".pdf,.txt,.csv,.xlsx,.tbx").split(",")
+    if suffix.strip()
+)
+
+_COPY_CHUNK = 1024 * 1024
+_UNSAFE_CHARS_RE = re.compile(r"[^\w.-]+")
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE."""
+
+
+def document_path(document: UploadedDocument) -> Path:
+    """
+    Path of an uploaded document's file.
+
+    UploadedDocument.filename is relative to UPLOAD_DIR; absolute paths
+    (documents registered from the command line) are used as-is.
+    """
+    path = Path(document.filename)
+    return path if path.is_absolute() else UPLOAD_DIR / path
+
+
+def store_upload(stream: BinaryIO, original_filename: str, max_size: int = MAX_UPLOAD_SIZE) -> tuple[str, int]:
+    """
+    Copy an upload stream into UPLOAD_DIR in bounded chunks.
+
+    Args:
+        stream: Uploaded file object
+        original_filename: Client-side filename (only its base name is kept)
+        max_size: Size limit in bytes
+
+    Returns:
+        tuple[str, int]: Storage filename relative to UPLOAD_DIR and size in bytes
+
+    Raises:
+        UploadTooLarge: The stream is larger than max_size (nothing is kept)
+    """
+    name = _UNSAFE_CHARS_RE.sub("_", Path(original_filename).name) or "upload"
+    filename = f"{datetime.now():%Y%m%d_%H%M%S_%f}_{name}"
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = UPLOAD_DIR / filename
+    size = 0
+    try:
+        with open(path, "wb") as target:
+            while chunk := stream.read(_COPY_CHUNK):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(f"Upload exceeds {max_size} bytes")
+                target.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return filename, size
@@ -0,0 +1,57 @@
+"""
+Shared pytest setup: the backend modules are imported flat (``import
+database``, ``from services.iate import ...``), as when running from
+src/backend. Database tests run against an in-memory SQLite schema
+created from the models.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "src" / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite database with the model schema (no migrations)."""
+    from database import Base
+    from models import GlossaryGeneration
+
+    bind = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind)
+    # Seeded by the migration that creates the table
+    with bind.begin() as connection:
+        connection.execute(insert(GlossaryGeneration).values(id=1, generation=0))
+    yield bind
+    bind.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def add_terms(db):
+    """Add terms to one source: add_terms("Drucksensor", ..., language_code="de") -> Terms."""
+    from models import AuthoritativeSource, Term
+
+    source = AuthoritativeSource(name="TEST", display_name="Test", source_type="database", tier=1)
+    db.add(source)
+    db.flush()
+
+    def add(*texts: str, language_code: str = "de") -> list:
+        terms = [Term(term=text, language_code=language_code, source_id=source.id) for text in texts]
+        db.add_all(terms)
+        db.commit()
+        return terms
+
+    return add
@@ -0,0 +1,138 @@
+"""
+Search result cache: which committed changes invalidate which entries,
+and the same rules driven by real ORM commits.
+"""
+
+import pytest
+
+from models import Term
+from services import cache
+from services.cache import SearchCache
+
+KEYS = {
+    "simple": SearchCache.key("Drucksensor", "simple"),
+    "simple_de": SearchCache.key("Drucksensor", "simple", language_code="de"),
+    "source_2": SearchCache.key("Drucksensor", "simple", source_id=2),
+    "page_2": SearchCache.key("Drucksensor", "simple", offset=50),
+    "wildcard": SearchCache.key("Druck*", "wildcard"),
+    "head": SearchCache.key("*sensor", "wildcard"),
+    "exact": SearchCache.key("Zaehlwerkgeraet", "exact", language_code="de"),
+    "fuzzy": SearchCache.key("Drucksensr", "fuzzy"),
+    "empty": SearchCache.key("!!!", "simple"),
+}
+
+# Every entry's results: term 1 from source 1
+RESULTS = [{"id": 1, "source_id": 1}]
+
+
+def term(text: str, language_code: str = "de", source_id: int = 1, **columns) -> dict:
+    return {"term": text, "language_code": language_code, "source_id": source_id,
+            "definition": None, "context": None, **columns}
+
+
+@pytest.mark.parametrize("change, affected", [
+    # Term in the cached results changed, even without matching text
+    (("term", 1, term("Drucksensor"), term("Manometer")), set(KEYS)),
+    (("terms", (1, 7)), set(KEYS)),
+    (("terms", (7, 8)), set()),
+    # New term: entries whose filters admit it and whose words it contains
+    (("term", 7, None, term("Drucksensor")), set(KEYS) - {"exact", "source_2"}),
+    (("term", 7, None, term("Drucksensor", language_code="en")), {"simple", "page_2", "wildcard", "head", "fuzzy", "empty"}),
+    (("term", 7, None, term("Drucksensor", source_id=2)), set(KEYS) - {"exact"}),
+    # Words also count in definition and context, diacritics folded
+    (("term", 7, None, term("Manometer", definition="Ein Drucksensor")), {"simple", "simple_de", "page_2", "wildcard", "head", "empty"}),
+    (("term", 7, None, term("Temperaturfühler")), {"empty"}),
+    # Exact entries: by term key, not by words
+    (("term", 7, None, term("Zählwerkgerät")), {"exact", "empty"}),
+    (("term", 7, None, term("der Zählwerk-Gerät")), {"exact", "empty"}),
+    (("term", 7, None, term("Zählwerkgerät", language_code="en")), {"empty"}),
+    # Fuzzy entries: within the edit budget of the query; word entries
+    # match by substring, so prefix queries are covered
+    (("term", 7, None, term("Drucksenser")), {"fuzzy", "wildcard", "empty"}),
+    # A deleted or moved term shifts later pages by its old text (a query
+    # without words admits any new text)
+    (("term", 7, term("Drucksensor"), None), {"page_2"}),
+    (("term", 7, term("Drucksensor"), term("Manometer")), {"page_2", "empty"}),
+    # Unloaded column values: assume the worst
+    (("term", 7, None, cache._UNKNOWN), set(KEYS)),
+    # Sources: filtered on, or returned in the results
+    (("source", 1), set(KEYS)),
+    (("source", 2), {"source_2"}),
+    (("source", 3), set()),
+])
+def test_invalidation_scope(change, affected):
+    search_cache = SearchCache(max_entries=100)
+    for key in KEYS.values():
+        search_cache.put(key, RESULTS, search_cache.generation)
+
+    removed = search_cache.invalidate([change])
+
+    remaining = {name for name, key in KEYS.items() if key in search_cache._entries}
+    assert set(KEYS) - remaining == affected
+    assert removed == len(affected)
+
+
+def test_many_changed_terms_clear_everything():
+    search_cache = SearchCache(max_entries=100)
+    search_cache.put(KEYS["simple"], RESULTS, 0)
+    changes = [("term", term_id, None, term("Manometer")) for term_id in range(100, 400)]
+
+    assert search_cache.invalidate(changes) == 1
+    assert not search_cache._entries
+
+
+def test_results_computed_before_an_invalidation_are_not_stored():
+    search_cache = SearchCache(max_entries=100)
+    generation = search_cache.generation
+    search_cache.invalidate([("terms", (1,))])
+
+    search_cache.put(KEYS["simple"], RESULTS, generation)
+
+    assert search_cache.get(KEYS["simple"]) is None
+
+
+def test_keys_normalize_the_query():
+    assert SearchCache.key("  DRUCK   Sensor ", "simple") == SearchCache.key("druck sensor", "simple")
+    assert SearchCache.key("Drucksensr", "fuzzy").max_distance == 2
+    assert SearchCache.key("Drucksensr", "simple").max_distance is None
+
+
+@pytest.fixture
+def search_cache(db, monkeypatch):
+    """A fresh shared cache, in step with the test database's generation."""
+    from services.generation import read_generation
+
+    fresh = SearchCache(max_entries=100)
+    fresh.glossary_generation = read_generation(db.connection())
+    db.rollback()
+    monkeypatch.setattr(cache, "search_cache", fresh)
+    return fresh
+
+
+def test_commits_invalidate_affected_entries(db, add_terms, search_cache):
+    sensor, = add_terms("Drucksensor")
+    exact = SearchCache.key("Zaehlwerkgeraet", "exact", language_code="de")
+    simple = SearchCache.key("Drucksensor", "simple")
+    other = SearchCache.key("Manometer", "simple")
+    for key, results in ((exact, []), (simple, [{"id": sensor.id, "source_id": sensor.source_id}]), (other, [])):
+        search_cache.put(key, results, search_cache.generation)
+
+    add_terms("Zählwerkgerät")
+    assert search_cache.get(exact) is None
+    assert search_cache.get(simple) is not None
+
+    db.get(Term, sensor.id).definition = "Misst Druck"
+    db.commit()
+    assert search_cache.get(simple) is None
+    assert search_cache.get(other) is not None
+
+
+def test_commit_after_a_write_from_elsewhere_clears_everything(engine, db, add_terms, search_cache):
+    add_terms("Drucksensor")
+    search_cache.put(SearchCache.key("Manometer", "simple"), [], search_cache.generation)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE glossary_generation SET generation = generation + 1")
+
+    add_terms("Temperaturfühler")
+
+    assert not search_cache._entries
@@ -0,0 +1,71 @@
+"""
+German compound splitting and the leading-wildcard (head) search built on
+the compound index.
+"""
+
+import pytest
+
+from services.decompounding import decompose, find_terms_by_part, split_word
+from services.search import search_terms
+
+
+@pytest.mark.parametrize("word, parts", [
+    ("Drucksensor", ("druck", "sensor")),
+    ("Druckmessumformer", ("druck", "mess", "umformer")),
+    ("Temperaturfühler", ("temperatur", "fühler")),
+    ("Grenzwertgeber", ("grenz", "wert", "geber")),
+    # Linking elements are dropped: -s- and -es-
+    ("Sicherheitsventil", ("sicherheit", "ventil")),
+    ("Stellungsregler", ("stellung", "regler")),
+    ("Landesnorm", ("land", "norm")),
+    # Fewest constituents wins: messung + ..., not mess + ung + ...
+    ("Durchflussmessung", ("durchfluss", "messung")),
+    # Case-insensitive
+    ("DRUCKSENSOR", ("druck", "sensor")),
+    # Not a compound: returned whole, lowercased
+    ("Sensor", ("sensor",)),
+    ("Xylophon", ("xylophon",)),
+    # A trailing linking element is not a constituent boundary
+    ("Stands", ("stands",)),
+    ("Druckss", ("druckss",)),
+    # Unknown remainder: no partial split
+    ("Druckxyz", ("druckxyz",)),
+    ("", ("",)),
+])
+def test_split_word(word, parts):
+    assert split_word(word) == parts
+
+
+@pytest.mark.parametrize("term, language_code, expected", [
+    ("Drucksensor", "de", [("druck", "modifier"), ("sensor", "head")]),
+    ("Druck-Messumformer", "de", [("druck", "modifier"), ("mess", "modifier"), ("umformer", "head")]),
+    ("Druck-/Temperatursensor", "de", [("druck", "modifier"), ("temperatur", "modifier"), ("sensor", "head")]),
+    ("Sensor", "de", []),
+    ("pressure sensor", "en", []),
+])
+def test_decompose(term, language_code, expected):
+    assert decompose(term, language_code) == expected
+
+
+def test_head_lookup_uses_the_compound_index(db, add_terms):
+    add_terms("Drucksensor", "Temperatursensor", "Sensorgehäuse", "Sensor")
+
+    heads = find_terms_by_part(db, "Sensor", role="head")
+    modifiers = find_terms_by_part(db, "sensor", role="modifier")
+
+    assert [hit["term"] for hit in heads] == ["Drucksensor", "Temperatursensor"]
+    assert [hit["term"] for hit in modifiers] == ["Sensorgehäuse"]
+
+
+def test_leading_wildcard_per_language(db, add_terms):
+    add_terms("Drucksensor", "Sensorgehäuse")
+    add_terms("pressure sensor", "sensor array", "Multisensor", language_code="en")
+
+    german = search_terms(db, "*sensor", mode="wildcard", language_code="de")
+    english = search_terms(db, "*sensor", mode="wildcard", language_code="en")
+    any_language = search_terms(db, "*sensor", mode="wildcard")
+
+    # Compound languages: head constituent; others: suffix of the term text
+    assert [hit["term"] for hit in german] == ["Drucksensor"]
+    assert [hit["term"] for hit in english] == ["Multisensor", "pressure sensor"]
+    assert {hit["term"] for hit in any_language} == {"Drucksensor", "Multisensor", "pressure sensor"}
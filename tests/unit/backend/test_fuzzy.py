@@ -0,0 +1,153 @@
+"""
+Fuzzy search: the banded, bounded OSA distance, the q-gram lower bound
+used to prune candidates, and ranking/paging over a small glossary.
+"""
+
+import random
+
+import pytest
+
+from services.fuzzy import _min_shared, bounded_distance, fuzzy_search, normalize, trigrams
+
+
+def osa_distance(a: str, b: str) -> int:
+    """Reference optimal string alignment distance (full matrix, no bound)."""
+    rows = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        rows[i][0] = i
+    for j in range(len(b) + 1):
+        rows[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[len(a)][len(b)]
+
+
+@pytest.mark.parametrize("a, b, max_distance, expected", [
+    # k = 0: only equal strings
+    ("sensor", "sensor", 0, 0),
+    ("sensor", "sensro", 0, None),
+    ("", "", 0, 0),
+    ("", "a", 0, None),
+    # Transpositions count once (OSA), also at the string edges
+    ("sensor", "sesnor", 1, 1),
+    ("sensor", "esnsor", 1, 1),
+    ("sensor", "senosr", 1, 1),
+    ("ab", "ba", 1, 1),
+    ("abcd", "badc", 2, 2),
+    ("abcd", "badc", 1, None),
+    # OSA, not unrestricted Damerau: no edit inside a transposed pair
+    ("ca", "abc", 3, 3),
+    # Single edits
+    ("drucksensor", "drucksenor", 1, 1),
+    ("drucksensor", "druckssensor", 1, 1),
+    ("drucksensor", "druckzensor", 1, 1),
+    # Band edges: length difference exactly k is allowed, k + 1 is not
+    ("sensor", "sensorxx", 2, 2),
+    ("sensor", "sensorxxx", 2, None),
+    ("abc", "", 3, 3),
+    ("abc", "", 2, None),
+    # Distance exactly at and just above the bound
+    ("messumformer", "massumfarmer", 2, 2),
+    ("messumformer", "massumfarmar", 2, None),
+    # Equal length, edits far apart along the diagonal
+    ("axxxxxxxxb", "bxxxxxxxxa", 2, 2),
+    ("axxxxxxxxb", "bxxxxxxxxa", 1, None),
+])
+def test_bounded_distance(a, b, max_distance, expected):
+    assert bounded_distance(a, b, max_distance) == expected
+    assert bounded_distance(b, a, max_distance) == expected
+
+
+def test_bounded_distance_matches_reference():
+    rng = random.Random(7)
+    for _ in range(3000):
+        a = "".join(rng.choice("abcs") for _ in range(rng.randrange(0, 9)))
+        b = "".join(rng.choice("abcs") for _ in range(rng.randrange(0, 9)))
+        distance = osa_distance(a, b)
+        for max_distance in range(4):
+            expected = distance if distance <= max_distance else None
+            assert bounded_distance(a, b, max_distance) == expected, (a, b, max_distance)
+
+
+def random_edits(word: str, edits: int, rng: random.Random) -> str:
+    for _ in range(edits):
+        position = rng.randrange(len(word) + 1)
+        kind = rng.randrange(4)
+        if kind == 0 or not word:
+            word = word[:position] + rng.choice("aeinrst") + word[position:]
+        elif kind == 1 and position < len(word):
+            word = word[:position] + word[position + 1:]
+        elif kind == 2 and position < len(word):
+            word = word[:position] + rng.choice("aeinrst") + word[position + 1:]
+        elif position + 1 < len(word):
+            word = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word
+
+
+@pytest.mark.parametrize("grams, max_distance, expected", [
+    (12, 0, 12),
+    (12, 1, 8),
+    (12, 2, 4),
+    (12, 3, 1),
+    (5, 2, 1),
+])
+def test_min_shared(grams, max_distance, expected):
+    assert _min_shared(grams, max_distance) == expected
+
+
+def test_min_shared_never_prunes_a_match():
+    # q-gram lemma: a term within the edit budget always shares enough
+    # trigrams to pass the HAVING clause. Where the lemma bound drops
+    # below one shared trigram, the index gives no guarantee: candidates
+    # come from trigram postings, so they share at least one by definition
+    rng = random.Random(11)
+    words = ["drucksensor", "messumformer", "ventil", "aaaaaa", "abab", "durchflussmesser", "ph"]
+    for _ in range(3000):
+        word = rng.choice(words)
+        variant = random_edits(word, rng.randrange(1, 4), rng)
+        distance = osa_distance(word, variant)
+        grams = len(trigrams(word))
+        for max_distance in range(distance, 4):
+            if grams - 4 * max_distance < 1:
+                continue
+            shared = len(trigrams(word) & trigrams(variant))
+            assert shared >= _min_shared(grams, max_distance), (word, variant, max_distance)
+
+
+def test_normalize_casefolds_and_collapses_whitespace():
+    assert normalize("  Druck  Meßumformer ") == "druck messumformer"
+
+
+def test_fuzzy_search_ranks_by_distance(db, add_terms):
+    add_terms("Drucksensor", "Drucksensoren", "Druckensor", "Temperatursensor")
+
+    hits = fuzzy_search(db, "Druksensor", max_distance=2)
+
+    assert [hit["term"] for hit in hits] == ["Drucksensor", "Druckensor"]
+    assert [hit["distance"] for hit in hits] == [1, 2]
+
+
+def test_fuzzy_search_filters_language(db, add_terms):
+    add_terms("Drucksensor")
+    add_terms("pressure sensor", "Drucksensor", language_code="en")
+
+    hits = fuzzy_search(db, "Drucksensr", language_code="en")
+
+    assert [(hit["term"], hit["language_code"]) for hit in hits] == [("Drucksensor", "en")]
+
+
+def test_fuzzy_search_pages_with_offset(db, add_terms):
+    add_terms("Ventil", "Ventile", "Ventils", "Venti", "Ventiel", "Vantil")
+
+    ranked = [hit["id"] for hit in fuzzy_search(db, "Ventil", max_distance=1)]
+    pages = [
+        [hit["id"] for hit in fuzzy_search(db, "Ventil", max_distance=1, limit=2, offset=offset)]
+        for offset in range(0, 8, 2)
+    ]
+
+    assert len(ranked) == 6
+    assert pages == [ranked[0:2], ranked[2:4], ranked[4:6], []]
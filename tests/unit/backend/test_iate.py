@@ -0,0 +1,184 @@
+"""
+IATE client against a local stub (``httpx.MockTransport`` through the
+client's ``transport`` parameter): response cache, ETag revalidation,
+retries with Retry-After and sharing of identical in-flight requests.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services import iate
+from services.iate import IateClient, IateError
+
+SEARCH_RESULT = {"items": [{"id": 1234, "language": {"de": {"term_entries": [{"term_value": "Drucksensor"}]}}}]}
+
+
+class StubIate:
+    """Records requests; ``responses`` are served in order, the last one repeats."""
+
+    def __init__(self, *responses: httpx.Response, delay: float = 0.0):
+        self.responses = list(responses) or [json_response(SEARCH_RESULT)]
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        response = self.responses[min(len(self.requests), len(self.responses)) - 1]
+        etag = response.headers.get("ETag")
+        if etag and request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return response
+
+
+def json_response(payload: dict, status_code: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(status_code, content=json.dumps(payload).encode("utf-8"), headers=headers)
+
+
+def make_client(stub: StubIate, tmp_path, **options) -> IateClient:
+    options.setdefault("backoff_base", 0.0)
+    return IateClient(
+        base_url="http://iate.test/em-api",
+        cache_dir=tmp_path / "iate",
+        http2=False,
+        transport=httpx.MockTransport(stub),
+        **options,
+    )
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_repeat_lookup_is_served_from_cache(tmp_path):
+    stub = StubIate(json_response(SEARCH_RESULT, ETag='"v1"'))
+
+    async def scenario():
+        async with make_client(stub, tmp_path) as client:
+            first = await client.search("Drucksensor", "de", ["en"])
+            second = await client.search("Drucksensor", "de", ["en"])
+            return client, first, second
+
+    client, first, second = run(scenario())
+    assert first == second == SEARCH_RESULT
+    assert len(stub.requests) == 1
+    assert client.counters["cache_hits"] == 1
+
+
+def test_cache_survives_a_new_client(tmp_path):
+    stub = StubIate(json_response(SEARCH_RESULT, ETag='"v1"'))
+
+    async def lookup():
+        async with make_client(stub, tmp_path) as client:
+            return await client.get_entry(1234)
+
+    run(lookup())
+    assert run(lookup()) == SEARCH_RESULT
+    assert len(stub.requests) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    stub = StubIate(json_response(SEARCH_RESULT, ETag='"v1"'))
+
+    async def scenario():
+        async with make_client(stub, tmp_path, cache_ttl=0) as client:
+            first = await client.search("Drucksensor", "de")
+            second = await client.search("Drucksensor", "de")
+            return client, first, second
+
+    client, first, second = run(scenario())
+    assert first == second == SEARCH_RESULT
+    assert "If-None-Match" not in stub.requests[0].headers
+    assert stub.requests[1].headers["If-None-Match"] == '"v1"'
+    assert client.counters["downloaded"] == 1
+    assert client.counters["revalidated"] == 1
+
+
+def test_changed_entry_is_downloaded_again(tmp_path):
+    updated = {"items": []}
+    stub = StubIate(json_response(SEARCH_RESULT, ETag='"v1"'), json_response(updated, ETag='"v2"'))
+
+    async def scenario():
+        async with make_client(stub, tmp_path, cache_ttl=0) as client:
+            await client.search("Drucksensor", "de")
+            return await client.search("Drucksensor", "de")
+
+    assert run(scenario()) == updated
+    assert len(stub.requests) == 2
+
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_retry_honours_retry_after(tmp_path, monkeypatch, status_code):
+    delays = []
+
+    async def record_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(iate.asyncio, "sleep", record_sleep)
+    stub = StubIate(
+        json_response({"error": "busy"}, status_code, **{"Retry-After": "2"}),
+        json_response(SEARCH_RESULT),
+    )
+
+    async def scenario():
+        async with make_client(stub, tmp_path) as client:
+            return client, await client.search("Drucksensor", "de")
+
+    client, result = run(scenario())
+    assert result == SEARCH_RESULT
+    assert len(stub.requests) == 2
+    assert delays == [2.0]
+    assert client.counters["retries"] == 1
+
+
+def test_retries_give_up_with_iate_error(tmp_path):
+    stub = StubIate(json_response({"error": "down"}, 503))
+
+    async def scenario():
+        async with make_client(stub, tmp_path, max_retries=2) as client:
+            await client.search("Drucksensor", "de")
+
+    with pytest.raises(IateError, match="after 3 attempts"):
+        run(scenario())
+    assert len(stub.requests) == 3
+
+
+def test_client_error_is_not_retried(tmp_path):
+    stub = StubIate(json_response({"error": "bad request"}, 400))
+
+    async def scenario():
+        async with make_client(stub, tmp_path) as client:
+            await client.search("Drucksensor", "de")
+
+    with pytest.raises(IateError, match="HTTP 400"):
+        run(scenario())
+    assert len(stub.requests) == 1
+
+
+def test_identical_inflight_requests_share_one_call(tmp_path):
+    stub = StubIate(json_response(SEARCH_RESULT), delay=0.1)
+
+    async def scenario():
+        async with make_client(stub, tmp_path) as client:
+            results = await asyncio.gather(*(client.search("Drucksensor", "de") for _ in range(5)))
+            return client, results
+
+    client, results = run(scenario())
+    assert results == [SEARCH_RESULT] * 5
+    assert len(stub.requests) == 1
+    assert client.counters["shared_inflight"] == 4
+
+
+def test_different_requests_are_not_shared(tmp_path):
+    stub = StubIate(json_response(SEARCH_RESULT), delay=0.05)
+
+    async def scenario():
+        async with make_client(stub, tmp_path) as client:
+            await asyncio.gather(client.search("Drucksensor", "de"), client.search("Durchflussmesser", "de"))
+
+    run(scenario())
+    assert len(stub.requests) == 2
@@ -0,0 +1,137 @@
+"""
+Query compilation for FTS5: user words are always quoted, so FTS5 syntax
+typed by a user (column filters, NEAR, ^, +, stray quotes) can never reach
+the MATCH expression unescaped.
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from services.search import SEARCH_MODES, SearchQueryError, compile_match_query
+
+FTS_MODES = [mode for mode in SEARCH_MODES if mode != "exact"]
+
+HOSTILE_QUERIES = [
+    'term:Druck',
+    '{term definition}: Druck',
+    '- Druck',
+    'NEAR(Druck Sensor, 2)',
+    '^Druck',
+    'Druck + Sensor',
+    '"unbalanced',
+    'a""b',
+    "'; DROP TABLE terms; --",
+    'Druck*Sensor',
+    'Druck?',
+    ':::',
+    'rank MATCH 1',
+    'Druck) OR (Sensor',
+    'AND',
+    'not Sensor',
+    '\x00Druck',
+    'Meß-Umformer ä ö ü',
+    '*',
+    '()',
+]
+
+
+@pytest.fixture(scope="module")
+def fts():
+    """FTS5 table shaped like terms_fts, to run compiled expressions against."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        "CREATE VIRTUAL TABLE terms_fts USING fts5(term, definition, context, tokenize='unicode61')"
+    )
+    connection.executemany("INSERT INTO terms_fts VALUES (?, ?, ?)", [
+        ("Drucksensor", "Sensor zur Messung des Drucks", None),
+        ("Druckmessumformer", "Messumformer für Druck", "NAMUR NE 107"),
+        ("Temperatursensor", "Sensor für Temperatur", None),
+        ("term", "near and or not", "rank"),
+    ])
+    yield connection
+    connection.close()
+
+
+def matches(fts, expression: str) -> list[str]:
+    return [row[0] for row in fts.execute(
+        "SELECT term FROM terms_fts WHERE terms_fts MATCH ? ORDER BY rowid", (expression,)
+    )]
+
+
+@pytest.mark.parametrize("query, mode, expected", [
+    ("Druck Sensor", "simple", '"Druck" "Sensor"'),
+    ("Druck-Sensor", "simple", '"Druck" "Sensor"'),
+    ("Druck Sensor", "phrase", '"Druck Sensor"'),
+    ("Druck*", "wildcard", '"Druck"*'),
+    ("Druck-Mess*", "wildcard", '"Druck Mess"*'),
+    ("Druck* Sensor", "wildcard", '"Druck"* "Sensor"'),
+    ("Druck AND Sensor", "boolean", '"Druck" AND "Sensor"'),
+    ("Druck Sensor", "boolean", '"Druck" AND "Sensor"'),
+    ("druck or sensor", "boolean", '"druck" OR "sensor"'),
+    ("Sensor NOT Temperatur", "boolean", '"Sensor" NOT "Temperatur"'),
+    ('"Druck Sensor" OR Temperatur', "boolean", '"Druck Sensor" OR "Temperatur"'),
+    ("(Druck OR Temperatur) Sensor", "boolean", '( "Druck" OR "Temperatur" ) AND "Sensor"'),
+    ("term:Druck", "simple", '"term" "Druck"'),
+    ('a"b', "simple", '"a" "b"'),
+])
+def test_compile_match_query(query, mode, expected):
+    assert compile_match_query(query, mode) == expected
+
+
+@pytest.mark.parametrize("query, mode", [
+    ("", "simple"),
+    ("  -- ", "simple"),
+    ("!!!", "phrase"),
+    ("*", "wildcard"),
+    ("Dr*ck", "wildcard"),
+    ("Druck?", "wildcard"),
+    ("*sensor *druck", "wildcard"),
+    ("NOT Sensor", "boolean"),
+    ("Sensor AND", "boolean"),
+    ("AND Sensor", "boolean"),
+    ("(Sensor", "boolean"),
+    ("Sensor)", "boolean"),
+    ("()", "boolean"),
+    ("Sensor OR OR Druck", "boolean"),
+    ("Druck", "regex"),
+])
+def test_invalid_queries_raise(query, mode):
+    with pytest.raises(SearchQueryError):
+        compile_match_query(query, mode)
+
+
+@pytest.mark.parametrize("mode", FTS_MODES)
+@pytest.mark.parametrize("query", HOSTILE_QUERIES)
+def test_hostile_queries_compile_to_valid_fts5(fts, query, mode):
+    try:
+        expression = compile_match_query(query, mode)
+    except SearchQueryError:
+        return
+    matches(fts, expression)  # sqlite3.OperationalError on an FTS5 syntax error
+
+
+def test_random_input_never_produces_fts5_syntax_errors(fts):
+    rng = random.Random(3)
+    alphabet = 'ab DruckSensor"()*:^+-{}?,.\'NEARANDORNOT'
+    for _ in range(2000):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 20)))
+        for mode in FTS_MODES:
+            try:
+                expression = compile_match_query(query, mode)
+            except SearchQueryError:
+                continue
+            matches(fts, expression)
+
+
+def test_operator_words_are_searched_as_words(fts):
+    # Inside quotes, "near", "and", "not" and column names are plain words
+    assert matches(fts, compile_match_query("near and not", "simple")) == ["term"]
+    assert matches(fts, compile_match_query("term:rank", "simple")) == ["term"]
+
+
+def test_compiled_queries_find_terms(fts):
+    assert matches(fts, compile_match_query("Druck*", "wildcard")) == ["Drucksensor", "Druckmessumformer"]
+    assert matches(fts, compile_match_query("Sensor NOT Temperatur", "boolean")) == ["Drucksensor"]
+    assert matches(fts, compile_match_query("Messung des", "phrase")) == ["Drucksensor"]
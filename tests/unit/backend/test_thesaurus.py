@@ -0,0 +1,171 @@
+"""
+Thesaurus engine: union-find synonym clusters against a reference
+traversal, hierarchy directions, preferred terms, and incremental
+maintenance on commit.
+"""
+
+import random
+
+import pytest
+
+from models import TermSynonym
+from services import thesaurus
+from services.thesaurus import ThesaurusGraph
+
+
+def reference_clusters(nodes: list[int], edges: list[tuple[int, int]]) -> dict[int, list[int]]:
+    """Synonym cluster of every node by breadth-first search."""
+    neighbours: dict[int, set[int]] = {node: set() for node in nodes}
+    for a, b in edges:
+        neighbours[a].add(b)
+        neighbours[b].add(a)
+    clusters = {}
+    for start in nodes:
+        seen, queue = {start}, [start]
+        while queue:
+            for other in neighbours[queue.pop()] - seen:
+                seen.add(other)
+                queue.append(other)
+        clusters[start] = sorted(seen)
+    return clusters
+
+
+@pytest.fixture
+def graph(engine) -> ThesaurusGraph:
+    """Graph built from an empty glossary; edges are added incrementally."""
+    with engine.connect() as connection:
+        return ThesaurusGraph.build(connection)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_clusters_match_reference(graph, seed):
+    rng = random.Random(seed)
+    nodes = list(range(1, 201))
+    edges = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(150)]
+    for a, b in edges:
+        graph.add_edge(a, b, "synonym")
+
+    expected = reference_clusters(nodes, edges)
+    for node in nodes:
+        assert graph.cluster(node) == expected[node]
+    multi = {tuple(cluster) for cluster in expected.values() if len(cluster) > 1}
+    assert graph.stats()["clusters"] == len(multi)
+
+
+def test_union_is_transitive_and_idempotent(graph):
+    graph.add_edge(1, 2, "synonym")
+    graph.add_edge(3, 4, "synonym")
+    assert graph.cluster(1) == [1, 2]
+    graph.add_edge(2, 3, "synonym")
+    graph.add_edge(4, 1, "synonym")  # already in one cluster
+
+    for term_id in (1, 2, 3, 4):
+        assert graph.cluster(term_id) == [1, 2, 3, 4]
+    assert graph.cluster(99) == [99]
+
+
+def test_hierarchy_directions(graph):
+    graph.add_edge(1, 2, "broader")    # 2 is broader than 1
+    graph.add_edge(3, 1, "narrower")   # 1 is narrower than 3
+    graph.add_edge(1, 4, "related")
+
+    assert graph.broader(1) == [2, 3]
+    assert graph.narrower(2) == [1]
+    assert graph.narrower(3) == [1]
+    assert graph.related(1) == [4]
+    assert graph.related(4) == [1]
+    # Hierarchy edges do not join synonym clusters
+    assert graph.cluster(1) == [1]
+
+
+def test_preferred_term_falls_back_to_cluster(graph):
+    graph.add_edge(1, 2, "synonym")
+    graph.add_edge(2, 3, "synonym")
+    graph.set_preferred(2, 1)
+
+    assert graph.preferred_term(2) == 1
+    assert graph.preferred_term(3) == 1
+    graph.set_preferred(3, 3)
+    assert graph.preferred_term(3) == 3
+    graph.set_preferred(2, None)
+    assert graph.preferred_term(1) == 3
+
+    expansion = graph.expand(2)
+    assert expansion["synonyms"] == [1, 3]
+    assert expansion["preferred_term_id"] == 3
+
+
+def link(db, term_1, term_2, relation="synonym", approved=True) -> TermSynonym:
+    synonym = TermSynonym(
+        term_id_1=term_1.id, term_id_2=term_2.id, relationship_type=relation, is_approved=approved
+    )
+    db.add(synonym)
+    db.commit()
+    return synonym
+
+
+def test_build_loads_approved_edges(engine, db, add_terms):
+    sensor, transmitter, gauge, device = add_terms("Sensor", "Messumformer", "Manometer", "Gerät")
+    link(db, sensor, transmitter)
+    link(db, sensor, gauge, approved=False)
+    link(db, sensor, device, "broader")
+    transmitter.preferred_term_id = sensor.id
+    db.commit()
+
+    with engine.connect() as connection:
+        graph = ThesaurusGraph.build(connection)
+
+    assert graph.cluster(sensor.id) == sorted([sensor.id, transmitter.id])
+    assert graph.broader(sensor.id) == [device.id]
+    assert graph.narrower(device.id) == [sensor.id]
+    assert graph.preferred_term(transmitter.id) == sensor.id
+    assert graph.edge_count == 2
+
+
+@pytest.fixture
+def shared_graph(engine, monkeypatch):
+    """The module's shared graph, built from the test database."""
+    def build() -> ThesaurusGraph:
+        with engine.connect() as connection:
+            graph = ThesaurusGraph.build(connection)
+        monkeypatch.setattr(thesaurus, "_graph", graph)
+        return graph
+    return build
+
+
+def test_commit_applies_new_links_in_place(db, add_terms, shared_graph):
+    sensor, transmitter, gauge = add_terms("Sensor", "Messumformer", "Manometer")
+    graph = shared_graph()
+
+    link(db, sensor, transmitter)
+    link(db, gauge, transmitter, "broader")
+
+    assert thesaurus._graph is graph
+    assert not graph.stale
+    assert graph.cluster(sensor.id) == sorted([sensor.id, transmitter.id])
+    assert graph.broader(gauge.id) == [transmitter.id]
+    assert graph.generation == 3  # terms, then one bump per link commit
+
+
+def test_commit_of_removal_marks_graph_stale(db, add_terms, shared_graph):
+    sensor, transmitter = add_terms("Sensor", "Messumformer")
+    synonym = link(db, sensor, transmitter)
+    graph = shared_graph()
+
+    db.delete(synonym)
+    db.commit()
+
+    assert graph.stale
+
+
+def test_write_from_elsewhere_marks_graph_stale(engine, db, add_terms, shared_graph):
+    sensor, transmitter, gauge = add_terms("Sensor", "Messumformer", "Manometer")
+    graph = shared_graph()
+    # Another writer bumps the generation without this process seeing it
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE glossary_generation SET generation = generation + 1")
+
+    link(db, sensor, transmitter)
+
+    assert graph.stale
+    assert graph.cluster(sensor.id) == [sensor.id]